@@ -0,0 +1,54 @@
+"""
+Compare the add network form with wallet_addEthereumChain requests.
+
+Usage:
+    python -m benchmarks.add_networks networks.json [--headless]
+
+Each engine gets its own freshly onboarded browser so neither starts with the
+other's networks.
+"""
+
+import sys
+import time
+
+from extension.cdp import close_cdp_sessions
+from extension.helpers import invalidate_extension_cache
+from extension.pool import create_onboarded_driver
+
+from metamask_automation import add_custom_networks, load_networks
+
+from utils.constants.prompts import CONFIRM_PASSWORD_TEXT
+from utils.inputs import get_password
+
+
+def benchmark_engine(engine: str, networks: list[dict], password: str, headless: bool):
+    driver = create_onboarded_driver(headless=headless, password=password)
+
+    try:
+        started_at = time.perf_counter()
+        results = add_custom_networks(driver, networks, engine=engine)
+        elapsed = time.perf_counter() - started_at
+    finally:
+        invalidate_extension_cache(driver)
+        close_cdp_sessions(driver)
+        driver.quit()
+
+    added = sum(1 for status in results.values() if status == "added")
+    return elapsed, added
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    networks = load_networks(sys.argv[1])
+    headless = "--headless" in sys.argv
+    password = get_password(CONFIRM_PASSWORD_TEXT)
+
+    print(f"{'engine':<8}{'added':>8}{'total (s)':>12}{'per network (s)':>18}")
+
+    for engine in ("ui", "rpc"):
+        elapsed, added = benchmark_engine(engine, networks, password, headless)
+        per_network = elapsed / added if added else float("nan")
+        print(f"{engine:<8}{added:>8}{elapsed:>12.2f}{per_network:>18.2f}")
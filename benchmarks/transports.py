@@ -0,0 +1,64 @@
+"""
+Compare WebDriver and DevTools transports on the onboarding and add network helpers.
+
+Usage:
+    python -m benchmarks.transports networks.json [--headless] [--transport webdriver|cdp]
+
+Each transport gets its own browser, onboarded and then provisioned through
+the add network form, and the latency of every helper is reported per
+transport. Both transports run unless one is given.
+"""
+
+import sys
+
+from extension.cdp import close_cdp_sessions, operation_latencies, using_transport
+from extension.helpers import invalidate_extension_cache
+from extension.pool import create_onboarded_driver
+
+from metamask_automation import add_custom_networks, load_networks
+
+from utils.constants.prompts import CONFIRM_PASSWORD_TEXT
+from utils.enums.transport import Transport
+from utils.inputs import get_password
+
+
+def benchmark_transport(
+    transport: Transport, networks: list[dict], password: str, headless: bool
+) -> None:
+    with using_transport(transport):
+        driver = create_onboarded_driver(headless=headless, password=password)
+
+        try:
+            add_custom_networks(driver, networks, engine="ui")
+        finally:
+            invalidate_extension_cache(driver)
+            close_cdp_sessions(driver)
+            driver.quit()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    networks = load_networks(sys.argv[1])
+    headless = "--headless" in sys.argv
+    transports = list(Transport)
+
+    if "--transport" in sys.argv:
+        transports = [Transport(sys.argv[sys.argv.index("--transport") + 1])]
+
+    password = get_password(CONFIRM_PASSWORD_TEXT)
+
+    for transport in transports:
+        benchmark_transport(transport, networks, password, headless)
+
+    print(
+        f"{'operation':<40}{'count':>8}{'mean (ms)':>12}{'p50 (ms)':>12}{'p95 (ms)':>12}"
+    )
+
+    for operation, stats in operation_latencies.summary().items():
+        print(
+            f"{operation:<40}{stats['count']:>8}{stats['mean_ms']:>12}"
+            f"{stats['p50_ms']:>12}{stats['p95_ms']:>12}"
+        )
@@ -1,26 +1,162 @@
-import redis
+import asyncio
+import os
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import bcrypt
+import redis
+
+from storage.backends import (
+    StorageBackend,
+    get_async_redis_backend,
+    get_storage_backend,
+)
 
 from utils.enums.credential import CredentialField, CredentialType
 
+# ? bcrypt cost factor, recorded in every hash as $2b$<rounds>$
+BCRYPT_ROUNDS = 12
+
+# ? bcrypt releases the GIL while hashing, so a thread per core hashes in parallel
+HASH_WORKERS = os.cpu_count() or 2
+
+# ? Hash field each credential type is stored under
+CREDENTIAL_FIELDS = {
+    CredentialType.PASSWORD: CredentialField.PASSWORD_HASH,
+    CredentialType.RECOVERY_PHRASE: CredentialField.RECOVERY_PHRASE_HASH,
+}
+
+_hash_executor: ThreadPoolExecutor = None
+_hash_executor_lock = threading.Lock()
+
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    """Get the bounded worker pool every bcrypt call runs on."""
+    global _hash_executor
+
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=HASH_WORKERS, thread_name_prefix="bcrypt"
+            )
+
+        return _hash_executor
+
+
+def hash_credential(credential: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(credential.encode("utf-8"), salt).decode("utf-8")
+
+
+def check_credential(credential: str, hashed_credential: str) -> bool:
+    return bcrypt.checkpw(credential.encode("utf-8"), hashed_credential.encode("utf-8"))
+
+
+def get_hash_rounds(hashed_credential: str) -> int:
+    """Read the cost factor a bcrypt hash was created with."""
+    return int(hashed_credential.split("$")[2])
+
+
+def _completed_future(result: any) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
 
 class SecureCredentialStorage:
 
     def __init__(
-        self, redis_host: str = "localhost", redis_port: int = 6379, redis_db: int = 0
+        self,
+        redis_host: str = "localhost",
+        redis_port: int = 6379,
+        redis_db: int = 0,
+        client: redis.Redis = None,
+        rounds: int = BCRYPT_ROUNDS,
+        backend: str | StorageBackend = None,
     ):
-        """Initialize Redis connection and set up credential storage system."""
-        self.redis = redis.Redis(
-            host=redis_host, port=redis_port, db=redis_db, decode_responses=True
+        """
+        Initialize the storage backend and set up credential storage system.
+
+        The backend is Redis or SQLite as configured, see get_storage_backend.
+        Pass a client to use an existing Redis connection, e.g. a
+        fakeredis.FakeRedis(decode_responses=True) in tests. New hashes use
+        `rounds` as their bcrypt cost factor, existing hashes keep their own.
+        """
+        self.backend = (
+            backend
+            if isinstance(backend, StorageBackend)
+            else get_storage_backend(backend, redis_host, redis_port, redis_db, client)
         )
+        self.rounds = rounds
+
+    def _hash_credential(self, credential: str) -> str:
+        return self.submit_hash(credential).result()
+
+    def submit_hash(self, credential: str) -> Future:
+        """
+        Hash a credential on the bcrypt worker pool.
+
+        Args:
+            credential (str): Credential to hash.
+
+        Returns:
+            Future: Resolves to the hashed credential.
+        """
+        return get_hash_executor().submit(hash_credential, credential, self.rounds)
+
+    def submit_verify(
+        self, extension_name: str, key: CredentialField, credential: str
+    ) -> Future:
+        """
+        Verify a credential against its stored hash on the bcrypt worker pool.
+
+        Args:
+            extension_name (str): Unique identifier for the extension.
+            key (str): Key the credential is stored under.
+            credential (str): Credential to verify.
+
+        Returns:
+            Future: Resolves to whether the credential matches.
+        """
+        stored = self.backend.get_field(f"extension:{extension_name}", key)
+        if not stored:
+            return _completed_future(False)
+
+        return get_hash_executor().submit(check_credential, credential, stored)
+
+    def _submit_credential_hashes(
+        self, credentials: dict
+    ) -> dict[CredentialType, Future]:
+        if not isinstance(credentials, dict):
+            raise TypeError(
+                f"Credentials must be a dict, got {type(credentials).__name__}"
+            )
+
+        for credential_type in CREDENTIAL_FIELDS:
+            credential = credentials.get(credential_type)
+            if credential and not isinstance(credential, str):
+                raise TypeError(
+                    f"{credential_type} must be a str, got {type(credential).__name__}"
+                )
+
+        return {
+            credential_type: self.submit_hash(credentials[credential_type])
+            for credential_type in CREDENTIAL_FIELDS
+            if credentials.get(credential_type)
+        }
+
+    def needs_rehash(self, hashed_credential: str) -> bool:
+        """Whether a stored hash was created with a different cost factor than `rounds`."""
+        return get_hash_rounds(hashed_credential) != self.rounds
 
     def _hash_and_store_credential(
         self, extension_name: str, key: CredentialField, credential: str
     ) -> str:
         """
-        Hash and store a credential in Redis.
+        Hash and store a credential in the storage backend.
         This method takes an extension's name, a key, and a credential, hashes and stores the
-        provided credential in Redis using a Redis hash with the extension name as the key.
+        provided credential in the record with the extension name as the key.
 
         Args:
             extension_name (str): Unique identifier for the extension.
@@ -30,19 +166,16 @@ class SecureCredentialStorage:
         Returns:
             str: The hashed credential.
         """
-        salt = bcrypt.gensalt()
-        hashed_credential = bcrypt.hashpw(credential.encode("utf-8"), salt)
-        self.redis.hset(
-            f"extension:{extension_name}", key, hashed_credential.decode("utf-8")
-        )
-        return hashed_credential.decode("utf-8")
+        hashed_credential = self._hash_credential(credential)
+        self.backend.set_fields(f"extension:{extension_name}", {key: hashed_credential})
+        return hashed_credential
 
     def store_credentials(self, extension_name: str, credentials: dict) -> dict:
         """
-        Hash and store a password or a recovery phrase in Redis.
+        Hash and store a password or a recovery phrase in the storage backend.
         This method takes an extension's name and a dictionary containing a password and/or
-        a recovery phrase, hashes and stores the provided credential(s) in Redis.
-        The hashed credentials are then stored using a Redis hash with the extension name
+        a recovery phrase, hashes and stores the provided credential(s).
+        The hashed credentials are then stored in the record with the extension name
         as the key.
 
         Args:
@@ -57,25 +190,21 @@ class SecureCredentialStorage:
         if not credentials:
             return {}
 
-        password = credentials.get(CredentialType.PASSWORD)
-        recovery_phrase = credentials.get(CredentialType.RECOVERY_PHRASE)
-        hashed_credentials = {}
+        # ? Hash both credentials at the same time
+        hashed_credentials = {
+            credential_type: future.result()
+            for credential_type, future in self._submit_credential_hashes(
+                credentials
+            ).items()
+        }
+        fields = {
+            CREDENTIAL_FIELDS[credential_type]: hashed_credential
+            for credential_type, hashed_credential in hashed_credentials.items()
+        }
 
-        if password:
-            hashed_credentials[CredentialType.PASSWORD] = (
-                self._hash_and_store_credential(
-                    extension_name, CredentialField.PASSWORD_HASH, password
-                )
-            )
-
-        if recovery_phrase:
-            hashed_credentials[CredentialType.RECOVERY_PHRASE] = (
-                self._hash_and_store_credential(
-                    extension_name,
-                    CredentialField.RECOVERY_PHRASE_HASH,
-                    recovery_phrase,
-                )
-            )
+        # ? Every field in one write
+        if fields:
+            self.backend.set_fields(f"extension:{extension_name}", fields)
 
         return hashed_credentials
 
@@ -93,11 +222,283 @@ class SecureCredentialStorage:
         Returns:
             Boolean indicating if the credential matches
         """
-        stored = self.redis.hget(f"extension:{extension_name}", key)
+        return self.submit_verify(extension_name, key, credential).result()
+
+    def verify_many(
+        self, credentials: list[tuple[str, CredentialField, str]]
+    ) -> list[bool]:
+        """
+        Verify several credentials, reading every stored hash in a single round trip.
+
+        Args:
+            credentials (list[tuple[str, CredentialField, str]]): (extension_name, key, credential) triples.
+
+        Returns:
+            list[bool]: Whether each credential matches, in order.
+        """
+        stored_hashes = self.backend.get_many(
+            [
+                (f"extension:{extension_name}", [key])
+                for extension_name, key, _ in credentials
+            ]
+        )
+
+        futures = [
+            (
+                get_hash_executor().submit(check_credential, credential, stored)
+                if stored
+                else _completed_future(False)
+            )
+            for (_, _, credential), (stored,) in zip(credentials, stored_hashes)
+        ]
+
+        return [future.result() for future in futures]
+
+    def store_credentials_bulk(
+        self, credentials_by_extension: dict[str, dict]
+    ) -> dict[str, dict]:
+        """
+        Hash and store the credentials of many wallets at once.
+
+        Every credential is hashed in parallel on the bcrypt worker pool, then all
+        wallets are written in a single transaction.
+
+        Args:
+            credentials_by_extension (dict[str, dict]): Credentials, as passed to
+                                                        store_credentials, keyed by extension name.
+
+        Returns:
+            dict[str, dict]: Per extension, "hashed" (the hashed credentials) and "error"
+                             (why the wallet was not stored, None if it was).
+        """
+        futures = {}
+        results = {}
+
+        for extension_name, credentials in credentials_by_extension.items():
+            try:
+                futures[extension_name] = self._submit_credential_hashes(
+                    credentials or {}
+                )
+            except Exception as e:
+                results[extension_name] = {"hashed": {}, "error": str(e)}
+
+        for extension_name, hashes in futures.items():
+            try:
+                hashed = {
+                    credential_type: future.result()
+                    for credential_type, future in hashes.items()
+                }
+                results[extension_name] = {"hashed": hashed, "error": None}
+            except Exception as e:
+                results[extension_name] = {"hashed": {}, "error": str(e)}
+
+        # ? Keep the caller's order, failures were recorded first
+        results = {
+            extension_name: results[extension_name]
+            for extension_name in credentials_by_extension
+        }
+
+        self.backend.set_many(
+            {
+                f"extension:{extension_name}": {
+                    CREDENTIAL_FIELDS[credential_type]: hashed_credential
+                    for credential_type, hashed_credential in result["hashed"].items()
+                }
+                for extension_name, result in results.items()
+                if result["hashed"]
+            },
+            transaction=True,
+        )
+
+        return results
+
+    def verify_credentials_bulk(
+        self, credentials_by_extension: dict[str, dict]
+    ) -> dict[str, dict]:
+        """
+        Verify the credentials of many wallets, reading every stored hash in a single round trip.
+
+        Args:
+            credentials_by_extension (dict[str, dict]): Credentials, as passed to
+                                                        store_credentials, keyed by extension name.
+
+        Returns:
+            dict[str, dict]: Per extension, whether each given credential type matches.
+        """
+        stored = self.backend.get_many(
+            [
+                (f"extension:{extension_name}", list(CREDENTIAL_FIELDS.values()))
+                for extension_name in credentials_by_extension
+            ]
+        )
+
+        futures = {}
+
+        for (extension_name, credentials), stored_hashes in zip(
+            credentials_by_extension.items(), stored
+        ):
+            stored_by_type = dict(zip(CREDENTIAL_FIELDS, stored_hashes))
+            futures[extension_name] = {
+                credential_type: (
+                    get_hash_executor().submit(
+                        check_credential,
+                        credentials[credential_type],
+                        stored_by_type[credential_type],
+                    )
+                    if stored_by_type[credential_type]
+                    and isinstance(credentials[credential_type], str)
+                    else _completed_future(False)
+                )
+                for credential_type in CREDENTIAL_FIELDS
+                if credentials.get(credential_type)
+            }
+
+        return {
+            extension_name: {
+                credential_type: future.result()
+                for credential_type, future in checks.items()
+            }
+            for extension_name, checks in futures.items()
+        }
+
+    def get_credential_hashes(
+        self, extension_names: list[str], key: CredentialField
+    ) -> dict[str, str | None]:
+        """
+        Get one stored hash of several extensions in a single round trip.
+
+        Args:
+            extension_names (list[str]): Unique identifiers of the extensions.
+            key (str): Key the credential is stored under.
+
+        Returns:
+            dict[str, str | None]: The stored hash keyed by extension name, None if not stored.
+        """
+        stored = self.backend.get_many(
+            [
+                (f"extension:{extension_name}", [key])
+                for extension_name in extension_names
+            ]
+        )
+
+        return {
+            extension_name: values[0]
+            for extension_name, values in zip(extension_names, stored)
+        }
+
+
+class AsyncSecureCredentialStorage:
+    """
+    SecureCredentialStorage on redis.asyncio, with the same method names as coroutines.
+
+    bcrypt runs on the shared worker pool so hashing never blocks the event loop.
+    Redis only: with METAMASK_STORAGE_BACKEND=sqlite the constructor raises
+    ValueError, use SecureCredentialStorage there.
+    """
+
+    def __init__(
+        self,
+        redis_host: str = "localhost",
+        redis_port: int = 6379,
+        redis_db: int = 0,
+        client: redis.asyncio.Redis = None,
+        rounds: int = BCRYPT_ROUNDS,
+    ):
+        """
+        Initialize the asyncio Redis connection.
+
+        Pass a client to use an existing connection, e.g. a
+        fakeredis.aioredis.FakeRedis(decode_responses=True) in tests.
+        """
+        self.redis = client or get_async_redis_backend(
+            redis_host, redis_port, redis_db
+        )
+        self.rounds = rounds
+
+    needs_rehash = SecureCredentialStorage.needs_rehash
+
+    async def _run_bcrypt(self, function, *args) -> any:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_hash_executor(), function, *args
+        )
+
+    async def _hash_credential(self, credential: str) -> str:
+        return await self._run_bcrypt(hash_credential, credential, self.rounds)
+
+    async def _hash_and_store_credential(
+        self, extension_name: str, key: CredentialField, credential: str
+    ) -> str:
+        hashed_credential = await self._hash_credential(credential)
+        await self.redis.hset(f"extension:{extension_name}", key, hashed_credential)
+        return hashed_credential
+
+    async def store_credentials(self, extension_name: str, credentials: dict) -> dict:
+        if not credentials:
+            return {}
+
+        to_hash = {
+            credential_type: credentials[credential_type]
+            for credential_type in CREDENTIAL_FIELDS
+            if credentials.get(credential_type)
+        }
+
+        hashes = await asyncio.gather(
+            *(self._hash_credential(credential) for credential in to_hash.values())
+        )
+        hashed_credentials = dict(zip(to_hash, hashes))
+
+        if hashed_credentials:
+            await self.redis.hset(
+                f"extension:{extension_name}",
+                mapping={
+                    CREDENTIAL_FIELDS[credential_type]: hashed_credential
+                    for credential_type, hashed_credential in hashed_credentials.items()
+                },
+            )
+
+        return hashed_credentials
+
+    async def verify_credential(
+        self, extension_name: str, key: CredentialField, credential: str
+    ) -> bool:
+        stored = await self.redis.hget(f"extension:{extension_name}", key)
         if not stored:
             return False
 
-        return bcrypt.checkpw(credential.encode("utf-8"), stored.encode("utf-8"))
+        return await self._run_bcrypt(check_credential, credential, stored)
+
+    async def verify_many(
+        self, credentials: list[tuple[str, CredentialField, str]]
+    ) -> list[bool]:
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for extension_name, key, _ in credentials:
+                pipeline.hget(f"extension:{extension_name}", key)
+            stored_hashes = await pipeline.execute()
+
+        async def verify(credential: str, stored: str | None) -> bool:
+            if not stored:
+                return False
+            return await self._run_bcrypt(check_credential, credential, stored)
+
+        return await asyncio.gather(
+            *(
+                verify(credential, stored)
+                for (_, _, credential), stored in zip(credentials, stored_hashes)
+            )
+        )
+
+    async def get_credential_hashes(
+        self, extension_names: list[str], key: CredentialField
+    ) -> dict[str, str | None]:
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for extension_name in extension_names:
+                pipeline.hget(f"extension:{extension_name}", key)
+            results = await pipeline.execute()
+
+        return dict(zip(extension_names, results))
+
+    async def aclose(self) -> None:
+        await self.redis.aclose()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,338 @@
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import (
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
+
+from extension.helpers import get_metamask_extension_url, run_script
+from extension.waits import wait_for_element, wait_for_url
+
+from utils.constants.values import DEFAULT_TIMEOUT
+from utils.enums.approval import ApprovalAction, ApprovalType
+
+# ? Poll window handles quickly, a new popup is cheap to detect
+WINDOW_POLL_FREQUENCY = 0.1
+
+# ? Any button that moves the permissions flow forward, across MetaMask versions
+CONNECT_NEXT_BUTTON_XPATH = (
+    "//*[@data-testid='confirm-btn' or @data-testid='page-container-footer-next']"
+)
+
+
+class Deadline:
+    """A hard deadline shared by every phase of a multi-step flow."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.perf_counter() + seconds
+
+    def remaining(self) -> float:
+        remaining = self.expires_at - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutException(f"Deadline of {self.seconds}s exceeded")
+        return remaining
+
+
+class PhaseTimer:
+    """Record how long each named phase of a flow takes."""
+
+    def __init__(self):
+        self.timings = {}
+        self._started_at = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.timings[phase] = round(now - self._started_at, 3)
+        self._started_at = now
+
+
+def wait_for_notification_window(
+    driver: webdriver, known_handles: list[str], deadline: Deadline
+) -> str:
+    """
+    Wait for the MetaMask notification popup to open and switch to it.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        known_handles (list[str]): Window handles that were open before the popup was triggered.
+        deadline (Deadline): Deadline for the whole flow.
+    Returns:
+        str: The window handle of the notification popup.
+    Raises:
+        TimeoutException: If no notification popup opened before the deadline.
+    """
+    notification_url = get_metamask_extension_url(driver) + "/notification.html"
+    checked_handles = set(known_handles)
+
+    def find_notification_window(driver: webdriver) -> str | None:
+        for handle in driver.window_handles:
+            if handle in checked_handles:
+                continue
+
+            driver.switch_to.window(handle)
+            current_url = driver.current_url
+            if current_url.startswith(notification_url):
+                return handle
+
+            # ? A popup still on about:blank has not loaded yet, look again on the next poll
+            if current_url not in ("", "about:blank"):
+                checked_handles.add(handle)
+        return None
+
+    wait = WebDriverWait(
+        driver, timeout=deadline.remaining(), poll_frequency=WINDOW_POLL_FREQUENCY
+    )
+    handle = wait.until(find_notification_window)
+
+    wait_for_url(driver, "notification.html", timeout=deadline.remaining())
+    return handle
+
+
+def wait_for_window_closed(driver: webdriver, handle: str, deadline: Deadline) -> None:
+    wait = WebDriverWait(
+        driver, timeout=deadline.remaining(), poll_frequency=WINDOW_POLL_FREQUENCY
+    )
+    wait.until(lambda driver: handle not in driver.window_handles)
+
+
+def wait_for_step_change(
+    driver: webdriver, handle: str, element: WebElement, deadline: Deadline
+) -> None:
+    """Wait until a clicked button is replaced, or its popup window closes."""
+
+    def step_changed(driver: webdriver) -> bool:
+        if handle not in driver.window_handles:
+            return True
+        try:
+            element.is_enabled()
+            return False
+        except (NoSuchWindowException, StaleElementReferenceException):
+            return True
+
+    wait = WebDriverWait(
+        driver, timeout=deadline.remaining(), poll_frequency=WINDOW_POLL_FREQUENCY
+    )
+    wait.until(step_changed)
+
+
+def approve_connection(
+    driver: webdriver, connect_trigger: WebElement, timeout: float = DEFAULT_TIMEOUT
+) -> dict:
+    """
+    Trigger a dApp connection request and approve it in the MetaMask popup.
+
+    Handles both the single page connect flow and the multi-step permissions
+    flow, clicking through until the popup closes. Every phase shares one hard
+    deadline.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        connect_trigger (WebElement): The dApp's connect button.
+        timeout (float, optional): Deadline in seconds for the whole flow. Defaults to DEFAULT_TIMEOUT.
+    Returns:
+        dict: "approved" (bool), "steps" (int) and "timings" (seconds per phase).
+    """
+    deadline = Deadline(timeout)
+    timer = PhaseTimer()
+    result = {"approved": False, "steps": 0, "timings": timer.timings}
+
+    original_tab = driver.current_window_handle
+    window_handles = driver.window_handles
+    notification_window = None
+
+    connect_trigger.click()
+    timer.lap("trigger")
+
+    try:
+        notification_window = wait_for_notification_window(
+            driver, window_handles, deadline
+        )
+        timer.lap("popup")
+
+        connect_page = wait_for_element(
+            driver,
+            "//*[@data-testid='connect-page' or contains(@class, 'permissions-connect')]",
+            step="approvals.connect_page",
+            timeout=deadline.remaining(),
+        )
+        timer.lap("connect_page")
+
+        action_prompt = connect_page.find_elements(By.TAG_NAME, "h2")
+        if action_prompt:
+            print(f"Action: {action_prompt[0].text}")
+
+        # ? Click through each permissions step until MetaMask closes the popup
+        while notification_window in driver.window_handles:
+            next_button = wait_for_element(
+                driver,
+                CONNECT_NEXT_BUTTON_XPATH,
+                step="approvals.connect_next",
+                timeout=deadline.remaining(),
+            )
+            next_button.click()
+            result["steps"] += 1
+
+            wait_for_step_change(driver, notification_window, next_button, deadline)
+            timer.lap(f"confirm_{result['steps']}")
+
+        result["approved"] = True
+    except NoSuchWindowException:
+        # ? The popup closed itself right after the last step
+        result["approved"] = result["steps"] > 0
+    except TimeoutException:
+        print(f"Connection approval timed out after {timeout}s")
+
+        if notification_window in driver.window_handles:
+            driver.switch_to.window(notification_window)
+            driver.close()
+    finally:
+        driver.switch_to.window(original_tab)
+        timer.lap("close")
+
+    return result
+
+
+# ? Approve everything that can be identified, leave anything else untouched
+DEFAULT_APPROVAL_POLICY = {
+    ApprovalType.CONNECT: ApprovalAction.APPROVE,
+    ApprovalType.TRANSACTION: ApprovalAction.APPROVE,
+    ApprovalType.PERSONAL_SIGN: ApprovalAction.APPROVE,
+    ApprovalType.TYPED_SIGN: ApprovalAction.APPROVE,
+    ApprovalType.ADD_CHAIN: ApprovalAction.APPROVE,
+    ApprovalType.SWITCH_CHAIN: ApprovalAction.APPROVE,
+}
+
+
+def open_notification_window(driver: webdriver, deadline: Deadline) -> str:
+    """
+    Switch to the MetaMask notification popup, opening it if it is not already open.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        deadline (Deadline): Deadline for the whole flow.
+    Returns:
+        str: The window handle of the notification popup.
+    """
+    notification_url = get_metamask_extension_url(driver) + "/notification.html"
+
+    for handle in driver.window_handles:
+        driver.switch_to.window(handle)
+        if driver.current_url.startswith(notification_url):
+            return handle
+
+    # ? No popup open, the notification page lists every pending request anyway
+    driver.switch_to.new_window("window")
+    driver.get(notification_url)
+    wait_for_url(driver, "notification.html", timeout=deadline.remaining())
+
+    return driver.current_window_handle
+
+
+def detect_approval_request(driver: webdriver, deadline: Deadline) -> dict | None:
+    """
+    Identify the approval request shown in the notification popup.
+
+    A rendered screen the script does not recognize is reported as
+    ApprovalType.UNKNOWN, without buttons, instead of being polled until the deadline.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance, switched to the popup.
+        deadline (Deadline): Deadline for the whole flow.
+    Returns:
+        dict | None: "type", "title", "approve" and "reject" keys, or None once the popup closed.
+    """
+    handle = driver.current_window_handle
+
+    def find_request(driver: webdriver) -> dict | bool:
+        if handle not in driver.window_handles:
+            return {"type": None}
+        return run_script(driver, "detectApprovalRequest.js") or False
+
+    wait = WebDriverWait(
+        driver, timeout=deadline.remaining(), poll_frequency=WINDOW_POLL_FREQUENCY
+    )
+
+    try:
+        request = wait.until(find_request)
+    except NoSuchWindowException:
+        return None
+
+    return request if request["type"] else None
+
+
+def handle_pending_approvals(
+    driver: webdriver, policy: dict = None, timeout: float = DEFAULT_TIMEOUT
+) -> list[dict]:
+    """
+    Work through every pending MetaMask approval in a single popup visit.
+
+    The policy maps an ApprovalType to an ApprovalAction, or to a callable
+    taking (driver, request) and returning one. A callable can adjust the
+    request first, e.g. edit the gas fee, before it approves. Requests without
+    a policy entry are skipped and end the visit, as are unrecognized requests
+    unless the policy has an ApprovalType.UNKNOWN entry.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        policy (dict, optional): Action per approval type. Defaults to DEFAULT_APPROVAL_POLICY.
+        timeout (float, optional): Deadline in seconds for the whole visit. Defaults to DEFAULT_TIMEOUT.
+    Returns:
+        list[dict]: One entry per handled request with "type", "title", "action" and "duration" keys.
+    """
+    policy = DEFAULT_APPROVAL_POLICY if policy is None else policy
+    deadline = Deadline(timeout)
+    handled = []
+
+    original_tab = driver.current_window_handle
+
+    try:
+        notification_window = open_notification_window(driver, deadline)
+
+        while notification_window in driver.window_handles:
+            started_at = time.perf_counter()
+            request = detect_approval_request(driver, deadline)
+
+            if not request:
+                break
+
+            action = policy.get(request["type"], ApprovalAction.SKIP)
+            if callable(action):
+                action = action(driver, request)
+
+            if action == ApprovalAction.SKIP:
+                print(f"Skipping {request['type']} request: {request['title']}")
+                break
+
+            button = request[
+                "approve" if action == ApprovalAction.APPROVE else "reject"
+            ]
+            if button is None:
+                print(f"No {action} button for {request['type']} request")
+                break
+
+            button.click()
+            handled.append(
+                {
+                    "type": ApprovalType(request["type"]),
+                    "title": request["title"],
+                    "action": ApprovalAction(action),
+                    "duration": round(time.perf_counter() - started_at, 3),
+                }
+            )
+
+            wait_for_step_change(driver, notification_window, button, deadline)
+    except NoSuchWindowException:
+        # ? MetaMask closes the popup once the queue is empty
+        pass
+    except TimeoutException:
+        print(f"Handling approvals timed out after {timeout}s")
+    finally:
+        driver.switch_to.window(original_tab)
+
+    return handled
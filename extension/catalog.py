@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+CATALOG_INDEX = "catalog.json"
+
+# ? {version}.crx, {version}_{n}.crx or {version}.zip
+ARTIFACT_NAME_PATTERN = re.compile(
+    r"^(?P<version>.+?)(?:_(?P<build>\d+))?\.(?P<format>crx|zip)$"
+)
+
+
+def hash_file(path: str) -> str:
+    """
+    Compute the SHA-256 digest of a file.
+
+    Args:
+        path (str): Path to the file.
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _artifact_rank(artifact_format: str, build: int | None) -> tuple:
+    # ? A plain .crx beats the highest numbered .crx, which beats the release .zip
+    if artifact_format == "crx":
+        return (2, 0) if build is None else (1, build)
+    return (0, 0)
+
+
+class ArtifactCatalog:
+    """
+    Persistent index of the extension artifacts in a directory, by version.
+
+    Each version maps to its best artifact with the format, SHA-256, size,
+    modification time and the unpacked copy once there is one. Resolving a
+    version is a dictionary lookup plus an `os.stat` instead of hashing the
+    artifact. The directory is only listed again when its modification time
+    changes, so artifacts dropped in by hand are still picked up, and an
+    artifact replaced in place is re-hashed and unpacked again.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index_path = os.path.join(directory, CATALOG_INDEX)
+
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+        # ? Best file name per version from the last listing, and the directory mtime it was taken at
+        self._best_files: dict[str, str] = {}
+        self._listed_mtime = None
+
+    def _load(self) -> dict:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+
+        staging_path = f"{self.index_path}.tmp"
+        with open(staging_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(staging_path, self.index_path)
+
+    def _path(self, entry: dict) -> str:
+        return os.path.join(self.directory, entry["file"])
+
+    def _list_best_files(self) -> dict[str, str]:
+        """List the directory again if it changed, and get the best file name of every version."""
+        try:
+            directory_mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            return {}
+
+        with self._lock:
+            if directory_mtime == self._listed_mtime:
+                return self._best_files
+
+        best = {}
+        for file_name in os.listdir(self.directory):
+            match = ARTIFACT_NAME_PATTERN.match(file_name)
+            if not match:
+                continue
+
+            build = int(match["build"]) if match["build"] else None
+            rank = _artifact_rank(match["format"], build)
+
+            if match["version"] not in best or rank > best[match["version"]][0]:
+                best[match["version"]] = (rank, file_name)
+
+        with self._lock:
+            self._best_files = {
+                version: file_name for version, (_, file_name) in best.items()
+            }
+            self._listed_mtime = directory_mtime
+            return self._best_files
+
+    def _is_current(self, entry: dict, file_name: str) -> bool:
+        if entry is None or entry["file"] != file_name:
+            return False
+
+        try:
+            stat = os.stat(self._path(entry))
+        except OSError:
+            return False
+
+        return stat.st_size == entry["size"] and stat.st_mtime_ns == entry.get(
+            "mtime_ns"
+        )
+
+    def get(self, version: str) -> dict | None:
+        """
+        Get the best artifact of a version.
+
+        Args:
+            version (str): Version of the extension.
+        Returns:
+            dict | None: "path", "format", "sha256", "size" and "unpacked_path" (None until unpacked),
+                         or None if there is no artifact for the version.
+        """
+        file_name = self._list_best_files().get(version)
+
+        with self._lock:
+            entry = self._entries.get(version)
+
+        if file_name is None:
+            self.remove(version)
+            return None
+
+        if self._is_current(entry, file_name):
+            return {**entry, "path": self._path(entry)}
+
+        # ? Not indexed yet, replaced in place, or outranked by a newly added file
+        return self.add(version, os.path.join(self.directory, file_name))
+
+    def add(self, version: str, path: str, sha256: str = None) -> dict:
+        """
+        Record an artifact as the one to use for its version.
+
+        Args:
+            version (str): Version of the extension.
+            path (str): Path to the .crx or .zip file, inside the catalog directory.
+            sha256 (str, optional): Digest of the file, computed if omitted.
+        Returns:
+            dict: The catalog entry, with its "path".
+        """
+        stat = os.stat(path)
+        entry = {
+            "file": os.path.relpath(os.path.abspath(path), self.directory),
+            "format": os.path.splitext(path)[1].lstrip("."),
+            "sha256": sha256 or hash_file(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "unpacked_path": None,
+            "added_at": time.time(),
+        }
+
+        with self._lock:
+            self._entries[version] = entry
+            self._save()
+
+        return {**entry, "path": self._path(entry)}
+
+    def set_unpacked(self, version: str, unpacked_path: str) -> None:
+        with self._lock:
+            if version in self._entries:
+                self._entries[version]["unpacked_path"] = unpacked_path
+                self._save()
+
+    def remove(self, version: str) -> None:
+        with self._lock:
+            if self._entries.pop(version, None):
+                self._save()
+
+    def scan_version(self, version: str) -> dict | None:
+        """
+        Find the best artifact of a version on disk and index it.
+
+        Args:
+            version (str): Version of the extension.
+        Returns:
+            dict | None: The new catalog entry, or None if the directory has no artifact for it.
+        """
+        with self._lock:
+            self._listed_mtime = None
+
+        return self.get(version)
+
+    def rebuild(self) -> dict:
+        """Re-index every version in the directory, e.g. after artifacts were removed by hand."""
+        with self._lock:
+            self._entries = {}
+            self._listed_mtime = None
+            self._save()
+
+        for version in sorted(self._list_best_files()):
+            self.get(version)
+
+        with self._lock:
+            return dict(self._entries)
@@ -0,0 +1,417 @@
+import json
+import threading
+import time
+
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from urllib.request import urlopen
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from extension.scripts import SCRIPT_MISSING, SCRIPT_REGISTRY_GLOBAL, script_registry
+from extension.waits import wait_for_element
+
+from utils.constants.values import DEFAULT_TIMEOUT
+from utils.enums.transport import Transport
+
+try:
+    import websocket
+except ImportError:
+    # ? websocket-client is optional, without it every helper uses WebDriver
+    websocket = None
+
+LATENCY_SAMPLE_SIZE = 500
+
+# ? Transport for helpers without an entry in HELPER_TRANSPORTS, CDP is opt-in until measured
+DEFAULT_TRANSPORT = Transport.WEBDRIVER
+
+# ? Helper name -> Transport, e.g. {"add_network_details": Transport.WEBDRIVER}
+HELPER_TRANSPORTS: dict[str, Transport] = {}
+
+
+class CdpError(WebDriverException):
+    """A DevTools command failed or the evaluated script threw."""
+
+
+class CdpSession:
+    """
+    A persistent DevTools websocket to one page target.
+
+    Commands can be sent one at a time or pipelined: every command of a batch
+    is written to the socket before the first response is read, so a batch
+    costs a single round trip.
+    """
+
+    def __init__(self, websocket_url: str, timeout: float = DEFAULT_TIMEOUT):
+        self.websocket_url = websocket_url
+        self.timeout = timeout
+
+        # ? Chrome rejects websocket origins it was not told to allow, send none
+        self._socket = websocket.create_connection(
+            websocket_url, timeout=timeout, suppress_origin=True
+        )
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def send_many(
+        self, commands: list[tuple[str, dict]], timeout: float = None
+    ) -> list[dict]:
+        """
+        Send several commands in one round trip.
+
+        Args:
+            commands (list[tuple[str, dict]]): (method, params) pairs.
+            timeout (float, optional): Seconds to wait for all responses. Defaults to the session timeout.
+        Returns:
+            list[dict]: The result of every command, in order.
+        Raises:
+            CdpError: If any command failed.
+        """
+        with self._lock:
+            self._socket.settimeout(timeout or self.timeout)
+
+            message_ids = []
+            for method, params in commands:
+                self._next_id += 1
+                message_ids.append(self._next_id)
+                self._socket.send(
+                    json.dumps(
+                        {"id": self._next_id, "method": method, "params": params or {}}
+                    )
+                )
+
+            responses = {}
+            while len(responses) < len(message_ids):
+                try:
+                    message = json.loads(self._socket.recv())
+                except websocket.WebSocketTimeoutException:
+                    raise TimeoutException(
+                        f"No DevTools response after {timeout or self.timeout}s"
+                    )
+
+                # ? Events have no ID, no domain is enabled but skip them anyway
+                if message.get("id") in message_ids:
+                    responses[message["id"]] = message
+
+        results = []
+        for message_id in message_ids:
+            response = responses[message_id]
+            if "error" in response:
+                raise CdpError(response["error"].get("message", str(response["error"])))
+            results.append(response.get("result", {}))
+
+        return results
+
+    def send(self, method: str, params: dict = None, timeout: float = None) -> dict:
+        return self.send_many([(method, params)], timeout)[0]
+
+    def evaluate_many(self, expressions: list[str], timeout: float = None) -> list:
+        """
+        Evaluate several expressions in the page in one round trip.
+
+        Promises are awaited and results are returned by value.
+
+        Args:
+            expressions (list[str]): JavaScript expressions.
+            timeout (float, optional): Seconds to wait for all results. Defaults to the session timeout.
+        Returns:
+            list: The value of every expression, in order.
+        Raises:
+            CdpError: If any expression threw.
+        """
+        results = self.send_many(
+            [
+                (
+                    "Runtime.evaluate",
+                    {
+                        "expression": expression,
+                        "awaitPromise": True,
+                        "returnByValue": True,
+                    },
+                )
+                for expression in expressions
+            ],
+            timeout,
+        )
+
+        values = []
+        for result in results:
+            if "exceptionDetails" in result:
+                details = result["exceptionDetails"]
+                description = details.get("exception", {}).get("description")
+                raise CdpError(description or details.get("text", "Script error"))
+            values.append(result["result"].get("value"))
+
+        return values
+
+    def evaluate(self, expression: str, timeout: float = None) -> any:
+        return self.evaluate_many([expression], timeout)[0]
+
+    def close(self) -> None:
+        try:
+            self._socket.close()
+        except Exception:
+            pass
+
+
+class OperationLatencies:
+    """Latency samples per operation and transport, for comparing the two."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLE_SIZE))
+
+    def record(self, operation: str, transport: Transport, seconds: float) -> None:
+        with self._lock:
+            self._samples[(operation, Transport(transport))].append(seconds)
+
+    @contextmanager
+    def measure(self, operation: str, transport: Transport):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(operation, transport, time.perf_counter() - started_at)
+
+    def summary(self) -> dict:
+        """
+        Summarize the recorded latencies.
+
+        Returns:
+            dict: "{operation}:{transport}" -> "count", "mean_ms", "p50_ms" and "p95_ms".
+        """
+        with self._lock:
+            samples = {key: sorted(values) for key, values in self._samples.items()}
+
+        summary = {}
+        for (operation, transport), values in sorted(samples.items()):
+            count = len(values)
+            summary[f"{operation}:{transport}"] = {
+                "count": count,
+                "mean_ms": round(sum(values) / count * 1000, 1),
+                "p50_ms": round(values[count // 2] * 1000, 1),
+                "p95_ms": round(values[min(count - 1, int(count * 0.95))] * 1000, 1),
+            }
+
+        return summary
+
+
+operation_latencies = OperationLatencies()
+
+# ? Open DevTools sessions, keyed by (WebDriver session ID, window handle)
+_cdp_sessions: dict[tuple[str, str], CdpSession] = {}
+_cdp_sessions_lock = threading.Lock()
+
+# ? Transport forced by using_transport() for the current thread
+_transport_override = threading.local()
+
+
+def get_page_websocket_url(driver: webdriver) -> str | None:
+    """
+    Find the DevTools websocket URL of the current window.
+
+    ChromeDriver window handles are DevTools target IDs, so the handle is
+    looked up in the browser's target list.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+    Returns:
+        str | None: The websocket URL, or None if the browser exposes no DevTools endpoint.
+    """
+    debugger_address = driver.capabilities.get("goog:chromeOptions", {}).get(
+        "debuggerAddress"
+    )
+    if not debugger_address:
+        return None
+
+    with urlopen(f"http://{debugger_address}/json/list", timeout=5) as response:
+        targets = json.load(response)
+
+    handle = driver.current_window_handle
+    for target in targets:
+        if target.get("id") == handle and target.get("webSocketDebuggerUrl"):
+            return target["webSocketDebuggerUrl"]
+
+    return None
+
+
+def get_cdp_session(driver: webdriver) -> CdpSession | None:
+    """
+    Get the DevTools session of the current window, connecting on first use.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+    Returns:
+        CdpSession | None: The session, or None if the browser does not support it.
+    """
+    if websocket is None:
+        return None
+
+    key = (driver.session_id, driver.current_window_handle)
+
+    with _cdp_sessions_lock:
+        session = _cdp_sessions.get(key)
+
+    if session is None:
+        try:
+            websocket_url = get_page_websocket_url(driver)
+            if websocket_url is None:
+                return None
+            session = CdpSession(websocket_url)
+        except (OSError, ValueError, websocket.WebSocketException) as e:
+            print(f"DevTools transport unavailable, using WebDriver: {e}")
+            return None
+
+        with _cdp_sessions_lock:
+            session = _cdp_sessions.setdefault(key, session)
+
+    return session
+
+
+def close_cdp_sessions(driver: webdriver = None) -> None:
+    """Close the DevTools sessions of a driver (default: of every driver)."""
+    with _cdp_sessions_lock:
+        keys = [
+            key
+            for key in _cdp_sessions
+            if driver is None or key[0] == driver.session_id
+        ]
+        sessions = [_cdp_sessions.pop(key) for key in keys]
+
+    for session in sessions:
+        session.close()
+
+
+@contextmanager
+def using_transport(transport: Transport):
+    """
+    Run every helper on the current thread with one transport inside a `with` block.
+
+    Args:
+        transport (Transport): Transport to use, overriding HELPER_TRANSPORTS and DEFAULT_TRANSPORT.
+    """
+    previous = getattr(_transport_override, "transport", None)
+    _transport_override.transport = Transport(transport)
+    try:
+        yield
+    finally:
+        _transport_override.transport = previous
+
+
+def get_helper_transport(helper: str = None, transport: Transport = None) -> Transport:
+    if transport is not None:
+        return Transport(transport)
+
+    override = getattr(_transport_override, "transport", None)
+    if override is not None:
+        return override
+
+    return HELPER_TRANSPORTS.get(helper, DEFAULT_TRANSPORT)
+
+
+def run_cdp_script(
+    session: CdpSession, file_name: str, args: dict = None, timeout: float = None
+) -> any:
+    """
+    Run an installed script from `scripts/` over DevTools, by handle.
+
+    Scripts follow the asynchronous convention: they get a callback as their
+    last argument. The bundle is installed in the page on the first miss.
+
+    Args:
+        session (CdpSession): The DevTools session of the page.
+        file_name (str): The name of the JavaScript file to run.
+        args (dict): The arguments to pass to the script.
+        timeout (float, optional): Seconds to wait for the result. Defaults to the session timeout.
+    Returns:
+        any: The value the script passed to its callback.
+    """
+    script_registry.get_handle(file_name)  # ? Fail early on unknown scripts
+
+    arguments = ", ".join(json.dumps(value) for value in (args or {}).values())
+    expression = (
+        f"new Promise((done) => {{"
+        f" const scripts = window.{SCRIPT_REGISTRY_GLOBAL};"
+        f" if (!scripts) {{ done({json.dumps(SCRIPT_MISSING)}); return; }}"
+        f" scripts[{json.dumps(file_name)}]({arguments}{', ' if arguments else ''}done);"
+        f" }})"
+    )
+
+    result = session.evaluate(expression, timeout)
+
+    if result == SCRIPT_MISSING:
+        session.evaluate(script_registry.bundle)
+        result = session.evaluate(expression, timeout)
+
+    return result
+
+
+def perform_actions(
+    driver: webdriver,
+    actions: list[tuple],
+    helper: str = None,
+    transport: Transport = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> int:
+    """
+    Run a chain of DOM actions, each waiting for its element first.
+
+    Actions are ("click", xpath), ("check", xpath) to tick a checkbox if it is
+    not ticked yet, and ("fill", xpath, text) to replace an input's value.
+    Over CDP the whole chain is a single Runtime.evaluate. Over WebDriver every
+    action is a separate find and click or send_keys command.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        actions (list[tuple]): The actions to run, in order.
+        helper (str, optional): Name of the calling helper, used to pick its transport and label its latency.
+        transport (Transport, optional): Transport to use. Defaults to the helper's transport.
+        timeout (float, optional): Seconds to wait for the whole chain. Defaults to DEFAULT_TIMEOUT.
+    Returns:
+        int: The number of actions run.
+    Raises:
+        TimeoutException: If an element did not appear in time.
+    """
+    transport = get_helper_transport(helper, transport)
+    operation = helper or "perform_actions"
+
+    session = get_cdp_session(driver) if transport == Transport.CDP else None
+    if session is None:
+        transport = Transport.WEBDRIVER
+
+    with operation_latencies.measure(operation, transport):
+        if session is not None:
+            result = run_cdp_script(
+                session,
+                "performActions.js",
+                args={
+                    "actions": [list(action) for action in actions],
+                    "timeout_ms": int(timeout * 1000),
+                },
+                timeout=timeout + 5,
+            )
+
+            if result["error"]:
+                raise TimeoutException(result["error"])
+            return result["completed"]
+
+        deadline = time.perf_counter() + timeout
+
+        for action_type, xpath, *value in actions:
+            element = wait_for_element(
+                driver, xpath, timeout=max(deadline - time.perf_counter(), 0.1)
+            )
+
+            if action_type == "click":
+                element.click()
+            elif action_type == "check":
+                if not element.is_selected():
+                    element.click()
+            elif action_type == "fill":
+                element.clear()
+                element.send_keys(str(value[0]))
+            else:
+                raise ValueError(f"Unknown action: {action_type}")
+
+        return len(actions)
@@ -0,0 +1,113 @@
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+from extension.helpers import run_async_script, run_script
+
+from utils.constants.values import DEFAULT_TIMEOUT
+
+DAPP_PAGE = b"""<!DOCTYPE html>
+<html>
+	<head><title>metamask-automation</title></head>
+	<body>metamask-automation local dApp</body>
+</html>
+"""
+
+
+class _DappRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(DAPP_PAGE)))
+        self.end_headers()
+        self.wfile.write(DAPP_PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalDappServer:
+    """
+    Serve a blank page on localhost for MetaMask to inject its provider into.
+
+    Example:
+        with LocalDappServer() as server:
+            driver.get(server.url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), _DappRequestHandler)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "LocalDappServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "LocalDappServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+def start_wallet_request(
+    driver: webdriver, method: str, params: list, timeout: float = DEFAULT_TIMEOUT
+) -> int:
+    """
+    Send an EIP-1193 request from the current page without waiting for its result.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance, on a page MetaMask injects into.
+        method (str): The RPC method, e.g. "wallet_addEthereumChain".
+        params (list): The RPC params.
+        timeout (float, optional): Seconds to wait for the provider to be injected. Defaults to DEFAULT_TIMEOUT.
+    Returns:
+        int: The ID used to collect the result with `await_wallet_request`.
+    """
+    wait = WebDriverWait(driver, timeout=timeout, poll_frequency=0.1)
+    wait.until(lambda driver: run_script(driver, "ethereumProviderReady.js"))
+
+    return run_script(
+        driver, "startWalletRequest.js", args={"method": method, "params": params}
+    )
+
+
+def await_wallet_request(driver: webdriver, request_id: int) -> dict:
+    """
+    Wait for the result of a request sent with `start_wallet_request`.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance, on the page that sent the request.
+        request_id (int): The ID returned by `start_wallet_request`.
+    Returns:
+        dict: Either {"result": ...} or {"error": {"code": ..., "message": ...}}.
+    """
+    return run_async_script(
+        driver, "awaitWalletRequest.js", args={"request_id": request_id}
+    )
+
+
+def get_wallet_request_result(driver: webdriver, request_id: int) -> dict | None:
+    """
+    Read the result of a request sent with `start_wallet_request` without waiting.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance, on the page that sent the request.
+        request_id (int): The ID returned by `start_wallet_request`.
+    Returns:
+        dict | None: The result, or None while the request is still pending.
+    """
+    return run_script(driver, "walletRequestResult.js", args={"request_id": request_id})
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# ? Point at a mirror or a local test server instead of GitHub releases
+RELEASE_BASE_URL = os.environ.get(
+    "METAMASK_RELEASE_BASE_URL",
+    "https://github.com/MetaMask/metamask-extension/releases/download",
+)
+CHECKSUM_MANIFEST = "checksums.json"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ChecksumMismatchError(Exception):
+    """A downloaded archive does not match the checksum recorded for its version."""
+
+
+class ExtensionDownloadCache:
+    """
+    Downloads MetaMask release archives into a directory, safely and at most once.
+
+    An archive is streamed to `{version}.zip.part` and only renamed to
+    `{version}.zip` once it is complete and matches the checksum manifest, so
+    an interrupted download never leaves a corrupt archive behind. The next
+    attempt resumes the partial file with an HTTP Range request. Versions
+    without a recorded checksum are checked to be a readable zip and recorded
+    on first download.
+
+    Example:
+        cache = ExtensionDownloadCache(EXTENSION_DIR)
+        cache.prefetch([SupportedVersion.LATEST, "12.8.1"])
+    """
+
+    def __init__(self, directory: str, base_url: str = None):
+        self.directory = directory
+        self.base_url = (base_url or RELEASE_BASE_URL).rstrip("/")
+        self.manifest_path = os.path.join(directory, CHECKSUM_MANIFEST)
+
+        self._manifest_lock = threading.Lock()
+        self._version_locks = {}
+        self._version_locks_lock = threading.Lock()
+
+    def get_url(self, version: str) -> str:
+        return f"{self.base_url}/v{version}/metamask-chrome-{version}.zip"
+
+    def get_path(self, version: str) -> str:
+        return os.path.join(self.directory, f"{version}.zip")
+
+    def _version_lock(self, version: str) -> threading.Lock:
+        with self._version_locks_lock:
+            return self._version_locks.setdefault(version, threading.Lock())
+
+    def load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _record_checksum(self, version: str, sha256: str, size: int, url: str) -> None:
+        with self._manifest_lock:
+            manifest = self.load_manifest()
+            manifest[version] = {
+                "sha256": sha256,
+                "size": size,
+                "url": url,
+                "downloaded_at": time.time(),
+            }
+
+            staging_path = f"{self.manifest_path}.tmp"
+            with open(staging_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(staging_path, self.manifest_path)
+
+    def is_cached(self, version: str) -> bool:
+        """Whether a complete archive of the version is in the cache."""
+        path = self.get_path(version)
+        if not os.path.exists(path):
+            return False
+
+        expected = self.load_manifest().get(version)
+        if expected:
+            return os.path.getsize(path) == expected["size"]
+
+        # ? Archive from before the manifest existed, only trust it if it is a whole zip
+        return zipfile.is_zipfile(path)
+
+    def download(self, version: str, timeout: float = 100) -> str:
+        """
+        Download the archive of a version unless it is already cached.
+
+        Args:
+            version (str): Version of the MetaMask extension.
+            timeout (float, optional): Seconds to wait for the server between chunks. Defaults to 100.
+        Returns:
+            str: Path to the archive.
+        Raises:
+            ChecksumMismatchError: If the archive does not match its recorded checksum.
+            requests.HTTPError: If the server refused the download.
+        """
+        path = self.get_path(version)
+
+        with self._version_lock(version):
+            if self.is_cached(version):
+                return path
+
+            os.makedirs(self.directory, exist_ok=True)
+
+            url = self.get_url(version)
+            part_path = f"{path}.part"
+            digest = hashlib.sha256()
+            offset = 0
+
+            if os.path.exists(part_path):
+                # ? Resume, the digest has to cover the bytes already on disk
+                with open(part_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                        offset += len(chunk)
+
+            print(f"Retrieving MetaMask version {version} extension from {url}")
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+            with requests.get(
+                url, headers=headers, stream=True, timeout=timeout
+            ) as response:
+                if response.status_code == 416:
+                    # ? Nothing left to fetch, the partial file is already complete
+                    pass
+                else:
+                    response.raise_for_status()
+
+                    if offset and response.status_code != 206:
+                        # ? The server ignored the range, start over
+                        digest = hashlib.sha256()
+                        offset = 0
+
+                    with open(part_path, "ab" if offset else "wb") as f:
+                        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                            digest.update(chunk)
+
+            self._verify(version, part_path, digest.hexdigest(), url)
+            os.replace(part_path, path)
+
+        return path
+
+    def _verify(self, version: str, part_path: str, sha256: str, url: str) -> None:
+        expected = self.load_manifest().get(version)
+
+        if expected and expected["sha256"] != sha256:
+            os.remove(part_path)
+            raise ChecksumMismatchError(
+                f"MetaMask {version} archive has checksum {sha256}, expected {expected['sha256']}"
+            )
+
+        if not expected:
+            if not zipfile.is_zipfile(part_path):
+                os.remove(part_path)
+                raise ChecksumMismatchError(
+                    f"MetaMask {version} download from {url} is not a zip archive"
+                )
+
+            self._record_checksum(version, sha256, os.path.getsize(part_path), url)
+
+    def prefetch(self, versions: list[str], max_workers: int = 4) -> dict[str, str]:
+        """
+        Download several versions at the same time.
+
+        Args:
+            versions (list[str]): Versions of the MetaMask extension.
+            max_workers (int, optional): Downloads to run at once. Defaults to 4.
+        Returns:
+            dict[str, str]: Path to the archive, or the error, keyed by version.
+        """
+        results = {}
+
+        def download(version: str) -> None:
+            try:
+                results[version] = self.download(version)
+            except Exception as e:
+                results[version] = f"{type(e).__name__}: {e}"
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(download, dict.fromkeys(versions)))
+
+        return results
@@ -1,29 +1,125 @@
-import os
-
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from extension.scripts import script_registry
+
 from storage.extension import ExtensionStorage
 
 from utils.enums.developer_mode import DevModeState
 from utils.constants.values import DEFAULT_TIMEOUT
 
+# ? Resolved extension base URLs, keyed by WebDriver session ID
+_extension_base_url_cache: dict[str, str] = {}
+
+# ? Last known URL and dialog state of each tab, keyed by (WebDriver session ID, window handle)
+_page_states: dict[tuple[str, str], dict] = {}
+
+
+def _session_key(driver: webdriver = None) -> str:
+    return getattr(driver, "session_id", None) or "default"
+
+
+def _window_key(driver: webdriver) -> tuple[str, str]:
+    try:
+        handle = driver.current_window_handle
+    except Exception:
+        handle = None
+    return (_session_key(driver), handle)
+
+
+def _forget_page_states(driver: webdriver) -> None:
+    session_key = _session_key(driver)
+    for key in [key for key in _page_states if key[0] == session_key]:
+        _page_states.pop(key, None)
 
-def get_metamask_extension_url() -> str:
-    storage = ExtensionStorage()
-    extension_url = storage.get_extension_base_url("metamask")
-    return extension_url
 
+def cache_extension_base_url(driver: webdriver, extension_base_url: str) -> str:
+    """
+    Cache the resolved extension base URL for a WebDriver session.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance the URL belongs to.
+        extension_base_url (str): The base URL of the extension.
+    Returns:
+        str: The cached base URL.
+    """
+    _extension_base_url_cache[_session_key(driver)] = extension_base_url
+    # ? Session-less lookups must go back to Redis for the new value
+    _extension_base_url_cache.pop("default", None)
+    return extension_base_url
+
+
+def invalidate_extension_cache(driver: webdriver = None) -> None:
+    """
+    Drop cached extension base URLs.
 
-def get_metamask_home_url() -> str:
-    storage = ExtensionStorage()
-    extension_url = storage.get_extension_base_url("metamask")
+    Args:
+        driver (webdriver, optional): Session to invalidate. Invalidates every session if omitted.
+    Returns:
+        None
+    """
+    if driver is None:
+        _extension_base_url_cache.clear()
+        _page_states.clear()
+        script_registry.forget()
+    else:
+        _extension_base_url_cache.pop(_session_key(driver), None)
+        _forget_page_states(driver)
+        script_registry.forget(driver)
+
+
+def get_metamask_extension_url(driver: webdriver = None) -> str:
+    key = _session_key(driver)
+
+    if key not in _extension_base_url_cache:
+        # ? Cold start, resolve from Redis once
+        storage = ExtensionStorage()
+        extension_url = storage.get_extension_base_url("metamask")
+
+        if not extension_url:
+            return extension_url
+
+        _extension_base_url_cache[key] = extension_url
+
+    return _extension_base_url_cache[key]
+
+
+def get_metamask_home_url(driver: webdriver = None) -> str:
+    extension_url = get_metamask_extension_url(driver)
     return extension_url + "/home.html"
 
 
+def get_page_state(driver: webdriver) -> dict:
+    """
+    Get the tracked page state of the focused window.
+
+    State is kept per window handle, so switching to a dApp or notification
+    window never reuses what was recorded for the extension tab.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+    Returns:
+        dict: "url" (last known URL, None if unknown) and "dialog_open" (bool).
+    """
+    return _page_states.setdefault(
+        _window_key(driver), {"url": None, "dialog_open": False}
+    )
+
+
+def invalidate_page_state(driver: webdriver) -> None:
+    """Forget the tracked page state of every window, e.g. after navigating outside of the tracker."""
+    _forget_page_states(driver)
+
+
+def get_driver(locator: WebElement) -> webdriver:
+    """Get the WebDriver behind a locator, which may be the driver itself."""
+    return locator.parent if isinstance(locator, WebElement) else locator
+
+
 def open_dialog(locator: WebElement, trigger: WebElement) -> WebElement:
     wait = WebDriverWait(locator, timeout=DEFAULT_TIMEOUT)
 
@@ -32,6 +128,7 @@ def open_dialog(locator: WebElement, trigger: WebElement) -> WebElement:
     dialog_elem = wait.until(
         EC.presence_of_element_located((By.CSS_SELECTOR, "[role='dialog']"))
     )
+    get_page_state(get_driver(locator))["dialog_open"] = True
 
     return dialog_elem
 
@@ -43,28 +140,60 @@ def close_dialog(locator: WebElement):
         EC.presence_of_element_located((By.XPATH, ".//header//button"))
     )
     close_button.click()
+    get_page_state(get_driver(locator))["dialog_open"] = False
+
+
+def dismiss_dialog(driver: webdriver) -> bool:
+    """
+    Close the open dialog if there still is one, for cleanup after a failed step.
+
+    Never raises, so cleanup cannot hide the error that triggered it.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+    Returns:
+        bool: Whether a dialog was closed.
+    """
+    try:
+        dialogs = driver.find_elements(By.CSS_SELECTOR, "[role='dialog']")
+        if not dialogs:
+            get_page_state(driver)["dialog_open"] = False
+            return False
+
+        close_dialog(dialogs[-1])
+        return True
+    except WebDriverException:
+        return False
 
 
 def run_script(driver: webdriver, file_name: str, args: dict = None) -> any:
     """
     Run a JavaScript script in the browser using a Selenium WebDriver.
+    Scripts are installed in the page once, later calls only send a short handle.
 
     Args:
         driver (webdriver): The Selenium WebDriver instance controlling the browser.
-        path (str): The path to the JavaScript file to run.
+        file_name (str): The name of the JavaScript file to run.
         args (dict): The arguments to pass to the script.
     Returns:
         any: The result of the script execution.
     """
-    with open(
-        os.path.join(os.getcwd(), "scripts", file_name), "r", encoding="utf-8"
-    ) as f:
-        script = f.read()
-    if args:
-        result = driver.execute_script(script, *args.values())
-    else:
-        result = driver.execute_script(script)
-    return result
+    return script_registry.call(driver, file_name, args)
+
+
+def run_async_script(driver: webdriver, file_name: str, args: dict = None) -> any:
+    """
+    Run an asynchronous JavaScript script in the browser using a Selenium WebDriver.
+    The script receives a callback as its last argument and must call it with its result.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        file_name (str): The name of the JavaScript file to run.
+        args (dict): The arguments to pass to the script.
+    Returns:
+        any: The value the script passed to its callback.
+    """
+    return script_registry.call(driver, file_name, args, is_async=True)
 
 
 def toggle_developer_mode(locator: WebElement, to: DevModeState) -> bool:
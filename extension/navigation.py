@@ -0,0 +1,49 @@
+from selenium import webdriver
+
+from extension.helpers import get_metamask_home_url, get_page_state, run_script
+from extension.waits import wait_for_url
+
+
+def navigate_to_route(driver: webdriver, route: str = "") -> str:
+    """
+    Navigate the extension tab to a home.html route, reloading only when needed.
+
+    The tracked state is checked against the browser's current URL, so a tab
+    that was navigated behind the tracker's back is not mistaken for the
+    target. Inside home.html the route is changed through the hash router, so
+    the React app is not reloaded. A full page load is only used when coming
+    from another page or when a dialog is still open.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        route (str, optional): The hash route, e.g. "review-permissions/...". Defaults to the home view.
+    Returns:
+        str: The URL of the route.
+    """
+    home_url = get_metamask_home_url(driver)
+    target_url = f"{home_url}#{route}" if route else home_url
+    state = get_page_state(driver)
+
+    current_url = driver.current_url
+    if state["url"] != current_url:
+        # ? Navigated outside of the tracker, the dialog state is unknown so let the check below look
+        state["url"] = current_url
+        state["dialog_open"] = True
+
+    if state["dialog_open"]:
+        # ? Dialogs close themselves after most actions, check before reloading
+        state["dialog_open"] = run_script(driver, "dialogOpen.js")
+
+    if state["url"] == target_url and not state["dialog_open"]:
+        return target_url
+
+    if state["url"].startswith(home_url) and not state["dialog_open"]:
+        run_script(driver, "setHashRoute.js", args={"route": route})
+    else:
+        driver.get(target_url)
+
+    state["url"] = target_url
+    state["dialog_open"] = False
+
+    wait_for_url(driver, target_url)
+    return target_url
@@ -1,3 +1,5 @@
+import threading
+
 import pyperclip
 
 from selenium import webdriver
@@ -6,7 +8,9 @@ from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from extension.helpers import get_metamask_home_url, run_script
+from extension.cdp import perform_actions
+from extension.helpers import get_metamask_home_url, invalidate_page_state, run_script
+from extension.waits import wait_for_element, wait_for_url
 
 from storage.extension import ExtensionStorage
 from credentials import SecureCredentialStorage
@@ -15,106 +19,93 @@ from utils.constants.prompts import CONFIRM_PASSWORD_TEXT
 from utils.constants.values import DEFAULT_TIMEOUT
 from utils.inputs import get_password
 
+# ? The system clipboard is shared by every browser this process drives
+_clipboard_lock = threading.Lock()
+
+
+def copy_recovery_phrase(driver: webdriver, copy_button_xpath: str) -> str:
+    """
+    Copy the revealed recovery phrase through the system clipboard.
+
+    Onboardings running in parallel share one clipboard, so the clear, copy and
+    paste happen under a lock and the paste waits for this browser's copy to land.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        copy_button_xpath (str): XPath of the "copy to clipboard" button.
+    Returns:
+        str: The recovery phrase.
+    """
+    with _clipboard_lock:
+        pyperclip.copy("")
+        wait_for_element(driver, copy_button_xpath).click()
+
+        wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
+        return wait.until(lambda driver: pyperclip.paste().strip())
+
 
 def onboarding_create_wallet(driver: webdriver, password: str):
     wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
 
     recovery_phrase_confirm_xpath = "//*[@data-testid='onboarding-create-wallet']"
-    create_wallet_button = wait.until(
-        EC.presence_of_element_located((By.XPATH, recovery_phrase_confirm_xpath))
-    )
+    create_wallet_button = wait_for_element(driver, recovery_phrase_confirm_xpath)
 
     if create_wallet_button.is_enabled():
         create_wallet_button.click()
 
     # ? Metametrics section
-    wait.until(EC.url_contains("metametrics"))
+    wait_for_url(driver, "metametrics")
 
     if "metametrics" in driver.current_url:
         recovery_phrase_confirm_xpath = "//*[@data-testid='metametrics-no-thanks']"
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, recovery_phrase_confirm_xpath))
-        ).click()
+        wait_for_element(driver, recovery_phrase_confirm_xpath).click()
 
     # ? Create wallet password section
-    wait.until(EC.url_contains("create-password"))
+    wait_for_url(driver, "create-password")
 
     if "create-password" in driver.current_url:
-        create_password_xpath = "//*[@data-testid='create-password-new']"
-        create_password_input = wait.until(
-            EC.presence_of_element_located((By.XPATH, create_password_xpath))
-        )
-
-        if create_password_input.is_enabled():
-            create_password_input.clear()
-            create_password_input.send_keys(password)
-
-        create_password_confirm_xpath = "//*[@data-testid='create-password-confirm']"
-        create_password_confirm_input = wait.until(
-            EC.presence_of_element_located((By.XPATH, create_password_confirm_xpath))
-        )
-
-        if create_password_confirm_input.is_enabled():
-            create_password_confirm_input.clear()
-            create_password_confirm_input.send_keys(password)
-
-        recovery_phrase_confirm_xpath = "//*[@data-testid='create-password-terms']"
-        create_password_terms_button = wait.until(
-            EC.presence_of_element_located((By.XPATH, recovery_phrase_confirm_xpath))
-        )
-
-        if not create_password_terms_button.is_selected():
-            create_password_terms_button.click()
-
-        create_password_wallet_xpath = "//*[@data-testid='create-password-wallet']"
-        create_password_wallet_button = wait.until(
-            EC.presence_of_element_located((By.XPATH, create_password_wallet_xpath))
+        perform_actions(
+            driver,
+            [
+                ("fill", "//*[@data-testid='create-password-new']", password),
+                ("fill", "//*[@data-testid='create-password-confirm']", password),
+                ("check", "//*[@data-testid='create-password-terms']"),
+                ("click", "//*[@data-testid='create-password-wallet']"),
+            ],
+            helper="onboarding_create_password",
         )
 
-        if create_password_wallet_button.is_enabled():
-            create_password_wallet_button.click()
-
     # ? Secure wallet with secret recovery phrase section
-    wait.until(EC.url_contains("secure-your-wallet"))
+    wait_for_url(driver, "secure-your-wallet")
 
     if "secure-your-wallet" in driver.current_url:
         secure_wallet_xpath = (
             "//*[@data-testid='secure-wallet-recommended']"  # ? yes by default
         )
 
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, secure_wallet_xpath))
-        ).click()
+        wait_for_element(driver, secure_wallet_xpath).click()
 
     # ? Review secret recovery phrase section
-    wait.until(EC.url_contains("review-recovery-phrase"))
+    wait_for_url(driver, "review-recovery-phrase")
 
     if "review-recovery-phrase" in driver.current_url:
         recovery_phrase_reveal_xpath = "//*[@data-testid='recovery-phrase-reveal']"
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, recovery_phrase_reveal_xpath))
-        ).click()
+        wait_for_element(driver, recovery_phrase_reveal_xpath).click()
 
         copy_and_hide_xpath = (
             "//*[@id='app-content']/div/div[2]/div/div/div/div[6]/div/div/a[2]"
         )
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, copy_and_hide_xpath))
-        ).click()
-
-        recovery_phrase = pyperclip.paste()  # ? get the recovery phrase from clipboard
+        recovery_phrase = copy_recovery_phrase(driver, copy_and_hide_xpath)
         print(f"Recovery Phrase: {recovery_phrase}")
         print("Make sure to back it up!")
 
         # ! TODO Save the recovery phrase somewhere safe
 
         next_button_xpath = "//*[@data-testid='recovery-phrase-next']"
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, next_button_xpath))
-        ).click()
+        wait_for_element(driver, next_button_xpath).click()
 
     # ? Confirm secret recovery phrase section
-    wait.until(EC.url_contains("confirm-recovery-phrase"))
+    wait_for_url(driver, "confirm-recovery-phrase")
 
     if "confirm-recovery-phrase" in driver.current_url:
         recovery_words = recovery_phrase.split()
@@ -126,41 +117,38 @@ def onboarding_create_wallet(driver: webdriver, password: str):
         )
 
         recovery_phrase_confirm_xpath = "//*[@data-testid='recovery-phrase-confirm']"
-        recovery_phrase_confirm_button = wait.until(
-            EC.presence_of_element_located((By.XPATH, recovery_phrase_confirm_xpath))
+        recovery_phrase_confirm_button = wait_for_element(
+            driver, recovery_phrase_confirm_xpath
         )
 
         recovery_phrase_confirm_button.click()
 
     # ? Wallet creation completion section
-    wait.until(EC.url_contains("completion"))
+    wait_for_url(driver, "completion")
 
     if "completion" in driver.current_url:
         wrapper_xpath = "//*[@data-testid='creation-successful']"
-        wait.until(EC.presence_of_element_located((By.XPATH, wrapper_xpath)))
+        wait_for_element(driver, wrapper_xpath)
 
         onboarding_complete_done = "//*[@data-testid='onboarding-complete-done']"
 
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, onboarding_complete_done))
-        ).click()
+        wait_for_element(driver, onboarding_complete_done).click()
 
     # ? Pin extension section
-    wait.until(EC.url_contains("pin-extension"))
+    wait_for_url(driver, "pin-extension")
 
     if "pin-extension" in driver.current_url:
-        next_button_xpath = "//*[@data-testid='pin-extension-next']"
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, next_button_xpath))
-        ).click()
-
-        done_button_xpath = "//*[@data-testid='pin-extension-done']"
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, done_button_xpath))
-        ).click()
+        perform_actions(
+            driver,
+            [
+                ("click", "//*[@data-testid='pin-extension-next']"),
+                ("click", "//*[@data-testid='pin-extension-done']"),
+            ],
+            helper="onboarding_pin_extension",
+        )
 
     # ? Back to home section
-    wait.until(EC.url_contains("home"))
+    wait_for_url(driver, "home")
     if "home.html" in driver.current_url:
         wait.until(lambda driver: run_script(driver, "documentReadyState.js"))
         wait.until(lambda driver: run_script(driver, "buttonTooltipClose.js"))
@@ -171,10 +159,44 @@ def onboarding_import_wallet(driver: webdriver, password: str):
     button_xpath = "//*[@data-testid='onboarding-import-wallet']"
 
 
+def unlock_extension(driver: webdriver, password: str) -> webdriver:
+    """
+    Unlock an already onboarded MetaMask wallet, e.g. one restored from a profile template.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        password (str): The wallet password.
+    Returns:
+        webdriver: The WebDriver instance, on the unlocked home view.
+    """
+    home_url = get_metamask_home_url(driver)
+    driver.get(home_url)
+
+    wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
+
+    unlock_password_xpath = "//*[@data-testid='unlock-password']"
+    unlock_password_input = wait.until(
+        EC.presence_of_element_located((By.XPATH, unlock_password_xpath))
+    )
+    unlock_password_input.send_keys(password)
+
+    unlock_submit_xpath = "//*[@data-testid='unlock-submit']"
+    wait.until(EC.element_to_be_clickable((By.XPATH, unlock_submit_xpath))).click()
+
+    wait.until(
+        EC.presence_of_element_located(
+            (By.XPATH, "//*[@data-testid='account-menu-icon']")
+        )
+    )
+    invalidate_page_state(driver)
+
+    return driver
+
+
 def onboard_extension(
-    driver: webdriver, import_with_recovery_phrase: bool = False
+    driver: webdriver, import_with_recovery_phrase: bool = False, password: str = None
 ) -> webdriver:
-    home_url = get_metamask_home_url()
+    home_url = get_metamask_home_url(driver)
     original_window = driver.current_window_handle
     open_window_handles = driver.window_handles
 
@@ -209,7 +231,8 @@ def onboard_extension(
     print("Starting MetaMask onboarding...")
 
     storage = SecureCredentialStorage()
-    password = get_password(CONFIRM_PASSWORD_TEXT)
+    if password is None:
+        password = get_password(CONFIRM_PASSWORD_TEXT)
     verified = storage.verify_credential("metamask", "password_hash", password)
 
     if verified:
@@ -231,4 +254,5 @@ def onboard_extension(
         onboarding_create_wallet(driver, password)
 
     print("Onboarding complete")
+    invalidate_page_state(driver)
     return driver
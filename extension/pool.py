@@ -0,0 +1,303 @@
+import queue
+import threading
+import time
+
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from extension.cdp import close_cdp_sessions
+from extension.helpers import (
+    get_metamask_extension_url,
+    get_metamask_home_url,
+    invalidate_extension_cache,
+    invalidate_page_state,
+    run_script,
+)
+from extension.onboarding import onboard_extension
+from extension.profiles import (
+    create_profile_template,
+    discard_session_profile,
+    has_profile_template,
+    start_from_profile_template,
+)
+from extension.setup import setup_chrome_driver_for_metamask
+
+from storage.extension import ExtensionStorage
+
+from utils.enums.metamask_extension import SupportedVersion
+
+# ? How often a waiting acquire() checks whether the pool can still produce a driver
+ACQUIRE_POLL_INTERVAL = 1
+
+# ? Only one worker should onboard a missing profile template
+_profile_template_lock = threading.Lock()
+
+
+def create_onboarded_driver(
+    metamask_version: str = SupportedVersion.LATEST,
+    headless: bool = False,
+    password: str = None,
+    use_profile_template: bool = False,
+    storage: ExtensionStorage = None,
+) -> webdriver.Chrome:
+    """
+    Start Chrome with MetaMask installed and walk through onboarding.
+
+    Args:
+        metamask_version (str, optional): Version of the MetaMask extension to use. Defaults to SupportedVersion.LATEST.
+        headless (bool, optional): Whether to run Chrome in headless mode. Defaults to False.
+        password (str, optional): Wallet password. Prompted for if omitted.
+        use_profile_template (bool, optional): Start from a clone of the onboarded profile template
+                                               instead of onboarding. Defaults to False.
+        storage (ExtensionStorage, optional): Storage to save the extension ID to. Defaults to the shared storage.
+    Returns:
+        webdriver.Chrome: An onboarded WebDriver instance.
+    """
+    if use_profile_template:
+        with _profile_template_lock:
+            if not has_profile_template(metamask_version):
+                create_profile_template(metamask_version, password, headless)
+
+        return start_from_profile_template(
+            metamask_version, password, headless, storage
+        )
+
+    driver = setup_chrome_driver_for_metamask(
+        options=Options(),
+        service=Service(),
+        metamask_version=metamask_version,
+        headless=headless,
+        storage=storage,
+    )
+
+    try:
+        return onboard_extension(driver, password=password)
+    except Exception:
+        invalidate_extension_cache(driver)
+        close_cdp_sessions(driver)
+        driver.quit()
+        raise
+
+
+class DriverPool:
+    """
+    Keep a number of onboarded MetaMask drivers warm and hand them out on demand.
+
+    Drivers are health-checked when they are returned and recycled after
+    `max_uses` sessions. Replacements are started in the background so that
+    returning a driver never waits on Chrome startup.
+
+    Example:
+        with DriverPool(size=2, password=password) as pool:
+            with pool.session() as driver:
+                import_multichain_accounts(driver, private_keys)
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_uses: int = 50,
+        metamask_version: str = SupportedVersion.LATEST,
+        headless: bool = False,
+        password: str = None,
+        use_profile_template: bool = False,
+        driver_factory=None,
+    ):
+        self.size = size
+        self.max_uses = max_uses
+        self.driver_factory = driver_factory or (
+            lambda: create_onboarded_driver(
+                metamask_version, headless, password, use_profile_template
+            )
+        )
+
+        self._idle = queue.Queue()
+        self._uses = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self) -> "DriverPool":
+        """Start every driver in the pool in parallel and wait until they are warm."""
+        with self._lock:
+            self._pending += self.size
+
+        workers = [
+            threading.Thread(target=self._spawn, daemon=True) for _ in range(self.size)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        if self._idle.empty():
+            raise RuntimeError("Failed to start any driver for the pool")
+
+        return self
+
+    def _spawn(self) -> None:
+        # ? The caller counted this spawn as pending
+        try:
+            driver = self.driver_factory()
+        except Exception as e:
+            print(f"Failed to start pooled driver: {e}")
+            with self._lock:
+                self._pending -= 1
+            return
+
+        with self._lock:
+            self._pending -= 1
+            closed = self._closed
+            if not closed:
+                self._uses[driver.session_id] = 0
+                # ? Under the lock, so close() cannot drain the queue before this lands
+                self._idle.put(driver)
+
+        if closed:
+            self._quit(driver)
+
+    def _retire(self, driver: webdriver) -> None:
+        with self._lock:
+            self._uses.pop(driver.session_id, None)
+
+        self._quit(driver)
+
+    def _quit(self, driver: webdriver) -> None:
+        # ? Never called with self._lock held, quitting Chrome can take seconds
+        invalidate_extension_cache(driver)
+        close_cdp_sessions(driver)
+
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+        discard_session_profile(driver)
+
+    def is_healthy(self, driver: webdriver) -> bool:
+        """
+        Check that a driver is still responsive and put it back on the MetaMask home view.
+
+        Tabs the borrower left open are closed, so a driver returned on a dApp
+        page is reused instead of being replaced by a fresh onboarding.
+
+        Args:
+            driver (webdriver): The WebDriver instance to check.
+        Returns:
+            bool: Whether the driver can be handed out again.
+        """
+        try:
+            first_window, *other_windows = driver.window_handles
+
+            for handle in other_windows:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(first_window)
+
+            if not driver.current_url.startswith(get_metamask_extension_url(driver)):
+                driver.get(get_metamask_home_url(driver))
+                invalidate_page_state(driver)
+
+            return bool(run_script(driver, "documentReadyState.js"))
+        except Exception:
+            return False
+
+    def acquire(self, timeout: float = None) -> webdriver:
+        """
+        Take a warm driver out of the pool.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a free driver. Waits forever if omitted.
+        Returns:
+            webdriver: An onboarded WebDriver instance.
+        Raises:
+            RuntimeError: If the pool is closed, or has no live or starting drivers left to wait for.
+            TimeoutError: If no driver became free in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if not self._uses and not self._pending:
+                    # ? Every spawn failed, nothing will ever be put in the queue
+                    raise RuntimeError("Driver pool has no live or starting drivers")
+
+            wait = ACQUIRE_POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    raise TimeoutError("No warm driver became available in time")
+
+            try:
+                driver = self._idle.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+            with self._lock:
+                self._uses[driver.session_id] = self._uses.get(driver.session_id, 0) + 1
+
+            return driver
+
+    def release(self, driver: webdriver) -> None:
+        with self._lock:
+            uses = self._uses.get(driver.session_id, self.max_uses)
+
+        if self._closed or uses >= self.max_uses or not self.is_healthy(driver):
+            with self._lock:
+                # ? Count the replacement before retiring, so acquire() never sees an empty pool
+                replace = not self._closed
+                if replace:
+                    self._pending += 1
+
+            self._retire(driver)
+
+            if replace:
+                # ? Keep the pool at full size without blocking the caller
+                threading.Thread(target=self._spawn, daemon=True).start()
+            return
+
+        with self._lock:
+            if not self._closed:
+                self._idle.put(driver)
+                return
+            self._uses.pop(driver.session_id, None)
+
+        self._quit(driver)
+
+    @contextmanager
+    def session(self, timeout: float = None):
+        """
+        Borrow a warm driver for the duration of a `with` block.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a free driver. Waits forever if omitted.
+        Yields:
+            webdriver: An onboarded WebDriver instance.
+        """
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+
+        # ? Nothing is put in the queue once closed, so a single drain is enough
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def __enter__(self) -> "DriverPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
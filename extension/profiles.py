@@ -0,0 +1,245 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from extension.cdp import close_cdp_sessions
+from extension.helpers import invalidate_extension_cache
+from extension.onboarding import onboard_extension, unlock_extension
+from extension.setup import setup_chrome_driver_for_metamask
+
+from storage.extension import ExtensionStorage
+
+from utils.constants.prompts import CONFIRM_PASSWORD_TEXT
+from utils.enums.metamask_extension import SupportedVersion
+from utils.inputs import get_password
+
+PROFILE_DIR = os.path.join(os.getcwd(), "profiles")
+PROFILE_TEMPLATE_METADATA = "template.json"
+
+# ? Runtime state Chrome rebuilds on its own, never worth copying
+PROFILE_IGNORED_FILES = (
+    "SingletonLock",
+    "SingletonSocket",
+    "SingletonCookie",
+    "lockfile",
+    "Cache",
+    "Code Cache",
+    "GPUCache",
+    "ShaderCache",
+    "GrShaderCache",
+    "Crashpad",
+)
+
+# ? Profile directories handed out to live sessions, keyed by WebDriver session ID
+_session_profiles: dict[str, str] = {}
+
+
+def get_profile_template_path(version: str) -> str:
+    return os.path.join(PROFILE_DIR, "templates", version)
+
+
+def has_profile_template(version: str) -> bool:
+    return os.path.exists(
+        os.path.join(get_profile_template_path(version), PROFILE_TEMPLATE_METADATA)
+    )
+
+
+def save_profile_template(user_data_dir: str, version: str) -> str:
+    """
+    Save an onboarded Chrome profile as the template for a MetaMask version.
+
+    The browser using `user_data_dir` must have been quit beforehand, otherwise
+    the extension's LevelDB state may be copied half written.
+
+    Args:
+        user_data_dir (str): The Chrome `--user-data-dir` to save.
+        version (str): The MetaMask version the profile was onboarded with.
+    Returns:
+        str: Path to the saved template.
+    """
+    template_path = get_profile_template_path(version)
+    os.makedirs(os.path.dirname(template_path), exist_ok=True)
+
+    # ? Copy next to the final location and swap it in, so readers never see a partial template
+    staging_path = tempfile.mkdtemp(dir=os.path.dirname(template_path))
+    shutil.rmtree(staging_path)
+    shutil.copytree(
+        user_data_dir,
+        staging_path,
+        ignore=shutil.ignore_patterns(*PROFILE_IGNORED_FILES),
+        symlinks=True,
+    )
+
+    with open(
+        os.path.join(staging_path, PROFILE_TEMPLATE_METADATA), "w", encoding="utf-8"
+    ) as f:
+        json.dump({"version": version, "created_at": time.time()}, f)
+
+    if os.path.exists(template_path):
+        shutil.rmtree(template_path)
+    os.rename(staging_path, template_path)
+
+    print(f"Saved MetaMask {version} profile template to {template_path}")
+    return template_path
+
+
+def clone_directory(source: str, destination: str) -> None:
+    """
+    Copy a directory tree, sharing data blocks with the source where the filesystem allows it.
+
+    Uses reflinks on Linux (btrfs, xfs) and clonefile on macOS (APFS), and falls
+    back to a regular copy elsewhere. Hardlinks are deliberately not used: Chrome
+    appends to LevelDB logs in place, which would write through to the template.
+
+    Args:
+        source (str): Directory to copy.
+        destination (str): Path of the copy. Must not exist yet.
+    Returns:
+        None
+    """
+    if sys.platform.startswith("linux"):
+        command = ["cp", "-a", "--reflink=auto", source, destination]
+    elif sys.platform == "darwin":
+        command = ["cp", "-Rc", source, destination]
+    else:
+        command = None
+
+    if command:
+        try:
+            subprocess.run(command, check=True, capture_output=True)
+            return
+        except (OSError, subprocess.CalledProcessError):
+            shutil.rmtree(destination, ignore_errors=True)
+
+    shutil.copytree(source, destination, symlinks=True)
+
+
+def clone_profile_template(version: str, destination: str = None) -> str:
+    """
+    Create a new Chrome profile directory from the template for a MetaMask version.
+
+    Args:
+        version (str): The MetaMask version of the template.
+        destination (str, optional): Path of the new profile. Defaults to a new temporary directory.
+    Returns:
+        str: Path to the cloned profile.
+    Raises:
+        FileNotFoundError: If no template exists for the version.
+    """
+    if not has_profile_template(version):
+        raise FileNotFoundError(f"No profile template found for MetaMask {version}")
+
+    if destination is None:
+        destination = tempfile.mkdtemp(prefix=f"metamask-{version}-")
+        os.rmdir(destination)
+
+    clone_directory(get_profile_template_path(version), destination)
+    return destination
+
+
+def create_profile_template(
+    metamask_version: str = SupportedVersion.LATEST,
+    password: str = None,
+    headless: bool = False,
+) -> str:
+    """
+    Onboard MetaMask in a fresh profile and save that profile as a template.
+
+    Args:
+        metamask_version (str, optional): Version of the MetaMask extension to use. Defaults to SupportedVersion.LATEST.
+        password (str, optional): Wallet password. Prompted for if omitted.
+        headless (bool, optional): Whether to run Chrome in headless mode. Defaults to False.
+    Returns:
+        str: Path to the saved template.
+    """
+    user_data_dir = tempfile.mkdtemp(prefix=f"metamask-{metamask_version}-")
+
+    driver = setup_chrome_driver_for_metamask(
+        options=Options(),
+        service=Service(),
+        metamask_version=metamask_version,
+        headless=headless,
+        user_data_dir=user_data_dir,
+    )
+
+    try:
+        onboard_extension(driver, password=password)
+    finally:
+        invalidate_extension_cache(driver)
+        close_cdp_sessions(driver)
+        driver.quit()
+
+    try:
+        return save_profile_template(user_data_dir, metamask_version)
+    finally:
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+def start_from_profile_template(
+    metamask_version: str = SupportedVersion.LATEST,
+    password: str = None,
+    headless: bool = False,
+    storage: ExtensionStorage = None,
+) -> webdriver.Chrome:
+    """
+    Start Chrome on a clone of the onboarded profile template and unlock the wallet.
+
+    Args:
+        metamask_version (str, optional): Version of the MetaMask extension to use. Defaults to SupportedVersion.LATEST.
+        password (str, optional): Wallet password used when the template was created. Prompted for if omitted.
+        headless (bool, optional): Whether to run Chrome in headless mode. Defaults to False.
+        storage (ExtensionStorage, optional): Storage to save the extension ID to. Defaults to the shared storage.
+    Returns:
+        webdriver.Chrome: An unlocked WebDriver instance.
+    """
+    if password is None:
+        password = get_password(CONFIRM_PASSWORD_TEXT)
+
+    user_data_dir = clone_profile_template(metamask_version)
+
+    try:
+        driver = setup_chrome_driver_for_metamask(
+            options=Options(),
+            service=Service(),
+            metamask_version=metamask_version,
+            headless=headless,
+            user_data_dir=user_data_dir,
+            storage=storage,
+        )
+    except Exception:
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+        raise
+
+    _session_profiles[driver.session_id] = user_data_dir
+
+    try:
+        return unlock_extension(driver, password)
+    except Exception:
+        invalidate_extension_cache(driver)
+        close_cdp_sessions(driver)
+        driver.quit()
+        discard_session_profile(driver)
+        raise
+
+
+def discard_session_profile(driver: webdriver) -> None:
+    """
+    Delete the cloned profile of a session. Call after the driver has quit.
+
+    Args:
+        driver (webdriver): The WebDriver instance the profile was cloned for.
+    Returns:
+        None
+    """
+    user_data_dir = _session_profiles.pop(driver.session_id, None)
+
+    if user_data_dir:
+        shutil.rmtree(user_data_dir, ignore_errors=True)
@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+SCRIPTS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"
+)
+
+# ? Global the installed scripts live under in every page
+SCRIPT_REGISTRY_GLOBAL = "__metamaskAutomationScripts"
+
+# ? Returned by a call handle when the page has not got the scripts installed yet
+SCRIPT_MISSING = "__metamask_automation_script_missing__"
+
+
+def minify_script(source: str) -> str:
+    """
+    Strip comment lines, indentation and blank lines from a script.
+
+    Line breaks are kept so automatic semicolon insertion still applies.
+
+    Args:
+        source (str): The JavaScript source.
+    Returns:
+        str: The minified source.
+    """
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+class ScriptRegistry:
+    """
+    The scripts in `scripts/`, read and minified once and installed in the page once.
+
+    Every script is wrapped in a named function on a page global. The bundle
+    is registered with CDP `Page.addScriptToEvaluateOnNewDocument` so reloads
+    and navigations of the same tab get it for free, and it is evaluated in
+    the current document the first time a call misses. After that a call only
+    sends a short handle that looks the function up by name.
+    """
+
+    def __init__(self, scripts_dir: str = SCRIPTS_DIR):
+        self.scripts_dir = scripts_dir
+        self.sources = {}
+        self._lock = threading.Lock()
+        self._installed_windows = set()
+
+        for file_name in sorted(os.listdir(scripts_dir)):
+            if file_name.endswith(".js"):
+                with open(
+                    os.path.join(scripts_dir, file_name), "r", encoding="utf-8"
+                ) as f:
+                    self.sources[file_name] = minify_script(f.read())
+
+        self.bundle = self._build_bundle()
+        self._handles = {
+            file_name: (
+                self._build_handle(file_name),
+                self._build_handle(file_name, True),
+            )
+            for file_name in self.sources
+        }
+
+    def _build_bundle(self) -> str:
+        functions = ",\n".join(
+            f"{json.dumps(file_name)}: function () {{\n{source}\n}}"
+            for file_name, source in self.sources.items()
+        )
+        return (
+            f"window.{SCRIPT_REGISTRY_GLOBAL} = window.{SCRIPT_REGISTRY_GLOBAL} || {{\n"
+            f"{functions}\n}};"
+        )
+
+    def _build_handle(self, file_name: str, is_async: bool = False) -> str:
+        name = json.dumps(file_name)
+        missing = json.dumps(SCRIPT_MISSING)
+        lookup = f"const scripts = window.{SCRIPT_REGISTRY_GLOBAL};"
+
+        if is_async:
+            return (
+                f"{lookup} if (!scripts) {{ arguments[arguments.length - 1]({missing}); return; }}"
+                f" scripts[{name}].apply(this, arguments);"
+            )
+        return (
+            f"{lookup} if (!scripts) return {missing};"
+            f" return scripts[{name}].apply(this, arguments);"
+        )
+
+    def get_handle(self, file_name: str, is_async: bool = False) -> str:
+        try:
+            return self._handles[file_name][is_async]
+        except KeyError:
+            raise FileNotFoundError(
+                f"No script named {file_name} in {self.scripts_dir}"
+            )
+
+    def install(self, driver: webdriver) -> None:
+        """
+        Install every script in the current document and in future documents of the current window.
+
+        Args:
+            driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        Returns:
+            None
+        """
+        window = (driver.session_id, driver.current_window_handle)
+
+        with self._lock:
+            register = window not in self._installed_windows
+            self._installed_windows.add(window)
+
+        if register:
+            try:
+                driver.execute_cdp_cmd(
+                    "Page.addScriptToEvaluateOnNewDocument", {"source": self.bundle}
+                )
+            except (AttributeError, WebDriverException):
+                # ? Not a Chromium driver, every new document will install on first call
+                pass
+
+        driver.execute_script(self.bundle)
+
+    def forget(self, driver: webdriver = None) -> None:
+        """Forget which windows of a session (default: every session) have the scripts registered."""
+        with self._lock:
+            if driver is None:
+                self._installed_windows.clear()
+                return
+
+            self._installed_windows = {
+                window
+                for window in self._installed_windows
+                if window[0] != driver.session_id
+            }
+
+    def call(
+        self,
+        driver: webdriver,
+        file_name: str,
+        args: dict = None,
+        is_async: bool = False,
+    ) -> any:
+        handle = self.get_handle(file_name, is_async)
+        execute = driver.execute_async_script if is_async else driver.execute_script
+        args = list(args.values()) if args else []
+
+        result = execute(handle, *args)
+
+        if result == SCRIPT_MISSING:
+            self.install(driver)
+            result = execute(handle, *args)
+
+        return result
+
+
+script_registry = ScriptRegistry()
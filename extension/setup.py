@@ -1,6 +1,13 @@
+import base64
+import hashlib
+import json
 import os
 import shutil
-import requests
+import tempfile
+import zipfile
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -9,7 +16,9 @@ from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from extension.helpers import toggle_developer_mode
+from extension.catalog import ArtifactCatalog, hash_file
+from extension.downloads import ExtensionDownloadCache
+from extension.helpers import cache_extension_base_url, toggle_developer_mode
 
 from storage.extension import ExtensionStorage
 
@@ -18,39 +27,23 @@ from utils.enums.metamask_extension import SupportedVersion
 
 
 EXTENSION_DIR = os.path.join(os.getcwd(), "extension_files")
+UNPACKED_EXTENSION_DIR = os.path.join(EXTENSION_DIR, "unpacked")
+MANIFEST_KEY_PATH = os.path.join(EXTENSION_DIR, "manifest_key.pem")
+
+download_cache = ExtensionDownloadCache(EXTENSION_DIR)
+artifact_catalog = ArtifactCatalog(EXTENSION_DIR)
 
 
-def download_metamask_zip(version: str) -> None:
+def download_metamask_zip(version: str) -> str:
     """
     Download the MetaMask extension for a specific version
 
     Args:
         version (str): Version of the MetaMask extension to download
     Returns:
-        None
+        str: Path to the downloaded archive
     """
-
-    url = f"https://github.com/MetaMask/metamask-extension/releases/download/v{version}/metamask-chrome-{version}.zip"
-    print(f"Retrieving MetaMask version {version} extension from {url}")
-
-    extension_path = os.path.join(EXTENSION_DIR, f"{version}.zip")
-
-    if not os.path.exists(EXTENSION_DIR):
-        # ? Create the extension directory if it doesn't exist
-        os.makedirs(EXTENSION_DIR, exist_ok=True)
-
-    if os.path.exists(extension_path):
-        # ? Skip downloading if the extension already exists
-        print(
-            f"MetaMask version {version} extension already exists at location {extension_path}"
-        )
-        return
-
-    with requests.get(url, stream=True, timeout=100) as response:
-        # ? Download the extension
-        response.raise_for_status()
-        with open(extension_path, "wb") as f:
-            shutil.copyfileobj(response.raw, f)
+    return download_cache.download(version)
 
 
 def load_extension_from_file(version: str) -> str:
@@ -62,42 +55,143 @@ def load_extension_from_file(version: str) -> str:
     Returns:
         str: Path to the installed extension.
     """
-    # ? Path: extension/{VERSION}.crx
-    installed_extension_path = os.path.abspath(
-        os.path.join(EXTENSION_DIR, f"{version}.crx")
-    )
+    return get_extension_artifact(version)["path"]
 
-    if not os.path.exists(installed_extension_path):
-        # ? Path: extension/{VERSION}_0.crx
-        crx_files = [f for f in os.listdir(EXTENSION_DIR) if f.endswith(".crx")]
-        version_files = [f for f in crx_files if f.startswith(version)]
 
-        if version_files:
-            highest_version_file = max(
-                version_files, key=lambda x: int(x.split("_")[-1].split(".")[0])
-            )
-            installed_extension_path = os.path.abspath(
-                os.path.join(EXTENSION_DIR, highest_version_file)
-            )
+def get_extension_artifact(version: str) -> dict:
+    """
+    Resolve the best artifact of a version from the catalog, downloading it if there is none.
 
-    if not os.path.exists(installed_extension_path):
-        # ? Path: extension/{VERSION}.zip
-        installed_extension_path = os.path.abspath(
-            os.path.join(EXTENSION_DIR, f"{version}.zip")
-        )
+    Args:
+        version (str): Version of the extension.
+    Returns:
+        dict: The catalog entry, see ArtifactCatalog.get.
+    Raises:
+        FileNotFoundError: If the extension could not be found or downloaded.
+    """
+    artifact = artifact_catalog.get(version)
 
-    if not os.path.exists(installed_extension_path):
+    if artifact is None:
         # ? Download the MetaMask extension
-        download_metamask_zip(version)
+        archive_path = download_metamask_zip(version)
+        checksum = download_cache.load_manifest().get(version, {}).get("sha256")
+        artifact = artifact_catalog.add(version, archive_path, sha256=checksum)
 
-    if not os.path.exists(installed_extension_path):
+    if not os.path.exists(artifact["path"]):
         # ? Raise an error if the extension is not found
         raise FileNotFoundError(
-            f"MetaMask extension not found at location {installed_extension_path}"
+            f"MetaMask extension not found at location {artifact['path']}"
         )
 
-    print(f"Loaded extension from {installed_extension_path}")
-    return installed_extension_path
+    print(f"Loaded extension from {artifact['path']}")
+    return artifact
+
+
+def get_pinned_manifest_key() -> str:
+    """
+    Get the public key pinned into every unpacked extension manifest.
+
+    The key pair is generated once and kept in EXTENSION_DIR, so the extension ID
+    stays the same across versions and launches.
+
+    Returns:
+        str: The base64 encoded DER public key, as used by the manifest "key" field.
+    """
+    if os.path.exists(MANIFEST_KEY_PATH):
+        with open(MANIFEST_KEY_PATH, "rb") as f:
+            private_key = serialization.load_pem_private_key(f.read(), password=None)
+    else:
+        os.makedirs(EXTENSION_DIR, exist_ok=True)
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        with open(MANIFEST_KEY_PATH, "wb") as f:
+            f.write(
+                private_key.private_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PrivateFormat.PKCS8,
+                    encryption_algorithm=serialization.NoEncryption(),
+                )
+            )
+
+    public_key = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return base64.b64encode(public_key).decode("ascii")
+
+
+def get_extension_id_from_key(manifest_key: str) -> str:
+    """
+    Compute the extension ID Chrome assigns to a manifest "key".
+
+    Args:
+        manifest_key (str): The base64 encoded DER public key.
+    Returns:
+        str: The 32 character extension ID.
+    """
+    digest = hashlib.sha256(base64.b64decode(manifest_key)).hexdigest()[:32]
+    # ? Chrome maps each hex digit 0-f onto the letters a-p
+    return "".join(chr(ord("a") + int(c, 16)) for c in digest)
+
+
+def unpack_extension(archive_path: str, sha256: str = None) -> str:
+    """
+    Unpack a .zip or .crx extension into a content-addressed cache directory.
+
+    Each archive is only unpacked once. The pinned manifest key is added if the
+    manifest has none, so the extension ID is known before Chrome starts.
+
+    Args:
+        archive_path (str): Path to the .zip or .crx file.
+        sha256 (str, optional): Digest of the archive, computed if omitted.
+    Returns:
+        str: Path to the unpacked extension.
+    """
+    sha256 = sha256 or hash_file(archive_path)
+    unpacked_path = os.path.join(UNPACKED_EXTENSION_DIR, sha256[:16])
+
+    if os.path.exists(os.path.join(unpacked_path, "manifest.json")):
+        return unpacked_path
+
+    os.makedirs(UNPACKED_EXTENSION_DIR, exist_ok=True)
+    staging_path = tempfile.mkdtemp(dir=UNPACKED_EXTENSION_DIR)
+
+    try:
+        # ? zipfile skips the CRX header in front of the archive on its own
+        with zipfile.ZipFile(archive_path) as archive:
+            archive.extractall(staging_path)
+
+        manifest_path = os.path.join(staging_path, "manifest.json")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if "key" not in manifest:
+            manifest["key"] = get_pinned_manifest_key()
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+
+        os.rename(staging_path, unpacked_path)
+    except Exception:
+        shutil.rmtree(staging_path, ignore_errors=True)
+        if not os.path.exists(os.path.join(unpacked_path, "manifest.json")):
+            raise
+
+    print(f"Unpacked extension {archive_path} to {unpacked_path}")
+    return unpacked_path
+
+
+def get_unpacked_extension_id(unpacked_path: str) -> str | None:
+    """
+    Read the extension ID of an unpacked extension from its manifest key.
+
+    Args:
+        unpacked_path (str): Path to the unpacked extension.
+    Returns:
+        str | None: The extension ID, or None if the manifest has no key.
+    """
+    with open(os.path.join(unpacked_path, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest_key = json.load(f).get("key")
+
+    return get_extension_id_from_key(manifest_key) if manifest_key else None
 
 
 def setup_chrome_driver_for_metamask(
@@ -105,6 +199,9 @@ def setup_chrome_driver_for_metamask(
     service: webdriver.ChromeService,
     metamask_version: str = SupportedVersion.LATEST,
     headless=False,
+    user_data_dir: str = None,
+    unpacked: bool = True,
+    storage: ExtensionStorage = None,
 ) -> webdriver.Chrome:
     """
     Setup Chrome WebDriver with a custom MetaMask extension.
@@ -114,6 +211,9 @@ def setup_chrome_driver_for_metamask(
         service (webdriver.ChromeService): Chrome service to manage the WebDriver.
         metamask_version (str, optional): Version of the MetaMask extension to use. Defaults to SupportedVersion.LATEST.
         headless (bool, optional): Whether to run Chrome in headless mode. Defaults to False.
+        user_data_dir (str, optional): Chrome profile directory to launch with. Defaults to a fresh temporary profile.
+        unpacked (bool, optional): Load the extension from the unpacked cache instead of sending the archive to ChromeDriver. Defaults to True.
+        storage (ExtensionStorage, optional): Storage to save the extension ID to. Defaults to the shared storage.
     Returns:
         webdriver.Chrome: Configured Chrome WebDriver instance.
     Raises:
@@ -121,12 +221,32 @@ def setup_chrome_driver_for_metamask(
     Notes:
         - The function downloads the latest MetaMask extension and configures the Chrome WebDriver to use it.
         - Supports both .crx and .zip extension formats.
+        - Unpacked extensions are cached per archive and loaded with --load-extension.
         - Adds necessary Chrome options for headless mode and disables notifications and GPU.
     """
-    extension_path = load_extension_from_file(metamask_version)
+    artifact = get_extension_artifact(metamask_version)
+    extension_path = artifact["path"]
 
     chrome_options = options
-    chrome_options.add_extension(extension_path)
+
+    if unpacked:
+        unpacked_path = artifact["unpacked_path"]
+
+        if not unpacked_path or not os.path.exists(
+            os.path.join(unpacked_path, "manifest.json")
+        ):
+            unpacked_path = unpack_extension(extension_path, artifact["sha256"])
+            artifact_catalog.set_unpacked(metamask_version, unpacked_path)
+
+        extension_path = unpacked_path
+
+        chrome_options.add_argument(f"--load-extension={extension_path}")
+        # ? Branded Chrome builds ignore --load-extension unless this is turned off
+        chrome_options.add_argument(
+            "--disable-features=DisableLoadExtensionCommandLineSwitch"
+        )
+    else:
+        chrome_options.add_extension(extension_path)
 
     if headless:
         # ? New headless mode for Chrome
@@ -138,8 +258,14 @@ def setup_chrome_driver_for_metamask(
     chrome_options.add_argument("--disable-gpu")  # ? Required for some systems
     chrome_options.add_argument("--no-sandbox")  # ? Required for some Linux systems
 
+    if user_data_dir:
+        # ? Reuse an existing profile, e.g. a clone of an onboarded template
+        chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
+
     driver = webdriver.Chrome(service=service, options=chrome_options)
-    store_extension_id(driver, ExtensionStorage(), "MetaMask")
+    store_extension_id(
+        driver, storage or ExtensionStorage(), "MetaMask", extension_path=extension_path
+    )
 
     return driver
 
@@ -161,16 +287,96 @@ def get_chrome_extensions_manager(locator: WebElement) -> ShadowRoot:
     return extensions_manager.shadow_root
 
 
-def store_extension_id(driver: webdriver, storage, extension_name: str) -> str:
+def get_extension_id_from_path(unpacked_path: str) -> str:
     """
-    Finds the MetaMask extension ID in the browser using a Selenium WebDriver.
+    Compute the extension ID Chrome assigns to an unpacked extension without a manifest key.
+
+    Args:
+        unpacked_path (str): Path to the unpacked extension.
+    Returns:
+        str: The 32 character extension ID.
+    """
+    path = os.path.realpath(unpacked_path)
+
+    if os.name == "nt":
+        # ? Chrome hashes the UTF-16 path with an upper case drive letter on Windows
+        path_bytes = (path[0].upper() + path[1:]).encode("utf-16-le")
+    else:
+        path_bytes = os.fsencode(path)
+
+    digest = hashlib.sha256(path_bytes).hexdigest()[:32]
+    return "".join(chr(ord("a") + int(c, 16)) for c in digest)
+
+
+def resolve_extension_id_offline(extension_path: str) -> str | None:
+    """
+    Resolve an extension ID without starting or querying the browser.
+
+    Args:
+        extension_path (str): Path to an unpacked extension, or to a .zip or .crx archive.
+    Returns:
+        str | None: The extension ID, or None if it cannot be derived offline.
+    """
+    if os.path.isdir(extension_path):
+        extension_id = get_unpacked_extension_id(extension_path)
+        return extension_id or get_extension_id_from_path(extension_path)
+
+    try:
+        with zipfile.ZipFile(extension_path) as archive:
+            manifest_key = json.loads(archive.read("manifest.json")).get("key")
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+    return get_extension_id_from_key(manifest_key) if manifest_key else None
+
+
+def query_extension_id(
+    driver: webdriver, extension_name: str, timeout: int = 10
+) -> str | None:
+    """
+    Find an extension ID from the browser's DevTools targets.
+
     Args:
         driver (webdriver): The Selenium WebDriver instance controlling the browser.
         extension_name (str): The name of the extension to find the ID for.
+        timeout (int, optional): Seconds to wait for the extension to start. Defaults to 10.
     Returns:
-        str: The ID of the MetaMask extension.
+        str | None: The extension ID, or None if no extension target showed up.
+    """
+
+    def find_extension_target(driver: webdriver) -> str | None:
+        targets = driver.execute_cdp_cmd("Target.getTargets", {})["targetInfos"]
+        extension_ids = []
+
+        for target in targets:
+            if not target["url"].startswith("chrome-extension://"):
+                continue
+
+            extension_id = target["url"].split("/")[2]
+            if extension_name.lower() in target["title"].lower():
+                return extension_id
+            extension_ids.append(extension_id)
+
+        # ? Service worker titles are often just the script URL
+        return extension_ids[0] if len(set(extension_ids)) == 1 else None
+
+    try:
+        return WebDriverWait(driver, timeout).until(find_extension_target)
+    except Exception:
+        return None
+
+
+def find_extension_id_in_extensions_page(driver: webdriver, extension_name: str) -> str:
+    """
+    Find an extension ID by walking the chrome://extensions page.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        extension_name (str): The name of the extension to find the ID for.
+    Returns:
+        str: The ID of the extension.
     Raises:
-        Exception: If the MetaMask extension is not found.
+        Exception: If the extension is not found.
     """
 
     extensions_url = None
@@ -200,15 +406,47 @@ def store_extension_id(driver: webdriver, storage, extension_name: str) -> str:
         ext_name = item.shadow_root.find_element(By.ID, "name")
 
         if extension_name in ext_name.text:
-            extension_id = item.get_attribute("id")
-            storage.store_extension(
-                extension_name.lower(), {"extension_id": extension_id}
-            )
-            return extension_id
+            return item.get_attribute("id")
 
     raise Exception("Extension not found")
 
 
+def store_extension_id(
+    driver: webdriver, storage, extension_name: str, extension_path: str = None
+) -> str:
+    """
+    Finds the MetaMask extension ID and stores it.
+
+    The ID is derived offline from the manifest key or unpacked path when
+    possible, then from a single DevTools query, and only as a last resort by
+    walking the chrome://extensions page.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        storage (ExtensionStorage): Storage to save the extension ID to.
+        extension_name (str): The name of the extension to find the ID for.
+        extension_path (str, optional): Path the extension was loaded from.
+    Returns:
+        str: The ID of the MetaMask extension.
+    Raises:
+        Exception: If the MetaMask extension is not found.
+    """
+    extension_id = None
+
+    if extension_path:
+        extension_id = resolve_extension_id_offline(extension_path)
+
+    if not extension_id:
+        extension_id = query_extension_id(driver, extension_name)
+
+    if not extension_id:
+        extension_id = find_extension_id_in_extensions_page(driver, extension_name)
+
+    storage.store_extension(extension_name.lower(), {"extension_id": extension_id})
+    cache_extension_base_url(driver, f"chrome-extension://{extension_id}")
+    return extension_id
+
+
 if __name__ == "__main__":
     from selenium.webdriver.chrome.service import Service
     from selenium.webdriver.chrome.options import Options
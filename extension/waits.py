@@ -0,0 +1,202 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from collections import deque
+
+from selenium import webdriver
+from selenium.common.exceptions import JavascriptException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+from extension.helpers import run_async_script
+from extension.scripts import SCRIPT_REGISTRY_GLOBAL
+
+from utils.constants.values import DEFAULT_TIMEOUT
+
+LATENCY_HISTORY_PATH = os.path.join(os.getcwd(), "wait_latencies.json")
+LATENCY_HISTORY_SIZE = 50
+LATENCY_SAFETY_FACTOR = 4
+MIN_STEP_TIMEOUT = 5
+
+# ? Script errors raised while the page is between documents, worth retrying on the new one
+TRANSIENT_SCRIPT_ERRORS = (
+    "document unloaded",
+    "execution context was destroyed",
+    "cannot find context",
+    SCRIPT_REGISTRY_GLOBAL.lower(),
+)
+
+
+class StepLatencies:
+    """
+    Observed latency of named wait steps, used to size their timeouts.
+
+    A step that has been seen before times out after a multiple of the slowest
+    recent observation instead of the blanket DEFAULT_TIMEOUT. History is kept
+    across runs in a small JSON file.
+    """
+
+    def __init__(self, path: str = LATENCY_HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._dirty = False
+
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for step, samples in json.load(f).items():
+                        self._samples[step] = deque(samples, LATENCY_HISTORY_SIZE)
+            except (OSError, ValueError):
+                pass
+
+    def record(self, step: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(step, deque(maxlen=LATENCY_HISTORY_SIZE))
+            self._samples[step].append(round(seconds, 3))
+            self._dirty = True
+
+    def timeout_for(self, step: str, default: float = DEFAULT_TIMEOUT) -> float:
+        with self._lock:
+            samples = self._samples.get(step)
+
+            if not samples:
+                return default
+
+            timeout = max(samples) * LATENCY_SAFETY_FACTOR
+            return min(max(timeout, MIN_STEP_TIMEOUT), default)
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+
+            history = {step: list(samples) for step, samples in self._samples.items()}
+            self._dirty = False
+
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(history, f)
+        except OSError:
+            pass
+
+
+step_latencies = StepLatencies()
+atexit.register(step_latencies.save)
+
+# ? Sessions that already have a script timeout long enough for any wait
+_prepared_sessions: set[str] = set()
+
+
+def _prepare_session(driver: webdriver) -> None:
+    if driver.session_id not in _prepared_sessions:
+        driver.set_script_timeout(DEFAULT_TIMEOUT + MIN_STEP_TIMEOUT)
+        _prepared_sessions.add(driver.session_id)
+
+
+def _is_transient_script_error(error: JavascriptException) -> bool:
+    message = (error.msg or "").lower()
+    return any(fragment in message for fragment in TRANSIENT_SCRIPT_ERRORS)
+
+
+def _wait_for_script(
+    driver: webdriver, file_name: str, args: dict, step: str, timeout: float
+) -> any:
+    _prepare_session(driver)
+
+    if timeout is None:
+        timeout = step_latencies.timeout_for(step)
+
+    started_at = time.perf_counter()
+    deadline = started_at + timeout
+
+    while True:
+        remaining = deadline - time.perf_counter()
+
+        if remaining <= 0:
+            raise TimeoutException(f"Timed out after {timeout}s waiting for {step}")
+
+        try:
+            result = run_async_script(
+                driver, file_name, args={**args, "timeout_ms": int(remaining * 1000)}
+            )
+        except JavascriptException as e:
+            # ? Bugs in the script fail at once instead of running out the clock
+            if not _is_transient_script_error(e):
+                raise
+
+            # ? The document was replaced while waiting, observe the new one
+            time.sleep(0.05)
+            continue
+
+        if result:
+            step_latencies.record(step, time.perf_counter() - started_at)
+            return result
+
+
+def wait_for_element(
+    driver: webdriver,
+    selector: str,
+    by: str = By.XPATH,
+    step: str = None,
+    timeout: float = None,
+    root: WebElement = None,
+) -> WebElement:
+    """
+    Wait for an element by observing DOM mutations in the page.
+
+    Resolves as soon as the element is attached instead of on the next poll tick.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        selector (str): The XPath or CSS selector of the element.
+        by (str, optional): By.XPATH or By.CSS_SELECTOR. Defaults to By.XPATH.
+        step (str, optional): Name of the step, used to adapt the timeout to earlier runs.
+                              Defaults to the selector.
+        timeout (float, optional): Seconds to wait. Defaults to the adaptive step timeout.
+        root (WebElement, optional): Element to search within. Defaults to the document.
+    Returns:
+        WebElement: The element.
+    Raises:
+        TimeoutException: If the element did not appear in time.
+    """
+    if by not in (By.XPATH, By.CSS_SELECTOR):
+        raise ValueError(f"Unsupported locator strategy: {by}")
+
+    # ? Argument order follows waitForSelector.js, timeout_ms is filled in per attempt
+    args = {
+        "selector": selector,
+        "is_xpath": by == By.XPATH,
+        "timeout_ms": None,
+        "root": root,
+    }
+    return _wait_for_script(
+        driver, "waitForSelector.js", args, step or selector, timeout
+    )
+
+
+def wait_for_url(
+    driver: webdriver, fragment: str, step: str = None, timeout: float = None
+) -> str:
+    """
+    Wait for the page URL to contain a fragment by listening to route changes.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        fragment (str): Text the URL must contain.
+        step (str, optional): Name of the step, used to adapt the timeout to earlier runs.
+                              Defaults to the fragment.
+        timeout (float, optional): Seconds to wait. Defaults to the adaptive step timeout.
+    Returns:
+        str: The matching URL.
+    Raises:
+        TimeoutException: If the URL did not change in time.
+    """
+    # ? Argument order follows waitForUrl.js, timeout_ms is filled in per attempt
+    args = {"fragment": fragment, "timeout_ms": None}
+    return _wait_for_script(
+        driver, "waitForUrl.js", args, step or f"url:{fragment}", timeout
+    )
@@ -1,8 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor
 from getpass import getpass
+
+from eth_account import Account
 from web3 import Web3
 
 from utils.constants.strings import TRIPLE_DOT
 
+# ? Below this many keys the process pool costs more than it saves
+PARALLEL_DERIVATION_THRESHOLD = 64
+
 
 def import_web3_address() -> str:
     while True:
@@ -18,5 +24,95 @@ def import_web3_address() -> str:
             print(f"{e}. Please try again.")
 
 
+def derive_address(private_key: str) -> str | None:
+    """
+    Derive the checksummed address of a private key.
+
+    Args:
+        private_key (str): The private key to derive the address from.
+    Returns:
+        str | None: The address, or None if the key is invalid.
+    """
+    try:
+        return Account.from_key(private_key).address
+    except Exception:
+        return None
+
+
+def derive_addresses(
+    private_keys: list[str], max_workers: int = None
+) -> list[str | None]:
+    """
+    Derive addresses for a list of private keys in a process pool.
+
+    Args:
+        private_keys (list[str]): The private keys to derive addresses from.
+        max_workers (int, optional): Number of worker processes. Defaults to the CPU count.
+    Returns:
+        list[str | None]: One address per key, in input order. Invalid keys map to None.
+    """
+    if len(private_keys) < PARALLEL_DERIVATION_THRESHOLD:
+        return [derive_address(private_key) for private_key in private_keys]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        chunksize = max(1, len(private_keys) // ((max_workers or 4) * 4))
+        return list(executor.map(derive_address, private_keys, chunksize=chunksize))
+
+
+def address_fingerprint(address: str) -> tuple[str, str]:
+    """
+    Reduce an address to the prefix and suffix MetaMask shows in the account list.
+
+    Args:
+        address (str): A full address or a truncated one such as "0x12345...abcde".
+    Returns:
+        tuple[str, str]: The lowercased first 7 and last 5 characters.
+    """
+    return address[:7].lower(), address[-5:].lower()
+
+
+def prepare_private_keys(
+    private_keys: list[str],
+    imported_addresses: list[str] = None,
+    max_workers: int = None,
+) -> list[dict]:
+    """
+    Validate a batch of private keys before any browser work is done.
+
+    Duplicates within the batch are found on the full address. The wallet only
+    shows truncated addresses, so those are matched on their fingerprint.
+
+    Args:
+        private_keys (list[str]): The private keys to import.
+        imported_addresses (list[str], optional): Addresses already in the wallet, full or truncated.
+        max_workers (int, optional): Number of worker processes for address derivation.
+    Returns:
+        list[dict]: One entry per key, in input order, with "private_key", "address" and
+                    "error" keys. Entries with an error must not be imported.
+    """
+    addresses = derive_addresses(private_keys, max_workers=max_workers)
+    imported = {address_fingerprint(address) for address in imported_addresses or []}
+    seen = set()
+    prepared = []
+
+    for private_key, address in zip(private_keys, addresses):
+        error = None
+
+        if not address:
+            error = "Invalid private key"
+        elif address_fingerprint(address) in imported:
+            error = "Account already imported"
+        elif address in seen:
+            error = "Duplicate private key"
+        else:
+            seen.add(address)
+
+        prepared.append(
+            {"private_key": private_key, "address": address, "error": error}
+        )
+
+    return prepared
+
+
 if __name__ == "__main__":
     import_web3_address()
@@ -1,7 +1,9 @@
+import json
+
 from urllib.parse import quote
-from web3 import Web3
 
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -10,78 +12,189 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.remote.webelement import WebElement
 
 from extension.helpers import (
-    get_metamask_extension_url,
-    get_metamask_home_url,
+    _session_key,
+    get_page_state,
+    invalidate_extension_cache,
     open_dialog,
     close_dialog,
+    dismiss_dialog,
+    get_driver,
+    run_async_script,
+    run_script,
+)
+from extension.cdp import close_cdp_sessions, perform_actions
+from extension.approvals import approve_connection, handle_pending_approvals
+from extension.dapp import (
+    LocalDappServer,
+    await_wallet_request,
+    get_wallet_request_result,
+    start_wallet_request,
 )
+from extension.navigation import navigate_to_route
 from extension.onboarding import onboard_extension
 from extension.setup import setup_chrome_driver_for_metamask
+from extension.waits import wait_for_element
+
+from import_keys import address_fingerprint, derive_address, prepare_private_keys
 
 from storage.extension import ExtensionStorage
 
 from utils.constants.values import DEFAULT_TIMEOUT
+from utils.enums.approval import ApprovalAction, ApprovalType
 from utils.enums.metamask_extension import SupportedVersion
 
 
-def import_multichain_account(driver: webdriver, private_key: str) -> str:
-    # ! TODO validate private key
-    account = Web3().eth.account.from_key(private_key)
-    eth_address = account.address
+def add_imported_account(locator: WebElement, private_key: str) -> WebElement:
+    """
+    Import a private key from an open account picker.
 
-    def add_account(locator: WebElement):
-        wait = WebDriverWait(locator, timeout=DEFAULT_TIMEOUT)
+    Args:
+        locator (WebElement): The open account picker dialog.
+        private_key (str): The private key to import.
+    Returns:
+        WebElement: The private key input field, which goes stale once the import completes.
+    """
+    driver = get_driver(locator)
 
-        # ? Click "Add account or hardware wallet"
-        action_button_xpath = (
-            "//*[@data-testid='multichain-account-menu-popover-action-button']"
-        )
+    # ? Click "Add account or hardware wallet"
+    action_button_xpath = (
+        "//*[@data-testid='multichain-account-menu-popover-action-button']"
+    )
 
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, action_button_xpath))
-        ).click()
+    wait_for_element(driver, action_button_xpath).click()
 
-        # ? Select "Import account"
-        add_imported_account_button_xpath = (
-            "//*[@data-testid='multichain-account-menu-popover-add-imported-account']"
-        )
+    # ? Select "Import account"
+    add_imported_account_button_xpath = (
+        "//*[@data-testid='multichain-account-menu-popover-add-imported-account']"
+    )
 
-        wait.until(
-            EC.presence_of_element_located(
-                (By.XPATH, add_imported_account_button_xpath)
-            )
-        ).click()
+    wait_for_element(driver, add_imported_account_button_xpath).click()
 
-        # ? Enter private key string
-        input_field_xpath = "//*[@id='private-key-box']"
-        input_field = wait.until(
-            EC.presence_of_element_located((By.XPATH, input_field_xpath))
-        )
-        input_field.send_keys(private_key)
+    # ? Enter private key string
+    input_field_xpath = "//*[@id='private-key-box']"
+    input_field = wait_for_element(driver, input_field_xpath)
+    input_field.send_keys(private_key)
 
-        # ? Click "Import"
-        import_account_confirm_xpath = (
-            "//*[@data-testid='import-account-confirm-button']"
-        )
+    # ? Click "Import"
+    import_account_confirm_xpath = "//*[@data-testid='import-account-confirm-button']"
 
-        wait.until(
-            EC.presence_of_element_located((By.XPATH, import_account_confirm_xpath))
-        ).click()
+    wait_for_element(driver, import_account_confirm_xpath).click()
+
+    return input_field
+
+
+def import_multichain_account(driver: webdriver, private_key: str) -> str:
+    eth_address = derive_address(private_key)
+
+    if not eth_address:
+        raise ValueError("Invalid private key")
 
     account_picker = open_multichain_account_picker(driver)
-    add_account(account_picker)
+    add_imported_account(account_picker, private_key)
 
     return eth_address
 
 
-def open_multichain_account_picker(driver: webdriver) -> WebElement:
-    home_url = get_metamask_home_url()
+def import_multichain_accounts(
+    driver: webdriver,
+    private_keys: list[str],
+    verify_every: int = 10,
+    import_timeout: int = 10,
+) -> list[dict]:
+    """
+    Import many private keys in a single home view session.
+
+    The home view is loaded once. Each key reuses the account menu button that is
+    already on the page instead of navigating back to home. MetaMask closes the
+    account picker after every accepted import, so keys are submitted one at a
+    time, and the account list is read once every `verify_every` keys to confirm
+    what actually landed in the wallet. A key that fails is reported in its result
+    and the run carries on with the next one.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        private_keys (list[str]): Private keys to import.
+        verify_every (int, optional): Number of keys submitted between account list checks. Defaults to 10.
+        import_timeout (int, optional): Seconds to wait for a single import to complete. Defaults to 10.
+    Returns:
+        list[dict]: One result per key, in input order, with "address", "imported" and "error" keys.
+    """
+    # ? Load the home view once for the whole run
+    account_picker = open_multichain_account_picker(driver)
+    imported_addresses = list_multichain_account_addresses(account_picker)
+    close_dialog(account_picker)
+
+    # ? Drop invalid, duplicate and already imported keys before touching the UI
+    prepared = prepare_private_keys(private_keys, imported_addresses)
+
+    results = [
+        {"address": entry["address"], "imported": False, "error": entry["error"]}
+        for entry in prepared
+    ]
+    pending = [
+        (result, entry["private_key"])
+        for result, entry in zip(results, prepared)
+        if not entry["error"]
+    ]
+
+    if not pending:
+        return results
+
+    wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
+    account_menu_button_xpath = "//*[@data-testid='account-menu-icon']"
+
+    for offset in range(0, len(pending), verify_every):
+        batch = pending[offset : offset + verify_every]
+
+        for result, private_key in batch:
+            try:
+                account_menu_button = wait.until(
+                    EC.element_to_be_clickable((By.XPATH, account_menu_button_xpath))
+                )
+                account_picker = open_dialog(driver, account_menu_button)
+                input_field = add_imported_account(account_picker, private_key)
+
+                # ? The import dialog unmounts once MetaMask accepts the key
+                WebDriverWait(driver, timeout=import_timeout).until(
+                    EC.staleness_of(input_field)
+                )
+                print(f"Importing address {result['address']}...")
+            except Exception as e:
+                result["error"] = f"Import was not accepted: {type(e).__name__}"
+                dismiss_dialog(driver)
 
-    if driver.current_url != home_url:
-        driver.get(home_url)
+        # ? Confirm the batch against a single account list read
+        try:
+            account_menu_button = wait.until(
+                EC.element_to_be_clickable((By.XPATH, account_menu_button_xpath))
+            )
+            account_picker = open_dialog(driver, account_menu_button)
+            account_index = index_multichain_accounts(
+                snapshot_multichain_accounts(account_picker)
+            )
+        except Exception as e:
+            account_index = None
+            verify_error = f"Could not read the account list: {type(e).__name__}"
+
+        for result, _ in batch:
+            if result["error"]:
+                continue
+            if account_index is None:
+                result["error"] = verify_error
+                continue
+            result["imported"] = address_fingerprint(result["address"]) in account_index
+            if not result["imported"]:
+                result["error"] = "Account not found after import"
+
+        dismiss_dialog(driver)
+
+    return results
+
+
+def open_multichain_account_picker(driver: webdriver) -> WebElement:
+    navigate_to_route(driver)
 
     wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
-    wait.until(EC.url_to_be(home_url))
 
     account_menu_button = wait.until(
         EC.presence_of_element_located(
@@ -113,146 +226,143 @@ def list_multichain_account_items(locator: WebElement) -> list[WebElement]:
     return account_list_items
 
 
-def get_multichain_account_index(locator: WebElement, account_address: str) -> int:
-    account_list_items = list_multichain_account_items(locator)
+def snapshot_multichain_accounts(locator: WebElement) -> list[dict]:
+    """
+    Read the whole account list in a single script call.
 
-    for index, account in enumerate(account_list_items):
-        wait = WebDriverWait(account, timeout=DEFAULT_TIMEOUT)
-        account_address_elem = wait.until(
-            EC.presence_of_element_located(
-                (By.XPATH, ".//p[@data-testid='account-list-address']")
-            )
+    Args:
+        locator (WebElement): The open account picker dialog, or the driver itself.
+    Returns:
+        list[dict]: One entry per account with "index", "name", "address" and "element" keys.
+    """
+    driver = get_driver(locator)
+    root = locator if isinstance(locator, WebElement) else None
+
+    wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
+
+    # ? Resolves on the first call once the list is rendered
+    return wait.until(
+        lambda driver: run_script(
+            driver, "multichainAccountSnapshot.js", args={"root": root}
         )
-        if (
-            account_address_elem.text[:7] == account_address[:7]
-            and account_address_elem.text[-5:] == account_address[-5:]
-        ):
-            return index
+    )
+
+
+def index_multichain_accounts(accounts: list[dict]) -> dict[tuple[str, str], int]:
+    return {
+        address_fingerprint(account["address"]): account["index"]
+        for account in accounts
+        if account["address"]
+    }
 
-    return -1
 
+def list_multichain_account_addresses(locator: WebElement) -> list[str]:
+    accounts = snapshot_multichain_accounts(locator)
+    return [account["address"] for account in accounts if account["address"]]
 
-def get_multichain_account_length(locator: WebElement) -> list[WebElement]:
-    multichain_accounts = list_multichain_account_items(locator)
+
+def get_multichain_account_index(locator: WebElement, account_address: str) -> int:
+    accounts = snapshot_multichain_accounts(locator)
+    account_index = index_multichain_accounts(accounts)
+
+    return account_index.get(address_fingerprint(account_address), -1)
+
+
+def get_multichain_account_length(locator: WebElement) -> int:
+    multichain_accounts = snapshot_multichain_accounts(locator)
     return len(multichain_accounts)
 
 
 def switch_account(locator: WebElement, account_address: str) -> str:
-    accounts = list_multichain_account_items(locator)
-    index = get_multichain_account_index(locator, account_address)
-
-    # ? Account list is empty
-    if len(accounts) < index:
-        return None
+    accounts = snapshot_multichain_accounts(locator)
+    index = index_multichain_accounts(accounts).get(
+        address_fingerprint(account_address), -1
+    )
 
     # ? Account not found
     if index == -1:
         return None
 
-    accounts[index].click()
+    accounts[index]["element"].click()
 
     return account_address
 
 
-def add_custom_network(driver: webdriver, network: dict) -> bool:
-    def click_save(wrapper_locator: WebElement) -> bool:
-        wait = WebDriverWait(wrapper_locator, timeout=DEFAULT_TIMEOUT)
-        try:
-            wait.until(
-                EC.presence_of_element_located(
-                    (
-                        By.XPATH,
-                        "/html/body/div[3]/div[3]/div/section/div/div[2]/button",
-                    )
-                )
-            ).click()
-            return True
-        except Exception:
-            return False
+NETWORK_FORM_SAVE_XPATH = "/html/body/div[3]/div[3]/div/section/div/div[2]/button"
 
-    def add_network_details(locator: WebElement) -> bool:
-        wait = WebDriverWait(locator, timeout=DEFAULT_TIMEOUT)
 
-        add_custom_network_xpath = "/html/body/div[3]/div[3]/div/section/div[2]/button"
+def click_network_form_save(wrapper_locator: WebElement) -> bool:
+    wait = WebDriverWait(wrapper_locator, timeout=DEFAULT_TIMEOUT)
+    try:
         wait.until(
-            EC.presence_of_element_located((By.XPATH, add_custom_network_xpath))
+            EC.presence_of_element_located((By.XPATH, NETWORK_FORM_SAVE_XPATH))
         ).click()
+        return True
+    except Exception:
+        return False
 
-        # ? Network name
-        network_name_input = wait.until(
-            EC.presence_of_element_located((By.ID, "networkName"))
-        )
-        network_name_input.send_keys(network["name"])
 
-        # ? Default RPC URL
-        wait.until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//*[@data-testid='test-add-rpc-drop-down']")
-            )
-        ).click()  # ? Click trigger
+def add_network_details(locator: WebElement, network: dict) -> bool:
+    driver = get_driver(locator)
+
+    perform_actions(
+        driver,
+        [
+            ("click", "/html/body/div[3]/div[3]/div/section/div[2]/button"),
+            # ? Network name
+            ("fill", "//*[@id='networkName']", network["name"]),
+            # ? Default RPC URL
+            ("click", "//*[@data-testid='test-add-rpc-drop-down']"),
+            (
+                "click",
+                "/html/body/div[3]/div[3]/div/section/div/div[1]/div[2]/div[2]/div/div/button",
+            ),  # ? Click "Add Custom RPC"
+            ("fill", "//*[@id='rpcUrl']", network["rpc_url"]),
+            ("click", NETWORK_FORM_SAVE_XPATH),
+            # ? Chain ID
+            ("fill", "//*[@id='chainId']", network["chain_id"]),
+            # ? Currency symbol
+            ("fill", "//*[@id='nativeCurrency']", network["currency_symbol"]),
+        ],
+        helper="add_network_details",
+    )
 
-        wait.until(
-            EC.presence_of_element_located(
-                (
-                    By.XPATH,
-                    "/html/body/div[3]/div[3]/div/section/div/div[1]/div[2]/div[2]/div/div/button",
-                )
+    # ? Block Explorer URL
+    if "block_explorer_url" in network and network["block_explorer_url"]:
+        try:
+            perform_actions(
+                driver,
+                [("click", "//*[@data-testid='test-explorer-drop-down']")],
+                helper="add_network_details",
             )
-        ).click()  # ? Click "Add Custom RPC"
-
-        rpc_url_input = wait.until(EC.presence_of_element_located((By.ID, "rpcUrl")))
-        rpc_url_input.send_keys(network["rpc_url"])  # ? Enter RPC URL
-
-        click_save(locator)
-
-        # ? Chain ID
-        chain_id_input = wait.until(EC.presence_of_element_located((By.ID, "chainId")))
-        chain_id_input.send_keys(network["chain_id"])
+        except Exception:
+            return click_network_form_save(locator)
 
-        # ? Currency symbol
-        currency_symbol_input = wait.until(
-            EC.presence_of_element_located((By.ID, "nativeCurrency"))
+        perform_actions(
+            driver,
+            [
+                (
+                    "click",
+                    "/html/body/div[3]/div[3]/div/section/div/div[1]/div[5]/div[2]/div/div/button",
+                ),  # ? Click "Add a block explorer URL"
+                (
+                    "fill",
+                    "//*[@id='additional-rpc-url']",
+                    network["block_explorer_url"],
+                ),
+                ("click", NETWORK_FORM_SAVE_XPATH),
+            ],
+            helper="add_network_details",
         )
-        currency_symbol_input.send_keys(network["currency_symbol"])
-
-        # ? Block Explorer URL
-        if "block_explorer_url" in network and network["block_explorer_url"]:
-            try:
-                wait.until(
-                    EC.presence_of_element_located(
-                        (
-                            By.XPATH,
-                            "//*[@data-testid='test-explorer-drop-down']",
-                        )
-                    )
-                ).click()  # ? Click trigger
-            except Exception:
-                return click_save(locator)
-
-            wait.until(
-                EC.presence_of_element_located(
-                    (
-                        By.XPATH,
-                        "/html/body/div[3]/div[3]/div/section/div/div[1]/div[5]/div[2]/div/div/button",
-                    )
-                )
-            ).click()  # ? Click "Add a block explorer URL"
-
-            block_explorer_url_input = wait.until(
-                EC.presence_of_element_located((By.ID, "additional-rpc-url"))
-            )
-            block_explorer_url_input.send_keys(
-                network["block_explorer_url"]
-            )  # ? Enter block explorer URL
 
-            click_save(locator)
+    return click_network_form_save(locator)
 
-        return click_save(locator)
-
-    network_picker = open_network_picker(driver)
 
+def submit_custom_network(
+    driver: webdriver, network_picker: WebElement, network: dict
+) -> bool:
     try:
-        add_network_details(network_picker)
+        add_network_details(network_picker, network)
 
         wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
 
@@ -264,23 +374,238 @@ def add_custom_network(driver: webdriver, network: dict) -> bool:
 
         if success_notification:
             print(success_notification.text)
+            # ? The extension state has the new chain ID, rebuild on next use
+            invalidate_network_index(driver)
             return True
 
-    except Exception:
-        close_dialog(network_picker)
-        close_dialog(network_picker)
+    except Exception as e:
+        print(f"Failed to add {network['name']}: {type(e).__name__}: {e}")
+        # ? The form replaces the picker inside the same dialog, one close clears both
+        dismiss_dialog(driver)
 
     return False
 
 
-def open_network_picker(driver: webdriver) -> WebElement:
-    home_url = get_metamask_home_url()
+def get_add_chain_params(network: dict) -> dict:
+    """
+    Convert a network dict into wallet_addEthereumChain params.
+
+    Args:
+        network (dict): Network with "name", "rpc_url", "chain_id", "currency_symbol" and
+                        optionally "block_explorer_url" keys.
+    Returns:
+        dict: The EIP-3085 chain parameters.
+    """
+    params = {
+        "chainId": hex(int(str(network["chain_id"]), 0)),
+        "chainName": network["name"],
+        "rpcUrls": [network["rpc_url"]],
+        "nativeCurrency": {
+            "name": network["currency_symbol"],
+            "symbol": network["currency_symbol"],
+            "decimals": 18,
+        },
+    }
+
+    if network.get("block_explorer_url"):
+        params["blockExplorerUrls"] = [network["block_explorer_url"]]
+
+    return params
+
+
+def close_windows_except(driver: webdriver, keep_handles: list[str]) -> None:
+    for handle in driver.window_handles:
+        if handle in keep_handles:
+            continue
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except WebDriverException:
+            pass
 
-    if driver.current_url != home_url:
-        driver.get(home_url)
+
+def request_add_chain(
+    driver: webdriver, network: dict, policy: dict, timeout: float
+) -> dict:
+    """Send one wallet_addEthereumChain request from the dApp tab and approve it."""
+    window_handles = driver.window_handles
+    request_id = start_wallet_request(
+        driver, "wallet_addEthereumChain", [get_add_chain_params(network)]
+    )
+
+    # ? Known chains settle without a popup
+    wait = WebDriverWait(driver, timeout=timeout, poll_frequency=0.1)
+    wait.until(
+        lambda driver: len(driver.window_handles) > len(window_handles)
+        or get_wallet_request_result(driver, request_id)
+    )
+
+    if len(driver.window_handles) > len(window_handles):
+        handle_pending_approvals(driver, policy, timeout=timeout)
+
+    return await_wallet_request(driver, request_id)
+
+
+def add_networks_via_rpc(
+    driver: webdriver, networks: list[dict], timeout: float = DEFAULT_TIMEOUT
+) -> dict:
+    """
+    Add networks by sending wallet_addEthereumChain requests from a local dApp page.
+
+    MetaMask rejects a second request of the same kind while one is pending for
+    an origin, so requests are sent one after another. Each add and the switch
+    prompt that follows it are approved in a single popup visit.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        networks (list[dict]): Networks to add.
+        timeout (float, optional): Deadline in seconds per network. Defaults to DEFAULT_TIMEOUT.
+    Returns:
+        dict: Status per network name, either "added" or "failed".
+    """
+    policy = {
+        ApprovalType.ADD_CHAIN: ApprovalAction.APPROVE,
+        ApprovalType.SWITCH_CHAIN: ApprovalAction.APPROVE,
+    }
+    results = {}
+
+    original_tab = driver.current_window_handle
+    known_handles = driver.window_handles
+
+    with LocalDappServer() as server:
+        driver.switch_to.new_window("tab")
+        dapp_tab = driver.current_window_handle
+
+        try:
+            driver.get(server.url)
+
+            for network in networks:
+                try:
+                    response = request_add_chain(driver, network, policy, timeout)
+                except Exception as e:
+                    response = {"error": f"{type(e).__name__}: {e}"}
+                    # ? A popup left open keeps the request pending and blocks the next one
+                    close_windows_except(driver, [*known_handles, dapp_tab])
+                finally:
+                    driver.switch_to.window(dapp_tab)
+
+                if "error" in response:
+                    print(f"Failed to add {network['name']}: {response['error']}")
+                    results[network["name"]] = "failed"
+                else:
+                    results[network["name"]] = "added"
+                    invalidate_network_index(driver)
+        finally:
+            # ? The dApp tab and any popup this run left open
+            close_windows_except(driver, known_handles)
+            driver.switch_to.window(original_tab)
+
+    return results
+
+
+def add_custom_network(driver: webdriver, network: dict, engine: str = "ui") -> bool:
+    if engine == "rpc":
+        return add_networks_via_rpc(driver, [network])[network["name"]] == "added"
+
+    network_picker = open_network_picker(driver)
+    return submit_custom_network(driver, network_picker, network)
+
+
+def load_networks(source: list[dict] | str) -> list[dict]:
+    """
+    Load a declarative network list.
+
+    Args:
+        source (list[dict] | str): A list of networks, or the path to a JSON or YAML file holding one.
+    Returns:
+        list[dict]: Networks with "name", "rpc_url", "chain_id", "currency_symbol" and
+                    optionally "block_explorer_url" keys.
+    """
+    if not isinstance(source, str):
+        return list(source)
+
+    with open(source, "r", encoding="utf-8") as f:
+        if source.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("Loading YAML network lists requires PyYAML") from e
+
+            networks = yaml.safe_load(f)
+        else:
+            networks = json.load(f)
+
+    # ? Allow either a bare list or {"networks": [...]}
+    if isinstance(networks, dict):
+        networks = networks.get("networks", [])
+
+    return networks
+
+
+def add_custom_networks(
+    driver: webdriver, networks: list[dict] | str, engine: str = "ui"
+) -> dict:
+    """
+    Add every network of a declarative list that the wallet does not have yet.
+
+    Existing networks are read once up front from the network index. The home view is loaded once and
+    the network picker is reopened in place for each network.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        networks (list[dict] | str): Networks to add, or the path to a JSON or YAML file.
+        engine (str, optional): "ui" to fill in the add network form, or "rpc" to send
+                                wallet_addEthereumChain requests. Defaults to "ui".
+    Returns:
+        dict: Status per network name, one of "added", "skipped" or "failed".
+    """
+    networks = load_networks(networks)
+
+    network_picker = open_network_picker(driver)
+    existing_networks = set(get_network_index(driver))
+    close_dialog(network_picker)
+
+    results = {}
+    pending_networks = []
+
+    for network in networks:
+        if network["name"] in existing_networks:
+            results[network["name"]] = "skipped"
+        else:
+            existing_networks.add(network["name"])
+            pending_networks.append(network)
+
+    if engine == "rpc":
+        results.update(add_networks_via_rpc(driver, pending_networks))
+        return results
+
+    wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
+    network_display_xpath = "//*[@data-testid='network-display']"
+
+    for network in pending_networks:
+        try:
+            network_display_button = wait.until(
+                EC.element_to_be_clickable((By.XPATH, network_display_xpath))
+            )
+            network_picker = open_dialog(driver, network_display_button)
+        except Exception as e:
+            print(f"Failed to open the network picker for {network['name']}: {e}")
+            dismiss_dialog(driver)
+            results[network["name"]] = "failed"
+            continue
+
+        if submit_custom_network(driver, network_picker, network):
+            results[network["name"]] = "added"
+        else:
+            results[network["name"]] = "failed"
+
+    return results
+
+
+def open_network_picker(driver: webdriver) -> WebElement:
+    navigate_to_route(driver)
 
     wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
-    wait.until(EC.url_to_be(home_url))
 
     network_display_button = wait.until(
         EC.presence_of_element_located(
@@ -292,18 +617,81 @@ def open_network_picker(driver: webdriver) -> WebElement:
     return picker
 
 
+NETWORK_LIST_ITEMS_XPATH = (
+    "/html/body/div[3]/div[3]/div/section/div[1]/div[3]/div[2]//p"
+)
+
+# ? Network name -> {"index", "chain_id"}, keyed by WebDriver session ID
+_network_index_cache: dict[str, dict[str, dict]] = {}
+
+
 def list_network_items(locator: WebElement) -> list[WebElement]:
     wait = WebDriverWait(locator, timeout=DEFAULT_TIMEOUT)
 
     network_list_items = wait.until(
-        EC.presence_of_all_elements_located(
-            (By.XPATH, "/html/body/div[3]/div[3]/div/section/div[1]/div[3]/div[2]//p")
-        )
+        EC.presence_of_all_elements_located((By.XPATH, NETWORK_LIST_ITEMS_XPATH))
     )
 
     return network_list_items
 
 
+def get_network_index(driver: webdriver) -> dict[str, dict]:
+    """
+    Get the index of networks in the network picker, building it with one script call if needed.
+
+    Names and positions come from the open picker, chain IDs from the network
+    configurations the extension persisted, so networks that were preinstalled
+    or added elsewhere get their chain ID too. The network picker must be open
+    when the index is not cached yet.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+    Returns:
+        dict[str, dict]: Network name -> {"index": position in the picker, "chain_id": hex chain ID,
+                         None if the extension state does not list the network}.
+    """
+    session_key = _session_key(driver)
+
+    if session_key not in _network_index_cache:
+        wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
+        network_names = wait.until(
+            lambda driver: run_script(
+                driver,
+                "networkListSnapshot.js",
+                args={"items_xpath": NETWORK_LIST_ITEMS_XPATH},
+            )
+        )
+
+        chain_ids = get_network_chain_ids(driver)
+
+        _network_index_cache[session_key] = {
+            name: {"index": index, "chain_id": chain_ids.get(name)}
+            for index, name in enumerate(network_names)
+        }
+
+    return _network_index_cache[session_key]
+
+
+def get_network_chain_ids(driver: webdriver) -> dict[str, str]:
+    """
+    Read the chain ID of every configured network from the extension's persisted state.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance, on an extension page.
+    Returns:
+        dict[str, str]: Network name -> hex chain ID, empty if the state could not be read.
+    """
+    try:
+        return run_async_script(driver, "networkChainIds.js") or {}
+    except WebDriverException as e:
+        print(f"Could not read network chain IDs: {e}")
+        return {}
+
+
+def invalidate_network_index(driver: webdriver) -> None:
+    _network_index_cache.pop(_session_key(driver), None)
+
+
 def current_network_status(locator: WebElement) -> str:
     wait = WebDriverWait(locator, timeout=DEFAULT_TIMEOUT)
 
@@ -325,97 +713,55 @@ def current_network_status(locator: WebElement) -> str:
 
 
 def switch_to_network(driver: webdriver, network_name: str) -> str:
-    home_url = get_metamask_home_url()
-
-    if driver.current_url != home_url:
-        driver.get(home_url)
+    navigate_to_route(driver)
 
-    wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
-    wait.until(EC.url_to_be(home_url))
+    # ? Already there, skip the picker entirely
+    connected_network = current_network_status(driver)
+    if connected_network == network_name:
+        return connected_network
 
     network_picker = open_network_picker(driver)
-    network_list_items = list_network_items(network_picker)
 
-    network_to_select = None
+    for _ in range(2):
+        network = get_network_index(driver).get(network_name)
 
-    for network_item in network_list_items:
-        if network_item.text == network_name:
-            network_to_select = network_item
+        if not network:
+            break
 
-    if not network_to_select:
-        print("Network not found")
-        close_dialog(network_picker)
-        return current_network_status(driver)
+        clicked = run_script(
+            driver,
+            "clickNetworkListItem.js",
+            args={
+                "items_xpath": NETWORK_LIST_ITEMS_XPATH,
+                "index": network["index"],
+                "name": network_name,
+            },
+        )
+
+        if clicked:
+            return current_network_status(driver)
 
-    network_to_select.click()
+        # ? The list changed under a stale index, rebuild it once
+        invalidate_network_index(driver)
 
+    print("Network not found")
+    close_dialog(network_picker)
     return current_network_status(driver)
 
 
 def connect_account_to_dapp(driver: webdriver, connect_trigger: WebElement) -> bool:
-    wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
-
-    original_tab = driver.current_window_handle
-    window_handles = driver.window_handles
-
     if not connect_trigger:
         return False
 
-    connect_trigger.click()
-
-    wait.until(lambda driver: len(driver.window_handles) == len(window_handles) + 1)
-
-    metamask_notification_tab = driver.window_handles[-1]
-    driver.switch_to.window(metamask_notification_tab)
-
-    extension_url = get_metamask_extension_url()
-    wait.until(EC.url_contains(extension_url + "/notification.html"))
-
-    try:
-        driver.implicitly_wait(DEFAULT_TIMEOUT)
-
-        for _ in range(500):
-            try:
-                if driver.find_element(By.CLASS_NAME, "permissions-connect"):
-                    connect_page = driver.find_element(
-                        By.XPATH, "//*[@data-testid='connect-page']"
-                    )
-
-                    action_prompt = connect_page.find_element(By.TAG_NAME, "h2")
-                    print(f"Action: {action_prompt.text}")
+    result = approve_connection(driver, connect_trigger)
+    print(f"Connection approval timings: {result['timings']}")
 
-                    connect_confirm_button = connect_page.find_element(
-                        By.XPATH, "//*[@data-testid='confirm-btn']"
-                    )
-
-                    connect_confirm_button.click()
-
-                    return True
-            except Exception:
-                pass
-            driver.implicitly_wait(DEFAULT_TIMEOUT)
-
-        driver.close()
-        return False
-    except Exception:
-        driver.close()
-        return False
-    finally:
-        driver.switch_to.window(original_tab)
-        wait.until(lambda driver: len(driver.window_handles) == len(window_handles))
+    return result["approved"]
 
 
 def disconnect_dapp_permission(driver: webdriver, site_url: str):
-    home_url = get_metamask_home_url()
-
     site_url = quote(site_url, safe="")
-    review_permissions_url = f"{home_url}#review-permissions/{site_url}"
-
-    if driver.current_url != review_permissions_url:
-        driver.get(review_permissions_url)
-
-    wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
-    wait.until(EC.url_to_be(review_permissions_url))
+    navigate_to_route(driver, f"review-permissions/{site_url}")
 
     is_connected = False
 
@@ -459,6 +805,7 @@ def disconnect_dapp_permission(driver: webdriver, site_url: str):
             EC.presence_of_element_located((By.XPATH, ".//button"))
         )
         disconnect_all_button.click()
+        get_page_state(driver)["dialog_open"] = True
 
 
 if __name__ == "__main__":
@@ -476,12 +823,8 @@ if __name__ == "__main__":
         onboard_extension(driver)
 
         private_keys = []  # * Add private keys here
-        addresses = []
-
-        for private_key in private_keys:
-            address = import_multichain_account(driver, private_key)
-            print(f"Importing address {address}...")
-            addresses.append(address)
+        results = import_multichain_accounts(driver, private_keys)
+        addresses = [result["address"] for result in results if result["imported"]]
 
         print(f"Imported {len(addresses)} addresses")
 
@@ -493,7 +836,11 @@ if __name__ == "__main__":
 
         # ! Implement your logic here
 
+        invalidate_extension_cache(driver)
+        close_cdp_sessions(driver)
         driver.quit()
     except KeyboardInterrupt:
+        invalidate_extension_cache(driver)
+        close_cdp_sessions(driver)
         driver.quit()
         quit()
@@ -0,0 +1,243 @@
+import os
+import queue
+import threading
+import time
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from extension.cdp import close_cdp_sessions
+from extension.helpers import invalidate_extension_cache
+from extension.pool import create_onboarded_driver
+from extension.profiles import discard_session_profile
+
+from metamask_automation import (
+    add_custom_network,
+    connect_account_to_dapp,
+    current_network_status,
+    import_multichain_accounts,
+    switch_to_network,
+)
+
+from storage.extension import ExtensionStorage
+
+from utils.constants.values import DEFAULT_TIMEOUT
+from utils.enums.metamask_extension import SupportedVersion
+
+
+def connect_to_dapp(driver: webdriver, url: str, trigger_xpath: str) -> bool:
+    """
+    Open a dApp in a new tab, connect the current account to it and close the tab.
+
+    Args:
+        driver (webdriver): The Selenium WebDriver instance controlling the browser.
+        url (str): URL of the dApp.
+        trigger_xpath (str): XPath of the dApp's connect button.
+    Returns:
+        bool: Whether the connection was approved.
+    """
+    extension_tab = driver.current_window_handle
+    driver.switch_to.new_window("tab")
+
+    try:
+        driver.get(url)
+
+        wait = WebDriverWait(driver, timeout=DEFAULT_TIMEOUT)
+        connect_trigger = wait.until(
+            EC.element_to_be_clickable((By.XPATH, trigger_xpath))
+        )
+
+        return connect_account_to_dapp(driver, connect_trigger)
+    finally:
+        driver.close()
+        driver.switch_to.window(extension_tab)
+
+
+# ? Job type -> handler(driver, **params)
+JOB_HANDLERS = {
+    "import_keys": import_multichain_accounts,
+    "add_network": add_custom_network,
+    "switch_network": switch_to_network,
+    "network_status": current_network_status,
+    "connect_dapp": connect_to_dapp,
+}
+
+
+class WalletOrchestrator:
+    """
+    Run wallet jobs across several Chrome workers at once.
+
+    Every worker owns one browser and its own ExtensionStorage namespace. Jobs
+    are dicts such as {"type": "import_keys", "params": {"private_keys": [...]}}.
+    The "create_wallet" job replaces the worker's browser with a freshly
+    onboarded one. Submitting blocks once `queue_size` jobs are waiting, so a
+    producer can never run far ahead of the browsers.
+
+    Example:
+        with WalletOrchestrator(workers=4, password=password) as orchestrator:
+            results = orchestrator.run(jobs)
+    """
+
+    def __init__(
+        self,
+        workers: int = max(1, (os.cpu_count() or 2) // 2),
+        queue_size: int = None,
+        metamask_version: str = SupportedVersion.LATEST,
+        headless: bool = True,
+        password: str = None,
+        use_profile_template: bool = False,
+        driver_factory=None,
+    ):
+        self.workers = workers
+        self.driver_factory = driver_factory or (
+            lambda storage: create_onboarded_driver(
+                metamask_version, headless, password, use_profile_template, storage
+            )
+        )
+
+        self._jobs = queue.Queue(maxsize=queue_size or workers * 2)
+        self._results = queue.Queue()
+        self._threads = []
+        self._submitted = 0
+        self._collected = 0
+
+    def start(self) -> "WalletOrchestrator":
+        for worker_id in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(worker_id,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        return self
+
+    def _new_driver(self, storage: ExtensionStorage) -> webdriver:
+        return self.driver_factory(storage)
+
+    def _discard_driver(self, driver: webdriver) -> None:
+        if driver is None:
+            return
+
+        invalidate_extension_cache(driver)
+        close_cdp_sessions(driver)
+
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+        discard_session_profile(driver)
+
+    def _work(self, worker_id: int) -> None:
+        storage = ExtensionStorage(namespace=f"worker-{worker_id}")
+        driver = None
+
+        while True:
+            item = self._jobs.get()
+
+            if item is None:
+                break
+
+            index, job = item
+            started_at = time.perf_counter()
+            result = {"index": index, "job": job, "worker": worker_id}
+
+            try:
+                if job["type"] == "create_wallet":
+                    self._discard_driver(driver)
+                    driver = None
+
+                if driver is None:
+                    driver = self._new_driver(storage)
+
+                if job["type"] == "create_wallet":
+                    result["result"] = True
+                else:
+                    handler = JOB_HANDLERS[job["type"]]
+                    result["result"] = handler(driver, **job.get("params", {}))
+
+                result["error"] = None
+            except Exception as e:
+                result["result"] = None
+                result["error"] = f"{type(e).__name__}: {e}"
+
+            result["duration"] = time.perf_counter() - started_at
+            self._results.put(result)
+
+        self._discard_driver(driver)
+
+    def submit(self, job: dict) -> int:
+        """
+        Queue a job, blocking while the job queue is full.
+
+        Args:
+            job (dict): The job to run, with "type" and optional "params" keys.
+        Returns:
+            int: The index of the job, used to match it to its result.
+        Raises:
+            ValueError: If the job type is unknown.
+        """
+        self._validate(job)
+
+        index = self._submitted
+        self._jobs.put((index, job))
+        self._submitted += 1
+        return index
+
+    def _validate(self, job: dict) -> None:
+        if job["type"] != "create_wallet" and job["type"] not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job type: {job['type']}")
+
+    def results(self):
+        """Yield results as workers finish them, until every submitted job is done."""
+        while self._collected < self._submitted:
+            result = self._results.get()
+            self._collected += 1
+            yield result
+
+    def run(self, jobs: list[dict]) -> list[dict]:
+        """
+        Run a list of jobs and wait for all of them.
+
+        Args:
+            jobs (list[dict]): The jobs to run.
+        Returns:
+            list[dict]: One result per job, in job order, with "result", "error",
+                        "worker" and "duration" keys.
+        Raises:
+            ValueError: If any job type is unknown.
+            RuntimeError: If results of earlier submitted jobs were not collected yet.
+        """
+        if self._collected != self._submitted:
+            # ? Their results share the queue and would be mixed into this batch
+            raise RuntimeError(
+                "Collect the results of submitted jobs before calling run()"
+            )
+
+        for job in jobs:
+            self._validate(job)
+
+        # ? Submit from a separate thread so backpressure can't deadlock the collector
+        producer = threading.Thread(
+            target=lambda: [self.submit(job) for job in jobs], daemon=True
+        )
+        producer.start()
+
+        collected = [self._results.get() for _ in jobs]
+        self._collected += len(collected)
+        producer.join()
+
+        return sorted(collected, key=lambda result: result["index"])
+
+    def close(self) -> None:
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self) -> "WalletOrchestrator":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
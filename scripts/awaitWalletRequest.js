@@ -0,0 +1,6 @@
+"use strict";
+
+const [requestId] = arguments;
+const done = arguments[arguments.length - 1];
+
+window.__walletRequests[requestId].then(done);
@@ -0,0 +1,20 @@
+"use strict";
+
+const [itemsXPath, index, name] = arguments;
+
+const items = document.evaluate(
+	itemsXPath,
+	document,
+	null,
+	XPathResult.ORDERED_NODE_SNAPSHOT_TYPE,
+	null
+);
+const item = items.snapshotItem(index);
+
+// ? Refuse to click if the list changed since the index was built
+if (!item || item.textContent.trim() !== name) {
+	return false;
+}
+
+item.click();
+return true;
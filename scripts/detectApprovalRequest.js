@@ -0,0 +1,67 @@
+"use strict";
+
+const first = (selectors) => {
+	for (const selector of selectors) {
+		const element = document.querySelector(selector);
+		if (element) {
+			return element;
+		}
+	}
+	return null;
+};
+
+const byTestId = (...testIds) =>
+	first(testIds.map((testId) => `[data-testid='${testId}']`));
+
+const heading = first(["h2", "h3", "[data-testid='confirm-title']"]);
+const title = heading ? heading.textContent.trim() : "";
+
+let type = null;
+let approve = null;
+let reject = null;
+
+if (document.querySelector("[data-testid='connect-page'], .permissions-connect")) {
+	type = "connect";
+	approve = byTestId("confirm-btn", "page-container-footer-next");
+	reject = byTestId("cancel-btn", "page-container-footer-cancel");
+} else if (byTestId("confirmation-submit-button")) {
+	// ? Templated confirmations: wallet_addEthereumChain and wallet_switchEthereumChain
+	type = /switch/i.test(title) ? "switch_chain" : "add_chain";
+	approve = byTestId("confirmation-submit-button");
+	reject = byTestId("confirmation-cancel-button");
+} else if (byTestId("confirm-footer-button", "page-container-footer-next")) {
+	if (
+		document.querySelector(
+			"[data-testid='confirmation_data-section'], .signature-request-data, [data-testid='signature-request-data']"
+		)
+	) {
+		type = "typed_sign";
+	} else if (
+		document.querySelector(
+			"[data-testid='confirmation_message-section'], .request-signature__body, .signature-request-message"
+		)
+	) {
+		type = "personal_sign";
+	} else {
+		type = "transaction";
+	}
+	approve = byTestId("confirm-footer-button", "page-container-footer-next");
+	reject = byTestId("confirm-footer-cancel-button", "page-container-footer-cancel");
+}
+
+if (!type) {
+	// ? Still loading, look again on the next poll
+	const appContent = document.querySelector("#app-content");
+	if (
+		document.readyState !== "complete" ||
+		!appContent ||
+		appContent.children.length === 0 ||
+		document.querySelector(".loading-overlay, .loading-indicator")
+	) {
+		return null;
+	}
+	// ? Rendered, but not a screen we know how to approve
+	type = "unknown";
+}
+
+return { type, title, approve, reject };
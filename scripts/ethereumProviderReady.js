@@ -0,0 +1,3 @@
+"use strict";
+
+return Boolean(window.ethereum);
@@ -0,0 +1,18 @@
+"use strict";
+
+const root = arguments[0] || document;
+const accountListItems = root.querySelectorAll(".multichain-account-list-item");
+
+return Array.from(accountListItems).map((item, index) => {
+	const name = item.querySelector(
+		".multichain-account-list-item__account-name"
+	);
+	const address = item.querySelector("[data-testid='account-list-address']");
+
+	return {
+		index,
+		name: name ? name.textContent.trim() : null,
+		address: address ? address.textContent.trim() : null,
+		element: item,
+	};
+});
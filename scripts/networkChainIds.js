@@ -0,0 +1,27 @@
+"use strict";
+
+const done = arguments[arguments.length - 1];
+
+// MetaMask persists its controller state in chrome.storage.local under "data"
+chrome.storage.local.get("data", (items) => {
+	const networkState = ((items && items.data) || {}).NetworkController || {};
+	const chainIds = {};
+
+	// Newer versions key configurations by chain ID and include built-in networks
+	const byChainId = networkState.networkConfigurationsByChainId || {};
+	for (const [chainId, configuration] of Object.entries(byChainId)) {
+		if (configuration && configuration.name) {
+			chainIds[configuration.name] = chainId;
+		}
+	}
+
+	// Older versions only list custom networks, by nickname
+	const byId = networkState.networkConfigurations || {};
+	for (const configuration of Object.values(byId)) {
+		if (configuration && configuration.nickname && configuration.chainId) {
+			chainIds[configuration.nickname] = configuration.chainId;
+		}
+	}
+
+	done(chainIds);
+});
@@ -0,0 +1,18 @@
+"use strict";
+
+const [itemsXPath] = arguments;
+
+const items = document.evaluate(
+	itemsXPath,
+	document,
+	null,
+	XPathResult.ORDERED_NODE_SNAPSHOT_TYPE,
+	null
+);
+
+const names = [];
+for (let index = 0; index < items.snapshotLength; index++) {
+	names.push(items.snapshotItem(index).textContent.trim());
+}
+
+return names;
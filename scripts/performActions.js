@@ -0,0 +1,87 @@
+"use strict";
+
+const [actions, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const deadline = Date.now() + timeoutMs;
+
+// ? Buttons are disabled until React has seen the previous inputs, wait for them
+const isReady = (element) => !element.disabled;
+
+const find = (xpath) => {
+	const element = document.evaluate(
+		xpath,
+		document,
+		null,
+		XPathResult.FIRST_ORDERED_NODE_TYPE,
+		null
+	).singleNodeValue;
+	return element && isReady(element) ? element : null;
+};
+
+const waitFor = (xpath) =>
+	new Promise((resolve) => {
+		const found = find(xpath);
+		if (found) {
+			resolve(found);
+			return;
+		}
+
+		const observer = new MutationObserver(() => {
+			const element = find(xpath);
+			if (element) {
+				observer.disconnect();
+				clearTimeout(timer);
+				resolve(element);
+			}
+		});
+
+		const timer = setTimeout(() => {
+			observer.disconnect();
+			resolve(null);
+		}, Math.max(deadline - Date.now(), 0));
+
+		observer.observe(document, {
+			childList: true,
+			subtree: true,
+			attributes: true,
+		});
+	});
+
+// ? React tracks input values through the native setter, assigning .value is ignored
+const setValue = (input, value) => {
+	const prototype =
+		input instanceof HTMLTextAreaElement
+			? HTMLTextAreaElement.prototype
+			: HTMLInputElement.prototype;
+
+	input.focus();
+	Object.getOwnPropertyDescriptor(prototype, "value").set.call(input, value);
+	input.dispatchEvent(new Event("input", { bubbles: true }));
+	input.dispatchEvent(new Event("change", { bubbles: true }));
+};
+
+const run = async () => {
+	for (const [index, [type, xpath, value]] of actions.entries()) {
+		const element = await waitFor(xpath);
+
+		if (!element) {
+			return { completed: index, error: `Element not found or disabled: ${xpath}` };
+		}
+
+		if (type === "click") {
+			element.click();
+		} else if (type === "check") {
+			if (!element.checked) {
+				element.click();
+			}
+		} else if (type === "fill") {
+			setValue(element, String(value));
+		} else {
+			return { completed: index, error: `Unknown action: ${type}` };
+		}
+	}
+
+	return { completed: actions.length, error: null };
+};
+
+run().then(done);
@@ -0,0 +1,13 @@
+"use strict";
+
+const [route] = arguments;
+
+if (route) {
+	window.location.hash = route;
+} else {
+	// ? Clearing the hash would leave a trailing "#", drop it from the URL instead
+	history.pushState(null, "", window.location.pathname);
+	window.dispatchEvent(new HashChangeEvent("hashchange"));
+}
+
+return window.location.href;
@@ -0,0 +1,22 @@
+"use strict";
+
+const [method, params] = arguments;
+
+window.__walletRequests = window.__walletRequests || [];
+window.__walletResults = window.__walletResults || [];
+const requestId = window.__walletRequests.length;
+
+window.__walletRequests.push(
+	window.ethereum
+		.request({ method, params })
+		.then(
+			(result) => ({ result }),
+			(error) => ({ error: { code: error.code, message: error.message } })
+		)
+		.then((response) => {
+			window.__walletResults[requestId] = response;
+			return response;
+		})
+);
+
+return requestId;
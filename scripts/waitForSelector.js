@@ -0,0 +1,44 @@
+"use strict";
+
+const [selector, isXPath, timeoutMs, root] = arguments;
+const done = arguments[arguments.length - 1];
+const scope = root || document;
+
+const find = () => {
+	if (isXPath) {
+		return document.evaluate(
+			selector,
+			scope,
+			null,
+			XPathResult.FIRST_ORDERED_NODE_TYPE,
+			null
+		).singleNodeValue;
+	}
+	return scope.querySelector(selector);
+};
+
+const found = find();
+if (found) {
+	done(found);
+	return;
+}
+
+const observer = new MutationObserver(() => {
+	const element = find();
+	if (element) {
+		observer.disconnect();
+		clearTimeout(timer);
+		done(element);
+	}
+});
+
+const timer = setTimeout(() => {
+	observer.disconnect();
+	done(null);
+}, timeoutMs);
+
+observer.observe(document, {
+	childList: true,
+	subtree: true,
+	attributes: true,
+});
@@ -0,0 +1,35 @@
+"use strict";
+
+const [fragment, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+
+if (window.location.href.includes(fragment)) {
+	done(window.location.href);
+	return;
+}
+
+const check = () => {
+	if (window.location.href.includes(fragment)) {
+		cleanup();
+		done(window.location.href);
+	}
+};
+
+const cleanup = () => {
+	window.removeEventListener("hashchange", check);
+	window.removeEventListener("popstate", check);
+	observer.disconnect();
+	clearTimeout(timer);
+};
+
+// ? Route changes that skip hashchange still re-render the app
+const observer = new MutationObserver(check);
+observer.observe(document, { childList: true, subtree: true });
+
+window.addEventListener("hashchange", check);
+window.addEventListener("popstate", check);
+
+const timer = setTimeout(() => {
+	cleanup();
+	done(null);
+}, timeoutMs);
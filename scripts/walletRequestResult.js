@@ -0,0 +1,5 @@
+"use strict";
+
+const [requestId] = arguments;
+
+return (window.__walletResults || [])[requestId] || null;
@@ -0,0 +1,243 @@
+import os
+import sqlite3
+import threading
+
+from abc import ABC, abstractmethod
+
+import redis
+import redis.asyncio
+
+from storage.connection import get_async_redis, get_redis
+
+# ? "redis" or "sqlite", read once at import
+STORAGE_BACKEND = os.environ.get("METAMASK_STORAGE_BACKEND", "redis")
+SQLITE_STORAGE_PATH = os.environ.get(
+    "METAMASK_SQLITE_PATH", os.path.join(os.getcwd(), "storage.sqlite3")
+)
+
+
+class StorageBackend(ABC):
+    """
+    Field/value records grouped under a key, the shape every storage class uses.
+
+    Batch methods take many keys at once so that a backend can serve them in a
+    single round trip. Subclasses implement set_many and get_many, the single
+    key methods are built on them and may be overridden with faster versions.
+    """
+
+    def set_fields(self, key: str, mapping: dict) -> None:
+        self.set_many({key: mapping})
+
+    def get_field(self, key: str, field: str) -> str | None:
+        return self.get_fields(key, [field])[0]
+
+    def get_fields(self, key: str, fields: list[str]) -> list[str | None]:
+        return self.get_many([(key, fields)])[0]
+
+    @abstractmethod
+    def set_many(self, mappings: dict[str, dict], transaction: bool = False) -> None:
+        """
+        Write the fields of several keys, creating records that do not exist yet.
+
+        Args:
+            mappings (dict[str, dict]): Fields to set, keyed by record key.
+            transaction (bool, optional): Apply every write or none. Defaults to False.
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def get_many(self, requests: list[tuple[str, list[str]]]) -> list[list[str | None]]:
+        """
+        Read fields of several keys.
+
+        Args:
+            requests (list[tuple[str, list[str]]]): (key, fields) pairs.
+        Returns:
+            list[list[str | None]]: The values of each request's fields, None where not set.
+        """
+
+
+class RedisBackend(StorageBackend):
+    """Records as Redis hashes, batches as pipelines."""
+
+    def __init__(self, client: redis.Redis):
+        self.redis = client
+
+    def set_fields(self, key: str, mapping: dict) -> None:
+        self.redis.hset(key, mapping=mapping)
+
+    def get_field(self, key: str, field: str) -> str | None:
+        return self.redis.hget(key, field)
+
+    def set_many(self, mappings: dict[str, dict], transaction: bool = False) -> None:
+        pipeline = self.redis.pipeline(transaction=transaction)
+
+        for key, mapping in mappings.items():
+            pipeline.hset(key, mapping=mapping)
+
+        pipeline.execute()
+
+    def get_many(self, requests: list[tuple[str, list[str]]]) -> list[list[str | None]]:
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for key, fields in requests:
+            pipeline.hmget(key, *fields)
+
+        return pipeline.execute()
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Records in an embedded SQLite database in WAL mode, with an in-memory read cache.
+
+    A record is loaded from disk the first time it is read and served from
+    memory afterwards. Writes go to disk and the cache together. The cache
+    assumes this process is the only writer, which holds for single-node runs.
+    """
+
+    def __init__(self, path: str = SQLITE_STORAGE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cache: dict[str, dict] = {}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "key TEXT NOT NULL, field TEXT NOT NULL, value TEXT, "
+            "PRIMARY KEY (key, field)) WITHOUT ROWID"
+        )
+
+    def _load(self, key: str) -> dict:
+        if key not in self._cache:
+            rows = self._connection.execute(
+                "SELECT field, value FROM records WHERE key = ?", (key,)
+            )
+            self._cache[key] = dict(rows.fetchall())
+
+        return self._cache[key]
+
+    def set_many(self, mappings: dict[str, dict], transaction: bool = False) -> None:
+        rows = [
+            (key, str(field), str(value))
+            for key, mapping in mappings.items()
+            for field, value in mapping.items()
+        ]
+
+        # ? Always one transaction, it is also the fastest way to write many rows
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT INTO records (key, field, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key, field) DO UPDATE SET value = excluded.value",
+                    rows,
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+            for key, mapping in mappings.items():
+                if key in self._cache:
+                    self._cache[key].update(
+                        {str(field): str(value) for field, value in mapping.items()}
+                    )
+
+    def get_many(self, requests: list[tuple[str, list[str]]]) -> list[list[str | None]]:
+        with self._lock:
+            return [
+                [self._load(key).get(str(field)) for field in fields]
+                for key, fields in requests
+            ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+# ? SQLite backends by path, so every storage instance shares one read cache
+_sqlite_backends: dict[str, SqliteBackend] = {}
+_sqlite_backends_lock = threading.Lock()
+
+
+def get_sqlite_backend(path: str = SQLITE_STORAGE_PATH) -> SqliteBackend:
+    path = os.path.abspath(path)
+
+    with _sqlite_backends_lock:
+        if path not in _sqlite_backends:
+            _sqlite_backends[path] = SqliteBackend(path)
+
+        return _sqlite_backends[path]
+
+
+def get_storage_backend(
+    backend: str = None,
+    redis_host: str = "localhost",
+    redis_port: int = 6379,
+    redis_db: int = 0,
+    client: redis.Redis = None,
+) -> StorageBackend:
+    """
+    Get the storage backend selected by configuration.
+
+    Set METAMASK_STORAGE_BACKEND=sqlite to keep everything in a local SQLite
+    database (METAMASK_SQLITE_PATH, defaults to ./storage.sqlite3) instead of
+    a Redis server.
+
+    Args:
+        backend (str, optional): "redis" or "sqlite". Defaults to STORAGE_BACKEND.
+        redis_host (str, optional): Redis host. Defaults to "localhost".
+        redis_port (int, optional): Redis port. Defaults to 6379.
+        redis_db (int, optional): Redis database. Defaults to 0.
+        client (redis.Redis, optional): Redis client to use, implies the Redis backend.
+    Returns:
+        StorageBackend: The backend.
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if client is not None:
+        return RedisBackend(client)
+
+    backend = backend or STORAGE_BACKEND
+
+    if backend == "redis":
+        return RedisBackend(get_redis(redis_host, redis_port, redis_db))
+    if backend == "sqlite":
+        return get_sqlite_backend()
+
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_async_redis_backend(
+    redis_host: str = "localhost", redis_port: int = 6379, redis_db: int = 0
+) -> redis.asyncio.Redis:
+    """
+    Get the asyncio Redis client used by the async storage classes.
+
+    Only Redis has an asyncio client. With another backend configured the async
+    classes would read and write different records than the sync ones, so they
+    refuse to start instead.
+
+    Args:
+        redis_host (str, optional): Redis host. Defaults to "localhost".
+        redis_port (int, optional): Redis port. Defaults to 6379.
+        redis_db (int, optional): Redis database. Defaults to 0.
+    Returns:
+        redis.asyncio.Redis: The client.
+    Raises:
+        ValueError: If the configured backend is not Redis.
+    """
+    if STORAGE_BACKEND != "redis":
+        raise ValueError(
+            f"Async storage needs the redis backend, {STORAGE_BACKEND} is configured"
+        )
+
+    return get_async_redis(redis_host, redis_port, redis_db)
@@ -0,0 +1,65 @@
+import threading
+
+import redis
+import redis.asyncio
+
+# ? One connection pool per Redis server and database, shared by every storage instance
+_connection_pools: dict[tuple[str, int, int], redis.ConnectionPool] = {}
+_connection_pools_lock = threading.Lock()
+
+
+def get_connection_pool(
+    redis_host: str = "localhost", redis_port: int = 6379, redis_db: int = 0
+) -> redis.ConnectionPool:
+    """
+    Get the process-wide connection pool for a Redis server and database.
+
+    Args:
+        redis_host (str, optional): Redis host. Defaults to "localhost".
+        redis_port (int, optional): Redis port. Defaults to 6379.
+        redis_db (int, optional): Redis database. Defaults to 0.
+    Returns:
+        redis.ConnectionPool: The shared pool. Forked processes get fresh connections from it.
+    """
+    key = (redis_host, redis_port, redis_db)
+
+    with _connection_pools_lock:
+        if key not in _connection_pools:
+            _connection_pools[key] = redis.ConnectionPool(
+                host=redis_host, port=redis_port, db=redis_db, decode_responses=True
+            )
+
+        return _connection_pools[key]
+
+
+def get_redis(
+    redis_host: str = "localhost", redis_port: int = 6379, redis_db: int = 0
+) -> redis.Redis:
+    """Get a Redis client backed by the shared connection pool."""
+    return redis.Redis(
+        connection_pool=get_connection_pool(redis_host, redis_port, redis_db)
+    )
+
+
+def get_async_redis(
+    redis_host: str = "localhost", redis_port: int = 6379, redis_db: int = 0
+) -> redis.asyncio.Redis:
+    """
+    Get an asyncio Redis client with its own connection pool.
+
+    Asyncio connections belong to the event loop that opened them, so the pool
+    is not shared across instances like the synchronous one.
+    """
+    return redis.asyncio.Redis(
+        host=redis_host, port=redis_port, db=redis_db, decode_responses=True
+    )
+
+
+def close_connection_pools() -> None:
+    """Disconnect every shared connection pool."""
+    with _connection_pools_lock:
+        pools = list(_connection_pools.values())
+        _connection_pools.clear()
+
+    for pool in pools:
+        pool.disconnect()
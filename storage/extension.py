@@ -1,21 +1,49 @@
 import redis
 
+from storage.backends import (
+    StorageBackend,
+    get_async_redis_backend,
+    get_storage_backend,
+)
+
 
 class ExtensionStorage:
 
     def __init__(
-        self, redis_host: str = "localhost", redis_port: int = 6379, redis_db: int = 0
+        self,
+        redis_host: str = "localhost",
+        redis_port: int = 6379,
+        redis_db: int = 0,
+        namespace: str = None,
+        client: redis.Redis = None,
+        backend: str | StorageBackend = None,
     ):
-        """Initialize Redis connection and set up credential storage system."""
-        self.redis = redis.Redis(
-            host=redis_host, port=redis_port, db=redis_db, decode_responses=True
+        """
+        Initialize the storage backend and set up credential storage system.
+
+        A namespace keeps the keys of concurrent workers apart, e.g.
+        "worker-1:extension:metamask" instead of "extension:metamask".
+        The backend is Redis or SQLite as configured, see get_storage_backend.
+        Redis connections come from a pool shared by every storage instance,
+        unless a client is passed in, e.g. a fakeredis.FakeRedis(decode_responses=True).
+        """
+        self.backend = (
+            backend
+            if isinstance(backend, StorageBackend)
+            else get_storage_backend(backend, redis_host, redis_port, redis_db, client)
         )
+        self.namespace = namespace
+
+    def _key(self, extension_name: str) -> str:
+        if self.namespace:
+            return f"{self.namespace}:extension:{extension_name}"
+        return f"extension:{extension_name}"
 
     def store_extension(self, extension_name: str, extension_data: dict) -> str:
         """
-        Store an extension in Redis.
+        Store an extension in the storage backend.
         This method takes an extension's name and the path to the extension, and stores the
-        extension in Redis using a Redis hash with the extension name as the key.
+        extension as a record with the extension name as the key.
 
         Args:
             extension_name (str): Unique identifier for the extension.
@@ -25,21 +53,37 @@ class ExtensionStorage:
             str: The path to the stored extension.
         """
 
-        self.redis.hset(
-            f"extension:{extension_name}",
-            "extension_id",
-            extension_data["extension_id"],
+        self.backend.set_fields(
+            self._key(extension_name), self._extension_fields(extension_data)
         )
-        self.redis.hset(
-            f"extension:{extension_name}",
-            "extension_base_url",
-            f"chrome-extension://{extension_data['extension_id']}",
+
+    def _extension_fields(self, extension_data: dict) -> dict:
+        return {
+            "extension_id": extension_data["extension_id"],
+            "extension_base_url": f"chrome-extension://{extension_data['extension_id']}",
+        }
+
+    def store_extensions(self, extensions: dict[str, dict]) -> None:
+        """
+        Store several extensions in a single round trip.
+
+        Args:
+            extensions (dict[str, dict]): Extension data keyed by extension name.
+
+        Returns:
+            None
+        """
+        self.backend.set_many(
+            {
+                self._key(extension_name): self._extension_fields(extension_data)
+                for extension_name, extension_data in extensions.items()
+            }
         )
 
     def get_extension_id(self, extension_name: str) -> str:
         """
-        Get the ID of an extension in Redis.
-        This method takes an extension's name and retrieves the ID of the extension from Redis.
+        Get the ID of a stored extension.
+        This method takes an extension's name and retrieves the ID of the extension from the storage backend.
 
         Args:
             extension_name (str): Unique identifier for the extension.
@@ -47,12 +91,12 @@ class ExtensionStorage:
         Returns:
             str: The ID of the extension.
         """
-        return self.redis.hget(f"extension:{extension_name}", "extension_id")
+        return self.backend.get_field(self._key(extension_name), "extension_id")
 
     def get_extension_base_url(self, extension_name: str) -> str:
         """
-        Get the base URL of an extension in Redis.
-        This method takes an extension's name and retrieves the base URL of the extension from Redis.
+        Get the base URL of a stored extension.
+        This method takes an extension's name and retrieves the base URL of the extension from the storage backend.
 
         Args:
             extension_name (str): Unique identifier for the extension.
@@ -60,7 +104,107 @@ class ExtensionStorage:
         Returns:
             str: The base URL of the extension.
         """
-        return self.redis.hget(f"extension:{extension_name}", "extension_base_url")
+        return self.backend.get_field(self._key(extension_name), "extension_base_url")
+
+    def get_extensions(self, extension_names: list[str]) -> dict[str, dict]:
+        """
+        Get the ID and base URL of several extensions in a single round trip.
+
+        Args:
+            extension_names (list[str]): Unique identifiers of the extensions.
+
+        Returns:
+            dict[str, dict]: "extension_id" and "extension_base_url" keyed by extension name,
+                             both None for extensions that are not stored.
+        """
+        results = self.backend.get_many(
+            [
+                (self._key(extension_name), ["extension_id", "extension_base_url"])
+                for extension_name in extension_names
+            ]
+        )
+
+        return {
+            extension_name: {
+                "extension_id": extension_id,
+                "extension_base_url": extension_base_url,
+            }
+            for extension_name, (extension_id, extension_base_url) in zip(
+                extension_names, results
+            )
+        }
+
+
+class AsyncExtensionStorage:
+    """
+    ExtensionStorage on redis.asyncio, with the same method names as coroutines.
+
+    Redis only: with METAMASK_STORAGE_BACKEND=sqlite the constructor raises
+    ValueError, use ExtensionStorage there.
+    """
+
+    def __init__(
+        self,
+        redis_host: str = "localhost",
+        redis_port: int = 6379,
+        redis_db: int = 0,
+        namespace: str = None,
+        client: redis.asyncio.Redis = None,
+    ):
+        """
+        Initialize the asyncio Redis connection.
+
+        Pass a client to use an existing connection, e.g. a
+        fakeredis.aioredis.FakeRedis(decode_responses=True) in tests.
+        """
+        self.redis = client or get_async_redis_backend(
+            redis_host, redis_port, redis_db
+        )
+        self.namespace = namespace
+
+    _key = ExtensionStorage._key
+    _extension_fields = ExtensionStorage._extension_fields
+
+    async def store_extension(self, extension_name: str, extension_data: dict) -> None:
+        await self.redis.hset(
+            self._key(extension_name), mapping=self._extension_fields(extension_data)
+        )
+
+    async def store_extensions(self, extensions: dict[str, dict]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for extension_name, extension_data in extensions.items():
+                pipeline.hset(
+                    self._key(extension_name),
+                    mapping=self._extension_fields(extension_data),
+                )
+            await pipeline.execute()
+
+    async def get_extension_id(self, extension_name: str) -> str:
+        return await self.redis.hget(self._key(extension_name), "extension_id")
+
+    async def get_extension_base_url(self, extension_name: str) -> str:
+        return await self.redis.hget(self._key(extension_name), "extension_base_url")
+
+    async def get_extensions(self, extension_names: list[str]) -> dict[str, dict]:
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for extension_name in extension_names:
+                pipeline.hmget(
+                    self._key(extension_name), "extension_id", "extension_base_url"
+                )
+            results = await pipeline.execute()
+
+        return {
+            extension_name: {
+                "extension_id": extension_id,
+                "extension_base_url": extension_base_url,
+            }
+            for extension_name, (extension_id, extension_base_url) in zip(
+                extension_names, results
+            )
+        }
+
+    async def aclose(self) -> None:
+        await self.redis.aclose()
 
 
 if __name__ == "__main__":
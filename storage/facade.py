@@ -0,0 +1,54 @@
+import asyncio
+import inspect
+import threading
+
+# ? One background event loop runs every facade's coroutines
+_loop: asyncio.AbstractEventLoop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="storage-event-loop", daemon=True
+            ).start()
+
+        return _loop
+
+
+class SyncStorage:
+    """
+    Call an async storage from synchronous code.
+
+    Every coroutine method of the wrapped storage becomes a blocking method with
+    the same name. Coroutines run on a shared background event loop, so the
+    wrapped client's connections always stay on the loop that opened them.
+
+    Example:
+        storage = SyncStorage(AsyncExtensionStorage(namespace="worker-1"))
+        storage.get_extension_id("metamask")
+    """
+
+    def __init__(self, async_storage):
+        self.async_storage = async_storage
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.async_storage, name)
+
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            future = asyncio.run_coroutine_threadsafe(
+                attribute(*args, **kwargs), _get_loop()
+            )
+            return future.result()
+
+        return call
+
+    def close(self) -> None:
+        self.aclose()
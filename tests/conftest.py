@@ -0,0 +1,12 @@
+import pytest
+
+from extension import waits
+from extension.waits import StepLatencies
+
+
+@pytest.fixture(autouse=True)
+def step_latencies(tmp_path, monkeypatch):
+    # ? Keep adaptive timeouts from earlier runs out of the tests, and the tests out of the history
+    monkeypatch.setattr(
+        waits, "step_latencies", StepLatencies(str(tmp_path / "latencies.json"))
+    )
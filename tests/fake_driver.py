@@ -0,0 +1,77 @@
+import itertools
+
+from selenium.common.exceptions import NoSuchWindowException
+
+_session_ids = itertools.count()
+
+
+class FakeSwitchTo:
+    def __init__(self, driver: "FakeDriver"):
+        self._driver = driver
+
+    def window(self, handle: str) -> None:
+        if handle not in self._driver.windows:
+            raise NoSuchWindowException(handle)
+        self._driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """
+    Just enough of a WebDriver for helpers that only look at windows and URLs.
+
+    Page scripts are answered by `script_results`, keyed by script file name.
+    A value is either returned as is or called with the driver and the script
+    arguments.
+    """
+
+    def __init__(self, windows: dict[str, str] = None):
+        self.session_id = f"session-{next(_session_ids)}"
+        self.windows = dict(windows or {"main": "about:blank"})
+        self.current_window_handle = next(iter(self.windows))
+        self.switch_to = FakeSwitchTo(self)
+        self.script_results = {}
+        self.script_calls = []
+        self.loaded_urls = []
+        self.quit_count = 0
+
+    @property
+    def window_handles(self) -> list[str]:
+        return list(self.windows)
+
+    @property
+    def current_url(self) -> str:
+        return self.windows[self.current_window_handle]
+
+    def get(self, url: str) -> None:
+        self.loaded_urls.append(url)
+        self.windows[self.current_window_handle] = url
+
+    def close(self) -> None:
+        del self.windows[self.current_window_handle]
+
+    def quit(self) -> None:
+        self.quit_count += 1
+
+    def set_script_timeout(self, seconds: float) -> None:
+        pass
+
+    def execute_cdp_cmd(self, command: str, params: dict) -> dict:
+        return {}
+
+    def _run(self, script: str, args: tuple) -> any:
+        for file_name, result in self.script_results.items():
+            if f'"{file_name}"' in script:
+                self.script_calls.append(file_name)
+                return result(self, *args) if callable(result) else result
+        # ? The script bundle being installed
+        return None
+
+    def execute_script(self, script: str, *args) -> any:
+        return self._run(script, args)
+
+    def execute_async_script(self, script: str, *args) -> any:
+        return self._run(script, args)
+
+
+def wait_for_url_result(driver: FakeDriver, fragment: str, *_) -> str | None:
+    return driver.current_url if fragment in driver.current_url else None
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from extension.approvals import (
+    Deadline,
+    handle_pending_approvals,
+    wait_for_notification_window,
+)
+from extension.helpers import cache_extension_base_url, invalidate_extension_cache
+
+from fake_driver import FakeDriver, wait_for_url_result
+
+from utils.enums.approval import ApprovalAction, ApprovalType
+
+EXTENSION_URL = "chrome-extension://metamask"
+
+
+@pytest.fixture
+def driver():
+    driver = FakeDriver({"main": f"{EXTENSION_URL}/home.html"})
+    driver.script_results["waitForUrl.js"] = wait_for_url_result
+    cache_extension_base_url(driver, EXTENSION_URL)
+    yield driver
+    invalidate_extension_cache(driver)
+
+
+def test_popup_still_blank_on_first_sight_is_found_once_loaded(driver):
+    known_handles = driver.window_handles
+    driver.windows["popup"] = "about:blank"
+    polls = []
+
+    def load_on_second_look(handle: str) -> None:
+        driver.current_window_handle = handle
+        if handle == "popup":
+            polls.append(handle)
+            if len(polls) == 2:
+                driver.windows["popup"] = f"{EXTENSION_URL}/notification.html"
+
+    driver.switch_to.window = load_on_second_look
+
+    handle = wait_for_notification_window(driver, known_handles, Deadline(5))
+
+    assert handle == "popup"
+    assert driver.current_window_handle == "popup"
+
+
+def test_unrelated_windows_are_only_checked_once(driver):
+    known_handles = driver.window_handles
+    driver.windows["dapp"] = "https://example.com"
+    switches = []
+
+    def record_switch(handle: str) -> None:
+        switches.append(handle)
+        driver.current_window_handle = handle
+        if switches.count("dapp") == 1:
+            driver.windows["popup"] = f"{EXTENSION_URL}/notification.html"
+
+    driver.switch_to.window = record_switch
+
+    assert wait_for_notification_window(driver, known_handles, Deadline(5)) == "popup"
+    assert switches.count("dapp") == 1
+
+
+def unknown_request(driver: FakeDriver) -> dict:
+    return {
+        "type": "unknown",
+        "title": "Something new",
+        "approve": None,
+        "reject": None,
+    }
+
+
+def test_unrecognized_request_is_skipped_without_waiting_for_the_deadline(driver):
+    driver.windows["popup"] = f"{EXTENSION_URL}/notification.html"
+    driver.script_results["detectApprovalRequest.js"] = unknown_request
+    started_at = time.perf_counter()
+
+    handled = handle_pending_approvals(driver, timeout=5)
+
+    assert handled == []
+    assert time.perf_counter() - started_at < 1
+    assert driver.current_window_handle == "main"
+
+
+def test_unrecognized_request_goes_through_the_unknown_policy_entry(driver):
+    driver.windows["popup"] = f"{EXTENSION_URL}/notification.html"
+    driver.script_results["detectApprovalRequest.js"] = unknown_request
+    seen = []
+
+    def decide(driver: FakeDriver, request: dict) -> ApprovalAction:
+        seen.append(request["type"])
+        return ApprovalAction.SKIP
+
+    handle_pending_approvals(driver, policy={ApprovalType.UNKNOWN: decide}, timeout=5)
+
+    assert seen == [ApprovalType.UNKNOWN]
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from extension.catalog import ArtifactCatalog, hash_file
+
+
+def write(path, content: bytes, mtime_ns: int = None) -> None:
+    with open(path, "wb") as f:
+        f.write(content)
+
+    # ? Filesystems with coarse timestamps would otherwise hide quick rewrites
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def touch_directory(directory) -> None:
+    stat = os.stat(directory)
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return ArtifactCatalog(str(tmp_path))
+
+
+@pytest.mark.parametrize(
+    "file_names, expected",
+    [
+        (["1.0.zip"], "1.0.zip"),
+        (["1.0.zip", "1.0_1.crx"], "1.0_1.crx"),
+        (["1.0.zip", "1.0_1.crx", "1.0_3.crx"], "1.0_3.crx"),
+        (["1.0.zip", "1.0_3.crx", "1.0.crx"], "1.0.crx"),
+    ],
+)
+def test_resolution_order(tmp_path, catalog, file_names, expected):
+    for file_name in file_names:
+        write(tmp_path / file_name, file_name.encode())
+
+    artifact = catalog.get("1.0")
+
+    assert artifact["file"] == expected
+    assert artifact["sha256"] == hash_file(str(tmp_path / expected))
+
+
+def test_missing_version_resolves_to_none(catalog):
+    assert catalog.get("1.0") is None
+
+
+def test_higher_ranked_file_added_later_takes_over(tmp_path, catalog):
+    write(tmp_path / "1.0.zip", b"zip")
+    assert catalog.get("1.0")["format"] == "zip"
+
+    write(tmp_path / "1.0.crx", b"crx")
+    touch_directory(tmp_path)
+
+    assert catalog.get("1.0")["file"] == "1.0.crx"
+
+
+def test_file_replaced_in_place_is_rehashed_and_unpacked_again(tmp_path, catalog):
+    write(tmp_path / "1.0.crx", b"old", mtime_ns=1_000_000_000)
+    catalog.get("1.0")
+    catalog.set_unpacked("1.0", "/unpacked/old")
+
+    write(tmp_path / "1.0.crx", b"new build", mtime_ns=2_000_000_000)
+    artifact = catalog.get("1.0")
+
+    assert artifact["sha256"] == hash_file(str(tmp_path / "1.0.crx"))
+    assert artifact["unpacked_path"] is None
+
+
+def test_index_survives_a_restart_without_rehashing(tmp_path, catalog, monkeypatch):
+    write(tmp_path / "1.0.zip", b"zip")
+    sha256 = catalog.get("1.0")["sha256"]
+    catalog.set_unpacked("1.0", "/unpacked/1.0")
+
+    monkeypatch.setattr(
+        "extension.catalog.hash_file",
+        lambda path: pytest.fail("an unchanged artifact was hashed again"),
+    )
+    artifact = ArtifactCatalog(str(tmp_path)).get("1.0")
+
+    assert artifact["sha256"] == sha256
+    assert artifact["unpacked_path"] == "/unpacked/1.0"
+
+
+def test_removed_artifact_falls_back_then_disappears(tmp_path, catalog):
+    write(tmp_path / "1.0.zip", b"zip")
+    write(tmp_path / "1.0.crx", b"crx")
+    assert catalog.get("1.0")["file"] == "1.0.crx"
+
+    os.remove(tmp_path / "1.0.crx")
+    touch_directory(tmp_path)
+    assert catalog.get("1.0")["file"] == "1.0.zip"
+
+    os.remove(tmp_path / "1.0.zip")
+    touch_directory(tmp_path)
+    assert catalog.get("1.0") is None
+
+
+def test_rebuild_indexes_every_version(tmp_path, catalog):
+    write(tmp_path / "1.0.zip", b"zip")
+    write(tmp_path / "2.0_1.crx", b"crx")
+    write(tmp_path / "notes.txt", b"ignored")
+
+    assert sorted(catalog.rebuild()) == ["1.0", "2.0"]
@@ -0,0 +1,85 @@
+import fakeredis
+import pytest
+
+from credentials import SecureCredentialStorage
+from utils.enums.credential import CredentialField, CredentialType
+
+# ? The lowest bcrypt cost keeps the suite fast
+TEST_ROUNDS = 4
+
+
+@pytest.fixture
+def storage():
+    return SecureCredentialStorage(
+        client=fakeredis.FakeRedis(decode_responses=True), rounds=TEST_ROUNDS
+    )
+
+
+def test_bulk_store_then_bulk_verify(storage):
+    results = storage.store_credentials_bulk(
+        {
+            "wallet-1": {"password": "first", "recovery_phrase": "one two"},
+            "wallet-2": {"password": "second"},
+        }
+    )
+
+    assert results["wallet-1"]["error"] is None
+    assert set(results["wallet-1"]["hashed"]) == {
+        CredentialType.PASSWORD,
+        CredentialType.RECOVERY_PHRASE,
+    }
+
+    assert storage.verify_credentials_bulk(
+        {
+            "wallet-1": {"password": "first", "recovery_phrase": "wrong"},
+            "wallet-2": {"password": "second"},
+            "wallet-3": {"password": "never stored"},
+        }
+    ) == {
+        "wallet-1": {
+            CredentialType.PASSWORD: True,
+            CredentialType.RECOVERY_PHRASE: False,
+        },
+        "wallet-2": {CredentialType.PASSWORD: True},
+        "wallet-3": {CredentialType.PASSWORD: False},
+    }
+
+
+@pytest.mark.parametrize("credentials", [{"password": 5}, ["password"]])
+def test_bad_wallet_is_reported_without_aborting_the_fleet(storage, credentials):
+    results = storage.store_credentials_bulk(
+        {"good": {"password": "secret"}, "bad": credentials}
+    )
+
+    assert list(results) == ["good", "bad"]
+    assert results["good"]["error"] is None
+    assert results["bad"]["hashed"] == {}
+    assert "must be" in results["bad"]["error"]
+
+    assert storage.verify_credential("good", CredentialField.PASSWORD_HASH, "secret")
+    assert storage.get_credential_hashes(["bad"], CredentialField.PASSWORD_HASH) == {
+        "bad": None
+    }
+
+
+def test_verify_many_reads_every_hash_at_once(storage):
+    storage.store_credentials("wallet-1", {"password": "first"})
+
+    assert storage.verify_many(
+        [
+            ("wallet-1", CredentialField.PASSWORD_HASH, "first"),
+            ("wallet-1", CredentialField.PASSWORD_HASH, "wrong"),
+            ("missing", CredentialField.PASSWORD_HASH, "first"),
+        ]
+    ) == [True, False, False]
+
+
+def test_needs_rehash_compares_cost_factors(storage):
+    hashed = storage.store_credentials("wallet-1", {"password": "first"})[
+        CredentialType.PASSWORD
+    ]
+
+    assert not storage.needs_rehash(hashed)
+    assert SecureCredentialStorage(
+        client=fakeredis.FakeRedis(decode_responses=True), rounds=TEST_ROUNDS + 1
+    ).needs_rehash(hashed)
@@ -0,0 +1,169 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import zipfile
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from extension.downloads import ChecksumMismatchError, ExtensionDownloadCache
+
+
+def make_zip(content: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("manifest.json", json.dumps({"name": content}))
+    return buffer.getvalue()
+
+
+class ReleaseServer(ThreadingHTTPServer):
+    """Serves release archives by path, with optional Range support."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ReleaseHandler)
+        self.archives = {}
+        self.range_headers = []
+        self.supports_range = True
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def add(self, version: str, body: bytes) -> None:
+        self.archives[f"/v{version}/metamask-chrome-{version}.zip"] = body
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = self.server.archives.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        range_header = self.headers.get("Range")
+        self.server.range_headers.append(range_header)
+
+        if range_header and self.server.supports_range:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}"
+            )
+            body = body[start:]
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    server = ReleaseServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path, server):
+    return ExtensionDownloadCache(str(tmp_path), base_url=server.base_url)
+
+
+def test_download_records_checksum_and_is_cached(cache, server):
+    body = make_zip("metamask")
+    server.add("1.0.0", body)
+
+    path = cache.download("1.0.0")
+
+    with open(path, "rb") as f:
+        assert f.read() == body
+    assert cache.load_manifest()["1.0.0"]["sha256"] == hashlib.sha256(body).hexdigest()
+    assert not os.path.exists(f"{path}.part")
+
+    cache.download("1.0.0")
+    assert len(server.range_headers) == 1
+
+
+def test_partial_download_resumes_with_a_range_request(cache, server):
+    body = make_zip("metamask" * 1000)
+    server.add("1.0.0", body)
+
+    with open(f"{cache.get_path('1.0.0')}.part", "wb") as f:
+        f.write(body[:100])
+
+    path = cache.download("1.0.0")
+
+    assert server.range_headers == ["bytes=100-"]
+    with open(path, "rb") as f:
+        assert f.read() == body
+    assert cache.load_manifest()["1.0.0"]["sha256"] == hashlib.sha256(body).hexdigest()
+
+
+def test_complete_partial_file_is_finished_on_416(cache, server):
+    body = make_zip("metamask")
+    server.add("1.0.0", body)
+
+    with open(f"{cache.get_path('1.0.0')}.part", "wb") as f:
+        f.write(body)
+
+    with open(cache.download("1.0.0"), "rb") as f:
+        assert f.read() == body
+
+
+def test_server_ignoring_the_range_restarts_the_download(cache, server):
+    body = make_zip("metamask" * 1000)
+    server.add("1.0.0", body)
+    server.supports_range = False
+
+    with open(f"{cache.get_path('1.0.0')}.part", "wb") as f:
+        f.write(b"stale bytes")
+
+    with open(cache.download("1.0.0"), "rb") as f:
+        assert f.read() == body
+
+
+def test_checksum_mismatch_leaves_nothing_behind(cache, server):
+    server.add("1.0.0", make_zip("tampered"))
+    cache._record_checksum("1.0.0", "0" * 64, 1, "expected")
+
+    with pytest.raises(ChecksumMismatchError):
+        cache.download("1.0.0")
+
+    assert not os.path.exists(cache.get_path("1.0.0"))
+    assert not os.path.exists(f"{cache.get_path('1.0.0')}.part")
+
+
+def test_download_that_is_not_a_zip_is_rejected(cache, server):
+    server.add("1.0.0", b"<html>rate limited</html>")
+
+    with pytest.raises(ChecksumMismatchError):
+        cache.download("1.0.0")
+
+    assert "1.0.0" not in cache.load_manifest()
+
+
+def test_prefetch_reports_errors_per_version(cache, server):
+    server.add("1.0.0", make_zip("metamask"))
+
+    results = cache.prefetch(["1.0.0", "9.9.9", "1.0.0"])
+
+    assert results["1.0.0"] == cache.get_path("1.0.0")
+    assert results["9.9.9"].startswith("HTTPError")
@@ -0,0 +1,147 @@
+import base64
+import json
+import os
+import zipfile
+
+import fakeredis
+import pytest
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from extension import setup
+from extension.helpers import invalidate_extension_cache
+from extension.setup import (
+    get_extension_id_from_key,
+    resolve_extension_id_offline,
+    store_extension_id,
+)
+from storage.extension import ExtensionStorage
+
+from tests.fake_driver import FakeDriver
+
+
+def make_manifest_key() -> str:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_key = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return base64.b64encode(public_key).decode("ascii")
+
+
+@pytest.mark.parametrize(
+    "key_bytes, extension_id",
+    [
+        # ? Test vectors of Chromium's components/crx_file/id_util_unittest.cc
+        (b"test", "jpignaibiiemhngfjkcpokkamffknabf"),
+        (b"_", "ncocknphbhhlhkikpnnlmbcnbgdempcd"),
+    ],
+)
+def test_extension_id_matches_chromium_vectors(key_bytes, extension_id):
+    manifest_key = base64.b64encode(key_bytes).decode("ascii")
+
+    assert get_extension_id_from_key(manifest_key) == extension_id
+
+
+def test_extension_id_is_32_letters_and_stable():
+    manifest_key = make_manifest_key()
+    extension_id = get_extension_id_from_key(manifest_key)
+
+    assert len(extension_id) == 32
+    assert set(extension_id) <= set("abcdefghijklmnop")
+    assert get_extension_id_from_key(manifest_key) == extension_id
+
+
+def test_pinned_key_is_reused_and_written_into_unpacked_manifests(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(setup, "EXTENSION_DIR", str(tmp_path))
+    monkeypatch.setattr(setup, "UNPACKED_EXTENSION_DIR", str(tmp_path / "unpacked"))
+    monkeypatch.setattr(setup, "MANIFEST_KEY_PATH", str(tmp_path / "manifest_key.pem"))
+
+    archive_path = tmp_path / "1.0.0.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("manifest.json", json.dumps({"name": "MetaMask"}))
+
+    manifest_key = setup.get_pinned_manifest_key()
+    assert setup.get_pinned_manifest_key() == manifest_key
+
+    unpacked_path = setup.unpack_extension(str(archive_path))
+    with open(os.path.join(unpacked_path, "manifest.json"), encoding="utf-8") as f:
+        assert json.load(f)["key"] == manifest_key
+
+
+def test_key_less_archive_cannot_be_resolved_offline(tmp_path):
+    archive_path = tmp_path / "1.0.0.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("manifest.json", json.dumps({"name": "MetaMask"}))
+
+    assert resolve_extension_id_offline(str(archive_path)) is None
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    calls = []
+    answers = {}
+
+    def lookup(name: str):
+        def record(*args, **kwargs):
+            calls.append(name)
+            return answers.get(name)
+
+        return record
+
+    for name in (
+        "resolve_extension_id_offline",
+        "query_extension_id",
+        "find_extension_id_in_extensions_page",
+    ):
+        monkeypatch.setattr(setup, name, lookup(name))
+
+    return calls, answers
+
+
+@pytest.mark.parametrize(
+    "found_by, expected_calls",
+    [
+        ("resolve_extension_id_offline", ["resolve_extension_id_offline"]),
+        (
+            "query_extension_id",
+            ["resolve_extension_id_offline", "query_extension_id"],
+        ),
+        (
+            "find_extension_id_in_extensions_page",
+            [
+                "resolve_extension_id_offline",
+                "query_extension_id",
+                "find_extension_id_in_extensions_page",
+            ],
+        ),
+    ],
+)
+def test_store_extension_id_stops_at_the_first_lookup_that_succeeds(
+    lookups, found_by, expected_calls
+):
+    calls, answers = lookups
+    answers[found_by] = "abc"
+    driver = FakeDriver()
+    storage = ExtensionStorage(client=fakeredis.FakeRedis(decode_responses=True))
+
+    extension_id = store_extension_id(driver, storage, "MetaMask", "/extensions/mm")
+
+    assert extension_id == "abc"
+    assert calls == expected_calls
+    assert storage.get_extension_id("metamask") == "abc"
+    invalidate_extension_cache(driver)
+
+
+def test_store_extension_id_without_a_path_skips_the_offline_lookup(lookups):
+    calls, answers = lookups
+    answers["query_extension_id"] = "abc"
+    driver = FakeDriver()
+    storage = ExtensionStorage(client=fakeredis.FakeRedis(decode_responses=True))
+
+    assert store_extension_id(driver, storage, "MetaMask") == "abc"
+    assert calls == ["query_extension_id"]
+    invalidate_extension_cache(driver)
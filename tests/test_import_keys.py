@@ -0,0 +1,56 @@
+import import_keys
+from import_keys import address_fingerprint, prepare_private_keys
+
+FIRST_KEY = "0x" + "11" * 32
+SECOND_KEY = "0x" + "22" * 32
+
+
+def test_keys_are_validated_in_input_order():
+    prepared = prepare_private_keys([FIRST_KEY, "not a key", SECOND_KEY])
+
+    assert [entry["private_key"] for entry in prepared] == [
+        FIRST_KEY,
+        "not a key",
+        SECOND_KEY,
+    ]
+    assert [entry["error"] for entry in prepared] == [
+        None,
+        "Invalid private key",
+        None,
+    ]
+
+
+def test_repeated_key_is_a_duplicate():
+    prepared = prepare_private_keys([FIRST_KEY, SECOND_KEY, FIRST_KEY])
+
+    assert [entry["error"] for entry in prepared] == [
+        None,
+        None,
+        "Duplicate private key",
+    ]
+
+
+def test_truncated_wallet_address_marks_the_key_as_imported():
+    address = prepare_private_keys([FIRST_KEY])[0]["address"]
+    prefix, suffix = address_fingerprint(address)
+
+    prepared = prepare_private_keys(
+        [FIRST_KEY, SECOND_KEY], imported_addresses=[f"{prefix}...{suffix}"]
+    )
+
+    assert [entry["error"] for entry in prepared] == ["Account already imported", None]
+
+
+def test_distinct_addresses_sharing_a_fingerprint_are_both_kept(monkeypatch):
+    addresses = [
+        "0x1234500000000000000000000000000000abcde",
+        "0x12345fffffffffffffffffffffffffffffabcde",
+    ]
+    monkeypatch.setattr(
+        import_keys, "derive_addresses", lambda private_keys, max_workers: addresses
+    )
+
+    prepared = prepare_private_keys([FIRST_KEY, SECOND_KEY])
+
+    assert address_fingerprint(addresses[0]) == address_fingerprint(addresses[1])
+    assert [entry["error"] for entry in prepared] == [None, None]
@@ -0,0 +1,76 @@
+import pytest
+
+from extension.helpers import (
+    cache_extension_base_url,
+    get_page_state,
+    invalidate_extension_cache,
+)
+from extension.navigation import navigate_to_route
+
+from fake_driver import FakeDriver, wait_for_url_result
+
+HOME_URL = "chrome-extension://metamask/home.html"
+
+
+def set_hash_route(driver: FakeDriver, route: str, *_) -> None:
+    driver.windows[driver.current_window_handle] = f"{HOME_URL}#{route}"
+
+
+@pytest.fixture
+def driver():
+    driver = FakeDriver({"extension": HOME_URL, "dapp": "https://example.com"})
+    driver.script_results.update(
+        {
+            "waitForUrl.js": wait_for_url_result,
+            "setHashRoute.js": set_hash_route,
+            "dialogOpen.js": False,
+        }
+    )
+    cache_extension_base_url(driver, "chrome-extension://metamask")
+    yield driver
+    invalidate_extension_cache(driver)
+
+
+def test_tracked_home_tab_is_not_navigated_again(driver):
+    navigate_to_route(driver)
+    navigate_to_route(driver)
+
+    assert driver.loaded_urls == []
+    assert "setHashRoute.js" not in driver.script_calls
+
+
+def test_other_window_is_not_mistaken_for_the_tracked_tab(driver):
+    navigate_to_route(driver)
+    driver.switch_to.window("dapp")
+
+    navigate_to_route(driver)
+
+    assert driver.loaded_urls == [HOME_URL]
+    assert driver.windows["dapp"] == HOME_URL
+
+
+def test_route_change_inside_home_uses_the_hash_router(driver):
+    navigate_to_route(driver, "settings")
+
+    assert driver.loaded_urls == []
+    assert driver.current_url == f"{HOME_URL}#settings"
+
+
+def test_tab_navigated_behind_the_tracker_is_loaded_again(driver):
+    navigate_to_route(driver)
+    driver.windows["extension"] = "https://phishing.example"
+
+    navigate_to_route(driver)
+
+    assert driver.loaded_urls == [HOME_URL]
+
+
+def test_open_dialog_forces_a_reload(driver):
+    navigate_to_route(driver)
+    get_page_state(driver)["dialog_open"] = True
+    driver.script_results["dialogOpen.js"] = True
+
+    navigate_to_route(driver)
+
+    assert driver.loaded_urls == [HOME_URL]
+    assert get_page_state(driver)["dialog_open"] is False
@@ -0,0 +1,56 @@
+import pytest
+
+from metamask_automation import (
+    get_network_index,
+    invalidate_network_index,
+)
+
+from fake_driver import FakeDriver
+
+NETWORK_NAMES = ["Ethereum Mainnet", "Linea", "Local"]
+
+
+@pytest.fixture
+def driver():
+    driver = FakeDriver()
+    driver.script_results["networkListSnapshot.js"] = NETWORK_NAMES
+    driver.script_results["networkChainIds.js"] = {
+        "Ethereum Mainnet": "0x1",
+        "Linea": "0xe708",
+    }
+    yield driver
+    invalidate_network_index(driver)
+
+
+def test_chain_ids_come_from_the_extension_state(driver):
+    assert get_network_index(driver) == {
+        "Ethereum Mainnet": {"index": 0, "chain_id": "0x1"},
+        "Linea": {"index": 1, "chain_id": "0xe708"},
+        "Local": {"index": 2, "chain_id": None},
+    }
+
+
+def test_index_is_built_once_per_session(driver):
+    get_network_index(driver)
+    get_network_index(driver)
+
+    assert driver.script_calls.count("networkListSnapshot.js") == 1
+
+
+def test_sessions_do_not_share_chain_ids(driver):
+    other = FakeDriver()
+    other.script_results["networkListSnapshot.js"] = ["Local"]
+    other.script_results["networkChainIds.js"] = {"Local": "0x539"}
+
+    assert get_network_index(driver)["Local"]["chain_id"] is None
+    assert get_network_index(other)["Local"]["chain_id"] == "0x539"
+    invalidate_network_index(other)
+
+
+def test_adding_a_network_rebuilds_the_index(driver):
+    get_network_index(driver)
+    driver.script_results["networkChainIds.js"] = {"Local": "0x539"}
+
+    invalidate_network_index(driver)
+
+    assert get_network_index(driver)["Local"]["chain_id"] == "0x539"
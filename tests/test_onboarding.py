@@ -0,0 +1,61 @@
+import threading
+import time
+
+from extension import onboarding
+from extension.onboarding import copy_recovery_phrase
+
+from tests.fake_driver import FakeDriver
+
+
+class FakeCopyButton:
+    # ? MetaMask writes to the clipboard asynchronously after the click
+    def __init__(self, clipboard: dict, phrase: str, delay: float):
+        self.clipboard = clipboard
+        self.phrase = phrase
+        self.delay = delay
+
+    def click(self) -> None:
+        def write():
+            time.sleep(self.delay)
+            self.clipboard["text"] = self.phrase
+
+        threading.Thread(target=write, daemon=True).start()
+
+
+def test_concurrent_onboardings_copy_their_own_recovery_phrase(monkeypatch):
+    clipboard = {"text": ""}
+    monkeypatch.setattr(
+        onboarding.pyperclip, "copy", lambda text: clipboard.update(text=text)
+    )
+    monkeypatch.setattr(onboarding.pyperclip, "paste", lambda: clipboard["text"])
+
+    first, second = FakeDriver(), FakeDriver()
+    buttons = {
+        # ? The first copy lands after the second browser has already clicked
+        first.session_id: FakeCopyButton(clipboard, "first phrase", delay=0.2),
+        second.session_id: FakeCopyButton(clipboard, "second phrase", delay=0.05),
+    }
+    monkeypatch.setattr(
+        onboarding,
+        "wait_for_element",
+        lambda driver, xpath: buttons[driver.session_id],
+    )
+
+    phrases = {}
+
+    def onboard(driver: FakeDriver) -> None:
+        phrases[driver.session_id] = copy_recovery_phrase(driver, "copy")
+
+    workers = [
+        threading.Thread(target=onboard, args=(driver,)) for driver in (first, second)
+    ]
+    workers[0].start()
+    time.sleep(0.05)
+    workers[1].start()
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert phrases == {
+        first.session_id: "first phrase",
+        second.session_id: "second phrase",
+    }
@@ -0,0 +1,39 @@
+import pytest
+
+import orchestrator
+from orchestrator import WalletOrchestrator
+
+from tests.fake_driver import FakeDriver
+
+
+@pytest.fixture
+def wallet_orchestrator(monkeypatch):
+    monkeypatch.setitem(orchestrator.JOB_HANDLERS, "echo", lambda driver, value: value)
+    with WalletOrchestrator(
+        workers=2, driver_factory=lambda storage: FakeDriver()
+    ) as wallet_orchestrator:
+        yield wallet_orchestrator
+
+
+def test_run_returns_one_result_per_job_in_job_order(wallet_orchestrator):
+    jobs = [{"type": "echo", "params": {"value": value}} for value in range(5)]
+
+    results = wallet_orchestrator.run(jobs)
+
+    assert [result["result"] for result in results] == list(range(5))
+    assert all(result["error"] is None for result in results)
+
+
+def test_run_refuses_while_submitted_results_are_uncollected(wallet_orchestrator):
+    earlier = {"type": "echo", "params": {"value": "earlier"}}
+    mine = {"type": "echo", "params": {"value": "mine"}}
+    wallet_orchestrator.submit(earlier)
+
+    with pytest.raises(RuntimeError):
+        wallet_orchestrator.run([mine])
+
+    drained = [result["result"] for result in wallet_orchestrator.results()]
+    results = wallet_orchestrator.run([mine])
+
+    assert drained == ["earlier"]
+    assert [result["result"] for result in results] == ["mine"]
@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+
+from selenium.common.exceptions import WebDriverException
+
+from extension.helpers import cache_extension_base_url
+from extension.pool import DriverPool
+
+from tests.fake_driver import FakeDriver
+
+EXTENSION_URL = "chrome-extension://metamask"
+
+
+def onboarded_driver() -> FakeDriver:
+    driver = FakeDriver({"main": f"{EXTENSION_URL}/home.html"})
+    driver.script_results["documentReadyState.js"] = True
+    cache_extension_base_url(driver, EXTENSION_URL)
+    return driver
+
+
+def test_spawn_finishing_after_close_quits_the_driver_without_deadlock():
+    started = threading.Event()
+    finish = threading.Event()
+    drivers = []
+
+    def slow_factory():
+        started.set()
+        finish.wait()
+        drivers.append(onboarded_driver())
+        return drivers[-1]
+
+    pool = DriverPool(size=1, driver_factory=slow_factory)
+    pool._pending += 1
+    spawner = threading.Thread(target=pool._spawn, daemon=True)
+    spawner.start()
+    started.wait()
+
+    pool.close()
+    finish.set()
+    spawner.join(timeout=5)
+
+    assert not spawner.is_alive()
+    assert drivers[0].quit_count == 1
+    assert pool._idle.empty()
+
+
+def test_acquire_raises_when_every_spawn_failed():
+    def failing_factory():
+        raise OSError("Chrome did not start")
+
+    pool = DriverPool(size=2, driver_factory=failing_factory)
+
+    with pytest.raises(RuntimeError):
+        pool.start()
+
+    with pytest.raises(RuntimeError, match="no live or starting drivers"):
+        pool.acquire()
+
+
+def test_acquire_times_out_while_every_driver_is_in_use():
+    pool = DriverPool(size=1, driver_factory=onboarded_driver).start()
+    pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.1)
+
+
+def test_release_after_close_quits_instead_of_requeueing():
+    pool = DriverPool(size=1, driver_factory=onboarded_driver).start()
+    driver = pool.acquire()
+
+    pool.close()
+    pool.release(driver)
+
+    assert driver.quit_count == 1
+    assert pool._idle.empty()
+
+
+def test_driver_is_recycled_after_max_uses():
+    pool = DriverPool(size=1, max_uses=1, driver_factory=onboarded_driver).start()
+
+    with pool.session(timeout=5) as first:
+        pass
+    with pool.session(timeout=5) as second:
+        pass
+
+    assert first.quit_count == 1
+    assert second is not first
+    pool.close()
+
+
+def test_driver_left_on_a_dapp_tab_is_reset_and_reused():
+    pool = DriverPool(size=1, driver_factory=onboarded_driver).start()
+
+    with pool.session(timeout=5) as driver:
+        driver.windows["main"] = "https://example.com"
+        driver.windows["dapp"] = "https://app.example.com"
+        driver.current_window_handle = "dapp"
+
+    assert driver.quit_count == 0
+    assert driver.window_handles == ["main"]
+    assert driver.current_url == f"{EXTENSION_URL}/home.html"
+    with pool.session(timeout=5) as reused:
+        assert reused is driver
+    pool.close()
+
+
+def test_unresponsive_driver_is_replaced():
+    pool = DriverPool(size=1, driver_factory=onboarded_driver).start()
+
+    def crashed(driver: FakeDriver) -> None:
+        raise WebDriverException("chrome not reachable")
+
+    with pool.session(timeout=5) as driver:
+        driver.script_results["documentReadyState.js"] = crashed
+
+    assert driver.quit_count == 1
+    with pool.session(timeout=5) as replacement:
+        assert replacement is not driver
+    pool.close()
@@ -0,0 +1,107 @@
+import fakeredis
+import pytest
+
+from credentials import AsyncSecureCredentialStorage
+from storage import backends
+from storage.backends import (
+    RedisBackend,
+    SqliteBackend,
+    StorageBackend,
+    get_storage_backend,
+)
+from storage.extension import AsyncExtensionStorage, ExtensionStorage
+
+
+@pytest.fixture(params=["redis", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "redis":
+        yield RedisBackend(fakeredis.FakeRedis(decode_responses=True))
+    else:
+        backend = SqliteBackend(str(tmp_path / "storage.sqlite3"))
+        yield backend
+        backend.close()
+
+
+def test_single_key_round_trip(backend):
+    backend.set_fields("extension:metamask", {"extension_id": "abc", "build": 7})
+
+    assert backend.get_field("extension:metamask", "extension_id") == "abc"
+    assert backend.get_fields("extension:metamask", ["build", "missing"]) == [
+        "7",
+        None,
+    ]
+
+
+def test_batch_round_trip(backend):
+    backend.set_many(
+        {"a": {"x": "1"}, "b": {"x": "2", "y": "3"}},
+        transaction=True,
+    )
+    backend.set_many({"a": {"x": "updated"}})
+
+    assert backend.get_many([("a", ["x", "y"]), ("b", ["y"]), ("c", ["x"])]) == [
+        ["updated", None],
+        ["3"],
+        [None],
+    ]
+
+
+def test_incomplete_backend_fails_at_construction():
+    class ReadOnlyBackend(StorageBackend):
+        def get_many(self, requests):
+            return [[None] * len(fields) for _, fields in requests]
+
+    with pytest.raises(TypeError):
+        ReadOnlyBackend()
+
+
+def test_sqlite_writes_persist_across_instances(tmp_path):
+    path = str(tmp_path / "storage.sqlite3")
+
+    writer = SqliteBackend(path)
+    writer.set_fields("extension:metamask", {"extension_id": "abc"})
+    writer.close()
+
+    reader = SqliteBackend(path)
+    assert reader.get_field("extension:metamask", "extension_id") == "abc"
+    reader.close()
+
+
+def test_sqlite_cache_sees_writes_after_first_read(tmp_path):
+    backend = SqliteBackend(str(tmp_path / "storage.sqlite3"))
+
+    assert backend.get_field("extension:metamask", "extension_id") is None
+    backend.set_fields("extension:metamask", {"extension_id": "abc"})
+
+    assert backend.get_field("extension:metamask", "extension_id") == "abc"
+    backend.close()
+
+
+def test_storage_classes_run_on_the_sqlite_backend(tmp_path):
+    storage = ExtensionStorage(backend=SqliteBackend(str(tmp_path / "db.sqlite3")))
+
+    storage.store_extension("metamask", {"extension_id": "abc"})
+
+    assert storage.get_extension_base_url("metamask") == "chrome-extension://abc"
+
+
+def test_client_implies_redis_and_unknown_backends_are_rejected():
+    client = fakeredis.FakeRedis(decode_responses=True)
+
+    assert isinstance(get_storage_backend("sqlite", client=client), RedisBackend)
+
+    with pytest.raises(ValueError):
+        get_storage_backend("memcached")
+
+
+@pytest.mark.parametrize(
+    "async_storage", [AsyncExtensionStorage, AsyncSecureCredentialStorage]
+)
+def test_async_storage_refuses_a_non_redis_backend(monkeypatch, async_storage):
+    monkeypatch.setattr(backends, "STORAGE_BACKEND", "sqlite")
+
+    with pytest.raises(ValueError, match="redis backend"):
+        async_storage()
+
+    # ? An explicit client is a deliberate choice of Redis
+    async_storage(client=fakeredis.aioredis.FakeRedis(decode_responses=True))
@@ -0,0 +1,53 @@
+import fakeredis
+import pytest
+
+from storage.extension import ExtensionStorage
+
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def test_store_extension_writes_id_and_base_url(client):
+    storage = ExtensionStorage(client=client)
+
+    storage.store_extension("metamask", {"extension_id": "abc"})
+
+    assert storage.get_extension_id("metamask") == "abc"
+    assert storage.get_extension_base_url("metamask") == "chrome-extension://abc"
+    assert client.hgetall("extension:metamask") == {
+        "extension_id": "abc",
+        "extension_base_url": "chrome-extension://abc",
+    }
+
+
+def test_batch_store_and_get_round_trip(client):
+    storage = ExtensionStorage(client=client)
+
+    storage.store_extensions(
+        {"metamask": {"extension_id": "abc"}, "rabby": {"extension_id": "def"}}
+    )
+
+    assert storage.get_extensions(["rabby", "missing", "metamask"]) == {
+        "rabby": {
+            "extension_id": "def",
+            "extension_base_url": "chrome-extension://def",
+        },
+        "missing": {"extension_id": None, "extension_base_url": None},
+        "metamask": {
+            "extension_id": "abc",
+            "extension_base_url": "chrome-extension://abc",
+        },
+    }
+
+
+def test_namespaces_keep_workers_apart(client):
+    first = ExtensionStorage(client=client, namespace="worker-1")
+    second = ExtensionStorage(client=client, namespace="worker-2")
+
+    first.store_extension("metamask", {"extension_id": "abc"})
+
+    assert first.get_extension_id("metamask") == "abc"
+    assert second.get_extension_id("metamask") is None
+    assert client.exists("worker-1:extension:metamask")
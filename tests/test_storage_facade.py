@@ -0,0 +1,41 @@
+import fakeredis
+import pytest
+
+from storage.extension import AsyncExtensionStorage
+from storage.facade import SyncStorage
+
+
+@pytest.fixture
+def storage():
+    storage = SyncStorage(
+        AsyncExtensionStorage(
+            client=fakeredis.aioredis.FakeRedis(decode_responses=True),
+            namespace="worker-1",
+        )
+    )
+    yield storage
+    storage.close()
+
+
+def test_coroutine_methods_become_blocking_calls(storage):
+    storage.store_extension("metamask", {"extension_id": "abc"})
+
+    assert storage.get_extension_id("metamask") == "abc"
+    assert storage.get_extension_base_url("metamask") == "chrome-extension://abc"
+
+
+def test_batch_methods_run_through_the_facade(storage):
+    storage.store_extensions(
+        {"metamask": {"extension_id": "abc"}, "rabby": {"extension_id": "def"}}
+    )
+
+    extensions = storage.get_extensions(["metamask", "rabby", "missing"])
+
+    assert extensions["metamask"]["extension_id"] == "abc"
+    assert extensions["rabby"]["extension_base_url"] == "chrome-extension://def"
+    assert extensions["missing"] == {"extension_id": None, "extension_base_url": None}
+
+
+def test_plain_attributes_pass_through(storage):
+    assert storage.namespace == "worker-1"
+    assert storage._key("metamask") == "worker-1:extension:metamask"
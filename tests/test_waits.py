@@ -0,0 +1,49 @@
+import pytest
+
+from selenium.common.exceptions import JavascriptException, TimeoutException
+
+from extension.waits import wait_for_url
+
+from fake_driver import FakeDriver
+
+
+def test_script_bug_is_raised_at_once():
+    driver = FakeDriver()
+    calls = []
+
+    def broken(driver, *args):
+        calls.append(args)
+        raise JavascriptException("SyntaxError: Unexpected token ')'")
+
+    driver.script_results["waitForUrl.js"] = broken
+
+    with pytest.raises(JavascriptException, match="SyntaxError"):
+        wait_for_url(driver, "home.html", timeout=5)
+
+    assert len(calls) == 1
+
+
+def test_page_transition_is_retried_on_the_new_document():
+    driver = FakeDriver({"main": "chrome-extension://metamask/home.html"})
+    attempts = []
+
+    def unloading_once(driver, fragment, *_):
+        attempts.append(fragment)
+        if len(attempts) == 1:
+            raise JavascriptException(
+                "javascript error: document unloaded while waiting for result"
+            )
+        return driver.current_url
+
+    driver.script_results["waitForUrl.js"] = unloading_once
+
+    assert wait_for_url(driver, "home.html", timeout=5).endswith("home.html")
+    assert len(attempts) == 2
+
+
+def test_wait_times_out_when_the_script_never_resolves():
+    driver = FakeDriver()
+    driver.script_results["waitForUrl.js"] = None
+
+    with pytest.raises(TimeoutException):
+        wait_for_url(driver, "home.html", timeout=0.2)
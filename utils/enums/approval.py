@@ -0,0 +1,17 @@
+from enum import StrEnum
+
+
+class ApprovalType(StrEnum):
+    CONNECT = "connect"
+    TRANSACTION = "transaction"
+    PERSONAL_SIGN = "personal_sign"
+    TYPED_SIGN = "typed_sign"
+    ADD_CHAIN = "add_chain"
+    SWITCH_CHAIN = "switch_chain"
+    UNKNOWN = "unknown"
+
+
+class ApprovalAction(StrEnum):
+    APPROVE = "approve"
+    REJECT = "reject"
+    SKIP = "skip"
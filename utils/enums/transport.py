@@ -0,0 +1,6 @@
+from enum import StrEnum
+
+
+class Transport(StrEnum):
+    WEBDRIVER = "webdriver"
+    CDP = "cdp"